@@ -0,0 +1,66 @@
+#
+# This file is part of snmpclitools software.
+#
+# Copyright (c) 2005-2019, Ilya Etingof <etingof@gmail.com>
+# License: http://snmplabs.com/snmpclitools/license.html
+#
+# Stand-in SNMP agent for benchmarks.
+#
+# Serves SNMPv2-MIB objects over UDP/IPv4 loopback to SNMPv1/v2c
+# community `public` and to SNMPv3 user `usr` (SHA/AES, `authkey1` and
+# `privkey1` keys) so that tools could be timed without network delays.
+#
+import sys
+
+from pysnmp.carrier.asyncore.dgram import udp
+from pysnmp.entity import config
+from pysnmp.entity import engine
+from pysnmp.entity.rfc3413 import cmdrsp
+from pysnmp.entity.rfc3413 import context
+
+DEFAULT_PORT = 1161
+
+
+def run(port=DEFAULT_PORT):
+    snmpEngine = engine.SnmpEngine()
+
+    config.addTransport(
+        snmpEngine, udp.domainName,
+        udp.UdpTransport().openServerMode(('127.0.0.1', port)))
+
+    config.addV1System(snmpEngine, 'my-area', 'public')
+
+    config.addV3User(
+        snmpEngine, 'usr',
+        config.usmHMACSHAAuthProtocol, 'authkey1',
+        config.usmAesCfb128Protocol, 'privkey1')
+
+    config.addVacmUser(snmpEngine, 2, 'my-area', 'noAuthNoPriv', (1,), (1,))
+    config.addVacmUser(snmpEngine, 3, 'usr', 'authPriv', (1,), (1,))
+
+    snmpContext = context.SnmpContext(snmpEngine)
+
+    cmdrsp.GetCommandResponder(snmpEngine, snmpContext)
+    cmdrsp.SetCommandResponder(snmpEngine, snmpContext)
+    cmdrsp.NextCommandResponder(snmpEngine, snmpContext)
+    cmdrsp.BulkCommandResponder(snmpEngine, snmpContext)
+
+    snmpEngine.transportDispatcher.jobStarted(1)
+
+    # Let the parent know we are ready to serve
+    sys.stdout.write('ready\n')
+    sys.stdout.flush()
+
+    try:
+        snmpEngine.transportDispatcher.runDispatcher()
+
+    finally:
+        snmpEngine.transportDispatcher.closeDispatcher()
+
+
+if __name__ == '__main__':
+    try:
+        run(len(sys.argv) > 1 and int(sys.argv[1]) or DEFAULT_PORT)
+
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,314 @@
+#
+# This file is part of snmpclitools software.
+#
+# Copyright (c) 2005-2019, Ilya Etingof <etingof@gmail.com>
+# License: http://snmplabs.com/snmpclitools/license.html
+#
+# Columnar table output benchmark.
+#
+# Synthesizes GETBULK responses walking all columns of a large sparse
+# table side by side (every other column lacks some rows) and writes
+# them into Parquet file the way snmpbulkwalk --parquet does, measuring
+# time and peak memory taken. Exits with non-zero status if the file
+# read back differs from the table walked or rows pile up in memory.
+#
+# Usage: python benchmarks/columnar.py [-t MIB::TABLE] [-r ROWS] [-m MAXREPS]
+#                                      [-g ROWGROUP]
+#
+import argparse
+import gc
+import os
+import shutil
+import sys
+import tempfile
+from timeit import default_timer as now
+
+try:
+    import tracemalloc
+
+except ImportError:
+    tracemalloc = None
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+sys.path.insert(0, os.path.dirname(BENCHMARKS_DIR))
+
+from pysnmp.proto import rfc1902
+
+from snmpclitools.cli import columnar
+from snmpclitools.cli import mibview
+from snmpclitools.cli import table
+
+# Every SPARSE-th row lacks instances of every other column
+SPARSE = 7
+
+# Column values repeat over that many rows
+CYCLE = 100
+
+
+def getValue(syntax, row):
+    # constrained types (e.g. enumerations) take a few values
+    for value in ('row-%d' % row, row + 1, row % 2 + 1, (1, 3, 6, row)):
+        try:
+            return syntax.clone(value)
+
+        except Exception:
+            continue
+
+
+def getRowIndices(mibViewController, rowNode, rows):
+    mibBuilder = mibViewController.mibBuilder
+
+    indices = []
+
+    for row in range(rows):
+        values = []
+
+        for implied, mibMod, mibSym in rowNode.getIndexNames():
+            indexNode, = mibBuilder.importSymbols(mibMod, mibSym)
+
+            values.append(getValue(indexNode.syntax, row))
+
+        indices.append(rowNode.getInstIdFromIndices(*values))
+
+    # walk goes in the order of instance OIDs
+    indices.sort()
+
+    return indices
+
+
+def isSkipped(column, row):
+    return column % 2 and row % SPARSE == SPARSE - 1
+
+
+def walkTable(columns, values, indices, maxReps):
+    """Yield varbind tables of GETBULK responses walking table columns"""
+    positions = [0] * len(columns)
+
+    while min(positions) <= len(indices):
+        varBindTable = []
+
+        for _ in range(maxReps):
+            varBindRow = []
+
+            for column, oid in enumerate(columns):
+                row = positions[column]
+
+                while row < len(indices) and isSkipped(column, row):
+                    row += 1
+
+                if row < len(indices):
+                    varBindRow.append(
+                        (oid + indices[row], values[column][row % CYCLE]))
+
+                else:  # next column past the end of this one
+                    varBindRow.append(
+                        (oid[:-1] + (oid[-1] + 1,), rfc1902.Integer32(0)))
+
+                positions[column] = row + 1
+
+            varBindTable.append(varBindRow)
+
+        yield varBindTable
+
+
+def writeTable(path, mibViewController, oidIndex, columns, values, indices,
+               maxReps, rowGroupSize):
+    """Feed table walk into table writer like snmpbulkwalk does"""
+    mibViewProxy = mibview.MibViewProxy(mibViewController, oidIndex)
+
+    tableWriter = columnar.TableWriter(
+        path, mibViewController, mibViewProxy, columns, rowGroupSize)
+
+    for varBindTable in walkTable(columns, values, indices, maxReps):
+        for varBindRow in varBindTable:
+            for column, (oid, val) in enumerate(varBindRow):
+                if oid[:len(columns[column])] == columns[column]:
+                    tableWriter.add(column, oid, val)
+
+                else:
+                    tableWriter.finish(column)
+
+        tableWriter.flush()
+
+    tableWriter.close()
+
+    return tableWriter
+
+
+def writeText(path, mibViewController, oidIndex, columns, values, indices,
+              maxReps):
+    """Write table walk out as text lines like snmpbulkwalk does"""
+    mibViewProxy = mibview.MibViewProxy(mibViewController, oidIndex)
+
+    with open(path, 'w') as f:
+        for varBindTable in walkTable(columns, values, indices, maxReps):
+            for varBindRow in varBindTable:
+                for column, (oid, val) in enumerate(varBindRow):
+                    if oid[:len(columns[column])] == columns[column]:
+                        f.write('%s\n' % mibViewProxy.getPrettyOidVal(
+                            mibViewController, oid, val))
+
+
+def measureMemory(func, *args):
+    """Return peak memory taken by function call"""
+    if tracemalloc is None:
+        return 0
+
+    gc.collect()
+
+    tracemalloc.start()
+
+    try:
+        func(*args)
+
+        return tracemalloc.get_traced_memory()[1]
+
+    finally:
+        tracemalloc.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Columnar table output benchmark')
+
+    parser.add_argument(
+        '-t', '--table', default='SNMP-TARGET-MIB::snmpTargetAddrTable',
+        help='MIB table to walk')
+    parser.add_argument(
+        '-r', '--rows', type=int, default=10000,
+        help='table rows')
+    parser.add_argument(
+        '-m', '--max-repetitions', type=int, default=25,
+        help='table rows in each GETBULK response')
+    parser.add_argument(
+        '-g', '--row-group', type=int, default=columnar.ROW_GROUP_SIZE,
+        help='rows written out at once')
+
+    args = parser.parse_args()
+
+    try:
+        from pyarrow import parquet
+
+    except ImportError:
+        sys.stdout.write('pyarrow package is not installed\n')
+        sys.exit(1)
+
+    modName, tableName = args.table.split('::')
+
+    snmpEngine = mibview.MibEngine()
+
+    mibBuilder = snmpEngine.getMibBuilder()
+
+    mibBuilder.loadModules(modName)
+
+    mibViewController = mibview.getMibViewController(snmpEngine)
+
+    tableNode, = mibBuilder.importSymbols(modName, tableName)
+
+    columns = table.getTableColumns(mibViewController, tableNode.name)
+
+    values = []
+
+    for column in columns:
+        mibNode, = mibBuilder.importSymbols(
+            *mibViewController.getNodeLocation(column)[:2])
+
+        values.append([getValue(mibNode.syntax, x) for x in range(CYCLE)])
+
+    rowNode, = mibBuilder.importSymbols(
+        *mibViewController.getNodeLocation(columns[0][:-1])[:2])
+
+    indices = getRowIndices(mibViewController, rowNode, args.rows)
+
+    oidIndex = mibview.getOidIndex(snmpEngine)
+
+    workDir = tempfile.mkdtemp()
+
+    failures = []
+
+    try:
+        path = os.path.join(workDir, 'table.parquet')
+
+        params = (path, mibViewController, oidIndex, columns, values,
+                  indices, args.max_repetitions, args.row_group)
+
+        startedAt = now()
+
+        tableWriter = writeTable(*params)
+
+        took = now() - startedAt
+
+        memory = measureMemory(writeTable, *params)
+
+        sys.stdout.write(
+            '%s: %d rows x %d columns written in %.6f sec (%d rows/sec), '
+            '%d rows in flight, peak %.1f MB, file %d KB\n' % (
+                args.table, tableWriter.rows, len(columns), took,
+                tableWriter.rows / took, tableWriter.peakRows,
+                memory / 1048576.0, os.path.getsize(path) // 1024))
+
+        written = parquet.read_table(path)
+
+        if written.num_rows != args.rows:
+            failures.append('%d rows written, %d walked' % (
+                written.num_rows, args.rows))
+
+        textPath = os.path.join(workDir, 'table.txt')
+
+        startedAt = now()
+
+        writeText(textPath, mibViewController, oidIndex, columns, values,
+                  indices, args.max_repetitions)
+
+        sys.stdout.write(
+            '%s: %d rows x %d columns as text in %.6f sec, file %d KB\n' % (
+                args.table, args.rows, len(columns), now() - startedAt,
+                os.path.getsize(textPath) // 1024))
+
+        # Rows in flight are bounded by how far sparse columns run ahead
+        # of the dense ones, the rest of the table is written out
+        maxRows = args.max_repetitions * 2 + args.rows // SPARSE
+
+        if tableWriter.peakRows > maxRows:
+            failures.append('%d rows kept in memory' % tableWriter.peakRows)
+
+        for row in (0, SPARSE - 1, args.rows - 1):
+            if row >= written.num_rows:
+                continue
+
+            record = written.slice(row, 1).to_pylist()[0]
+
+            for column, oid in enumerate(columns):
+                symName = mibViewController.getNodeLocation(oid)[1]
+
+                value = record[symName]
+
+                if isSkipped(column, row):
+                    expected = None
+
+                elif columnar.getColumnType(values[column][0]) in (
+                        columnar.INT64, columnar.UINT64):
+                    expected = int(values[column][row % CYCLE])
+
+                elif value is not None:  # rendered as per output options
+                    continue
+
+                else:
+                    expected = 'a value'
+
+                if value != expected:
+                    failures.append('row %d column %s holds %r, not %r' % (
+                        row, symName, value, expected))
+
+    finally:
+        shutil.rmtree(workDir, ignore_errors=True)
+
+    for failure in failures:
+        sys.stdout.write('FAILED %s\n' % failure)
+
+    sys.exit(failures and 1 or 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,241 @@
+#
+# This file is part of snmpclitools software.
+#
+# Copyright (c) 2005-2019, Ilya Etingof <etingof@gmail.com>
+# License: http://snmplabs.com/snmpclitools/license.html
+#
+# Value formatting micro-benchmarks.
+#
+# Times byte-level formatting helpers against the per-octet and per-arc
+# formatting they replace: octet strings in hex (-OT and raw values of
+# machine-readable output), OIDs in hex and decimal, TimeTicks, and
+# octet strings of every OCTET STRING based type of the loaded MIBs
+# (plain, DisplayString, MAC addresses etc.) rendered by pysnmp. Exits
+# with non-zero status if any helper produces different text.
+#
+# Usage: python benchmarks/formatting.py [-m MIB[:...]] [-n VALUES]
+#                                        [-s SIZE] [-r REPETITIONS]
+#
+import argparse
+import os
+import random
+import sys
+from timeit import default_timer as now
+
+from pyasn1.type import univ
+from pysnmp.proto import rfc1902
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+sys.path.insert(0, os.path.dirname(BENCHMARKS_DIR))
+
+from snmpclitools.cli import formatting
+from snmpclitools.cli import mibview
+
+
+def renderTimeTicks(ticks):
+    # formatting done before helpers
+    d, m = divmod(ticks, 8640000)
+    out = '%d days ' % d
+    d, m = divmod(m, 360000)
+    out += '%d:' % d
+    d, m = divmod(m, 6000)
+    out += '%d:' % d
+    d, m = divmod(m, 100)
+    return out + '%d.%d' % (d, m)
+
+
+def getOctets(rnd, count, size):
+    """Return MAC addresses, text and binary blobs"""
+    values = []
+
+    for _ in range(count // 3):
+        values.append(bytes(bytearray(
+            [rnd.randrange(256) for _ in range(6)])))
+        values.append(bytes(bytearray(
+            [rnd.randrange(32, 127) for _ in range(size)])))
+        values.append(bytes(bytearray(
+            [rnd.randrange(256) for _ in range(size)])))
+
+    return values
+
+
+def getOids(rnd, count):
+    """Return OIDs of table instances, some indices are large numbers"""
+    oids = []
+
+    for _ in range(count):
+        arcs = [rnd.randrange(256) for _ in range(rnd.randrange(1, 12))]
+
+        if rnd.randrange(10) == 0:  # e.g. interface number
+            arcs[0] = rnd.randrange(1 << 32)
+
+        oids.append(rfc1902.ObjectName((1, 3, 6, 1, 2, 1) + tuple(arcs)))
+
+    return oids
+
+
+def getOctetsTypes(mibBuilder):
+    """Return instances of OCTET STRING based types defined by MIBs"""
+    syntaxes = {}
+
+    for modName, mibSymbols in mibBuilder.mibSymbols.items():
+        for symName, symObj in mibSymbols.items():
+            if isinstance(symObj, type):
+                try:
+                    syntax = symObj()
+
+                except Exception:
+                    continue
+
+            else:
+                syntax = getattr(symObj, 'syntax', None)
+
+            if (isinstance(syntax, univ.OctetString) and
+                    syntax.__class__ not in syntaxes):
+                syntaxes[syntax.__class__] = syntax, '%s::%s' % (
+                    modName, symName)
+
+    return sorted(syntaxes.values(), key=lambda x: x[1])
+
+
+def measure(func, values, repetitions):
+    """Return best time of formatting all values and formatted values"""
+    best = None
+
+    for _ in range(repetitions):
+        startedAt = now()
+
+        output = [func(x) for x in values]
+
+        took = now() - startedAt
+
+        if best is None or took < best:
+            best = took
+
+    return best, output
+
+
+def prettyPrint(syntax, data):
+    try:
+        return syntax.clone(data).prettyPrint()
+
+    except Exception:
+        return 'error'
+
+
+def formatOctets(syntax, formatOctets, data):
+    try:
+        if syntax.subtypeSpec:
+            syntax.subtypeSpec(data)
+
+        return formatOctets(data)
+
+    except Exception:
+        return 'error'
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Value formatting micro-benchmarks')
+
+    parser.add_argument(
+        '-m', '--mibs', default='ALL',
+        help='MIBs to load (ALL loads all compiled MIBs)')
+    parser.add_argument(
+        '-n', '--values', type=int, default=30000,
+        help='values to format per benchmark')
+    parser.add_argument(
+        '-s', '--size', type=int, default=64,
+        help='octets of text and binary blobs')
+    parser.add_argument(
+        '-r', '--repetitions', type=int, default=3,
+        help='runs per measurement, best one is reported')
+
+    args = parser.parse_args()
+
+    rnd = random.Random(0)
+
+    octets = [rfc1902.OctetString(x)
+              for x in getOctets(rnd, args.values, args.size)]
+
+    oids = getOids(rnd, args.values)
+
+    ticks = [rnd.randrange(1 << 32) for _ in range(args.values)]
+
+    benchmarks = [
+        ('hex octets', octets,
+         lambda x: ' '.join(['%.2x' % y for y in x.asNumbers()]),
+         lambda x: formatting.formatHexOctets(x.asOctets())),
+        ('raw hex octets', octets,
+         lambda x: ''.join(['%.2x' % y for y in x.asNumbers()]),
+         lambda x: formatting.formatHexOctets(x.asOctets(), '')),
+        ('hex OIDs', oids,
+         lambda x: ' '.join(['%x' % y for y in tuple(x)]),
+         lambda x: formatting.formatHexArcs(tuple(x))),
+        ('OID arcs', oids,
+         lambda x: '.'.join([str(y) for y in x]),
+         formatting.formatArcs),
+        ('TimeTicks', ticks,
+         renderTimeTicks,
+         formatting.formatTimeTicks),
+    ]
+
+    snmpEngine = mibview.MibEngine()
+
+    mibBuilder = snmpEngine.getMibBuilder()
+
+    for mibFile in args.mibs.split(':'):
+        if mibFile.lower() == 'all':
+            mibBuilder.loadModules()
+
+        else:
+            mibBuilder.loadModules(mibFile)
+
+    data = [x.asOctets() for x in octets]
+
+    skipped = []
+
+    for syntax, name in getOctetsTypes(mibBuilder):
+        formatter = formatting.compileOctetsFormatter(syntax)
+
+        if formatter is None:
+            skipped.append(name)
+            continue
+
+        benchmarks.append(
+            ('%s %s' % (name, getattr(syntax, 'displayHint', '') or ''),
+             data,
+             lambda x, syntax=syntax: prettyPrint(syntax, x),
+             lambda x, syntax=syntax, formatter=formatter: formatOctets(
+                 syntax, formatter, x)))
+
+    failures = []
+
+    for name, values, reference, helper in benchmarks:
+        referenceTook, expected = measure(reference, values, args.repetitions)
+
+        helperTook, output = measure(helper, values, args.repetitions)
+
+        sys.stdout.write(
+            '%-45s %d values: %.6f sec, helpers %.6f sec (%.1fx)\n' % (
+                name, len(values), referenceTook, helperTook,
+                referenceTook / (helperTook or 1e-9)))
+
+        for value, x, y in zip(values, expected, output):
+            if x != y:
+                failures.append('%s: %r formatted as %r, not %r' % (
+                    name, value, y, x))
+                break
+
+    sys.stdout.write(
+        'types rendering values themselves: %s\n' % ', '.join(skipped))
+
+    for failure in failures:
+        sys.stdout.write('FAILED %s\n' % failure)
+
+    sys.exit(failures and 1 or 0)
+
+
+if __name__ == '__main__':
+    main()
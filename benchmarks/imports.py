@@ -0,0 +1,183 @@
+#
+# This file is part of snmpclitools software.
+#
+# Copyright (c) 2005-2019, Ilya Etingof <etingof@gmail.com>
+# License: http://snmplabs.com/snmpclitools/license.html
+#
+# Tools cold start import targets.
+#
+# Each scenario is run in a fresh Python process. The time it takes to
+# import the tool and run it is measured, along with the heavy modules
+# the run ended up importing. Exits with non-zero status if any
+# scenario fails, imports modules it has no use for or exceeds the time
+# budget.
+#
+# SNMP engine unconditionally registers USM security model, so any
+# command talking to an agent imports crypto modules, even SNMPv1/v2c.
+#
+# Usage: python benchmarks/imports.py [-n REPETITIONS] [-b SECONDS]
+#
+import argparse
+import importlib
+import json
+import os
+import subprocess
+import sys
+from timeit import default_timer as now
+
+import startup
+
+# Heavy modules by group: group is loaded if any of its modules is
+HEAVY_MODULES = {
+    'engine': ('pysnmp.entity.engine',),
+    'crypto': ('Cryptodome', 'Crypto', 'pysnmp.proto.secmod.rfc3414'),
+    'transport': ('pysnmp.carrier.base',),
+    'config': ('pysnmp.entity.config',),
+    'mibcompiler': ('pysmi.compiler', 'pysmi.parser', 'pysnmp.smi.compiler'),
+}
+
+ALL_GROUPS = tuple(sorted(HEAVY_MODULES))
+
+# (name, tool, argv, exit status, heavy module groups permitted)
+SCENARIOS = [
+    ('%s-help' % tool, tool, ['-h'], 1, ())
+    for tool in ('snmpget', 'snmpset', 'snmpwalk', 'snmpbulkwalk',
+                 'snmptable', 'snmptrap', 'snmptranslate')
+] + [
+    ('snmpget-version', 'snmpget', ['-V'], 1, ()),
+    ('snmptranslate-numeric', 'snmptranslate',
+     ['-On', 'SNMPv2-MIB::sysDescr.0'], 0, ()),
+    ('snmptranslate-details', 'snmptranslate',
+     ['-Td', 'SNMPv2-MIB::sysDescr'], 0, ()),
+    ('snmpget-v2c', 'snmpget',
+     ['-v2c', '-c', 'public', '127.0.0.1:{port}', 'sysDescr.0'], 0,
+     ('engine', 'crypto', 'transport', 'config')),
+    ('snmpget-v3', 'snmpget',
+     ['-v3', '-l', 'authPriv', '-u', 'usr', '-a', 'SHA', '-A', 'authkey1',
+      '-x', 'AES', '-X', 'privkey1', '127.0.0.1:{port}', 'sysDescr.0'], 0,
+     ('engine', 'crypto', 'transport', 'config')),
+]
+
+
+def runChild(tool, argv):
+    # Runs in a fresh process: time imports and tool run, report modules
+    startedAt = now()
+
+    module = importlib.import_module('snmpclitools.scripts.' + tool)
+
+    from snmpclitools.cli import app
+
+    imports = now() - startedAt
+
+    savedStdout, savedStderr = sys.stdout, sys.stderr
+
+    sys.stdout = sys.stderr = open(os.devnull, 'w')
+
+    try:
+        exitCode = app.run(module, None, argv)
+
+    finally:
+        sys.stdout.close()
+        sys.stdout, sys.stderr = savedStdout, savedStderr
+
+    total = now() - startedAt
+
+    groups = []
+
+    for group in ALL_GROUPS:
+        for prefix in HEAVY_MODULES[group]:
+            if [x for x in sys.modules
+                    if x == prefix or x.startswith(prefix + '.')]:
+                groups.append(group)
+                break
+
+    json.dump({'exitCode': exitCode, 'imports': imports, 'total': total,
+               'modules': len(sys.modules), 'groups': groups}, sys.stdout)
+
+
+def runScenario(tool, argv, env):
+    output = subprocess.check_output(
+        [sys.executable, os.path.abspath(__file__), '--child', tool] + argv,
+        env=env)
+
+    return json.loads(output.decode('utf-8'))
+
+
+def main():
+    if len(sys.argv) > 2 and sys.argv[1] == '--child':
+        runChild(sys.argv[2], sys.argv[3:])
+        return
+
+    parser = argparse.ArgumentParser(description='SNMP tools import targets')
+
+    parser.add_argument(
+        '-n', '--repetitions', type=int, default=5,
+        help='runs per scenario')
+    parser.add_argument(
+        '-p', '--port', type=int, default=1161,
+        help='UDP port of the stand-in agent')
+    parser.add_argument(
+        '-b', '--budget', type=float, default=0.1,
+        help='median tool module import time budget (seconds)')
+
+    args = parser.parse_args()
+
+    env = os.environ.copy()
+    env['PYTHONPATH'] = os.pathsep.join(
+        [startup.TOP_DIR] + [x for x in [env.get('PYTHONPATH')] if x])
+
+    env.pop('PYSNMPDAEMONSOCKET', None)
+
+    failures = []
+
+    agent = startup.startAgent(args.port)
+
+    try:
+        for name, tool, argv, exitCode, permitted in SCENARIOS:
+            argv = [x.format(port=args.port) for x in argv]
+
+            results = [runScenario(tool, argv, env)
+                       for _ in range(args.repetitions)]
+
+            imports = startup.summarize([x['imports'] for x in results])
+            total = startup.summarize([x['total'] for x in results])
+
+            groups = results[0]['groups']
+
+            sys.stdout.write(
+                '%-24s imports %.6f sec, total %.6f sec, %d modules, '
+                'heavy: %s\n' % (name, imports['median'], total['median'],
+                                 results[0]['modules'],
+                                 ','.join(groups) or 'none'))
+
+            exitCodes = [x['exitCode'] for x in results
+                         if x['exitCode'] != exitCode]
+
+            if exitCodes:
+                failures.append(
+                    '%s: exited with status %d, expected %d' % (
+                        name, exitCodes[0], exitCode))
+
+            unwanted = [x for x in groups if x not in permitted]
+
+            if unwanted:
+                failures.append(
+                    '%s: imports %s' % (name, ', '.join(unwanted)))
+
+            if imports['median'] > args.budget:
+                failures.append(
+                    '%s: imports take %.6f sec, budget is %.6f sec' % (
+                        name, imports['median'], args.budget))
+
+    finally:
+        agent.terminate()
+        agent.wait()
+
+    for failure in failures:
+        sys.stdout.write('FAILED %s\n' % failure)
+
+    sys.exit(failures and 1 or 0)
+
+
+if __name__ == '__main__':
+    main()
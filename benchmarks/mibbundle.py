@@ -0,0 +1,169 @@
+#
+# This file is part of snmpclitools software.
+#
+# Copyright (c) 2005-2019, Ilya Etingof <etingof@gmail.com>
+# License: http://snmplabs.com/snmpclitools/license.html
+#
+# MIB bundle benchmark.
+#
+# Writes a corpus of synthetic compiled MIB modules importing each other,
+# packs them into MIB bundle and loads all of them into fresh MIB builder
+# out of the directory and out of the bundle several times. Exits with
+# non-zero status if the two load different MIB symbols.
+#
+# Usage: python benchmarks/mibbundle.py [-c COUNT] [-o OBJECTS] [-r RUNS]
+#
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+from timeit import default_timer as now
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+sys.path.insert(0, os.path.dirname(BENCHMARKS_DIR))
+
+from pysnmp.smi import builder
+
+from snmpclitools.cli import mibbundle
+
+MIB_HEADER = """\
+Integer32, MibIdentifier, MibScalar = mibBuilder.importSymbols(
+    "SNMPv2-SMI", "Integer32", "MibIdentifier", "MibScalar")
+%(imports)s
+bundleMib%(index)d = MibIdentifier((1, 3, 6, 1, 4, 1, 99999, %(index)d))
+"""
+
+MIB_OBJECT = """\
+bundleMib%(index)dObject%(object)d = MibScalar(
+    (1, 3, 6, 1, 4, 1, 99999, %(index)d, %(object)d),
+    Integer32()).setMaxAccess("readonly")
+if mibBuilder.loadTexts:
+    bundleMib%(index)dObject%(object)d.setDescription(
+        "Synthetic scalar %(object)d of MIB module %(index)d")
+"""
+
+MIB_FOOTER = """\
+mibBuilder.exportSymbols("%(name)s", %(exports)s)
+"""
+
+
+def getMibName(index):
+    return 'BUNDLE-MIB-%d' % index
+
+
+def generateMibs(directory, count, objects):
+    """Write synthetic compiled MIB modules, return their names"""
+    mibNames = []
+
+    for index in range(count):
+        if index:
+            parent = (index - 1) // 2
+            imports = ('bundleMib%d, = mibBuilder.importSymbols('
+                       '"%s", "bundleMib%d")\n' % (
+                           parent, getMibName(parent), parent))
+
+        else:
+            imports = ''
+
+        text = MIB_HEADER % dict(index=index, imports=imports)
+
+        exports = ['bundleMib%d=bundleMib%d' % (index, index)]
+
+        for obj in range(1, objects + 1):
+            text += MIB_OBJECT % dict(index=index, object=obj)
+            exports.append('bundleMib%dObject%d=bundleMib%dObject%d' % (
+                index, obj, index, obj))
+
+        mibName = getMibName(index)
+
+        text += MIB_FOOTER % dict(name=mibName, exports=', '.join(exports))
+
+        with open(os.path.join(directory, mibName + '.py'), 'w') as f:
+            f.write(text)
+
+        mibNames.append(mibName)
+
+    return mibNames
+
+
+def loadMibs(mibSource, mibNames):
+    """Load MIBs into fresh MIB builder, return loaded MIB symbols"""
+    mibBuilder = builder.MibBuilder()
+    mibBuilder.addMibSources(mibSource)
+    mibBuilder.loadModules(*mibNames)
+
+    return dict([(x, sorted(mibBuilder.mibSymbols[x]))
+                 for x in mibBuilder.mibSymbols])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='MIB bundle benchmark')
+
+    parser.add_argument(
+        '-c', '--count', type=int, default=600,
+        help='number of synthetic MIB modules to generate')
+
+    parser.add_argument(
+        '-o', '--objects', type=int, default=30,
+        help='number of MIB objects per MIB module')
+
+    parser.add_argument(
+        '-r', '--runs', type=int, default=3,
+        help='number of times to load MIB modules')
+
+    args = parser.parse_args()
+
+    workDir = tempfile.mkdtemp()
+
+    failures = []
+
+    try:
+        mibDir = os.path.join(workDir, 'mibs')
+        os.mkdir(mibDir)
+
+        mibNames = generateMibs(mibDir, args.count, args.objects)
+
+        bundleFile = os.path.join(workDir, 'bundle' + mibbundle.BUNDLE_SUFFIX)
+
+        startedAt = now()
+
+        mibbundle.packMibs(
+            bundleFile, (builder.DirMibSource(mibDir).init(),), mibNames)
+
+        sys.stdout.write('%d MIB modules packed in %.6f sec, %d bytes\n' % (
+            len(mibNames), now() - startedAt, os.stat(bundleFile).st_size))
+
+        results = {}
+
+        for run, mibSource in (
+                ('directory', lambda: builder.DirMibSource(mibDir)),
+                ('bundle', lambda: mibbundle.MibBundleSource(bundleFile))):
+            took = []
+
+            for _ in range(args.runs):
+                startedAt = now()
+
+                results[run] = loadMibs(mibSource(), mibNames)
+
+                took.append(now() - startedAt)
+
+            sys.stdout.write(
+                '%-10s %d MIB modules loaded in %.6f sec (best of %d)\n' % (
+                    run, len(mibNames), min(took), args.runs))
+
+        if results['directory'] != results['bundle']:
+            failures.append('different MIB symbols loaded out of bundle')
+
+    finally:
+        shutil.rmtree(workDir, ignore_errors=True)
+
+    for failure in failures:
+        sys.stdout.write('FAILED %s\n' % failure)
+
+    sys.exit(failures and 1 or 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,379 @@
+#
+# This file is part of snmpclitools software.
+#
+# Copyright (c) 2005-2019, Ilya Etingof <etingof@gmail.com>
+# License: http://snmplabs.com/snmpclitools/license.html
+#
+# MIB cache benchmark.
+#
+# Generates a corpus of synthetic ASN.1 MIBs, serves it over HTTP from
+# loopback interface and compiles it several times, every time into an
+# empty destination directory:
+#
+#   cold    - MIB cache is empty, MIBs are fetched over HTTP
+#   warm    - MIBs are served from MIB cache
+#   empty   - offline mode with a fresh, empty MIB cache
+#   offline - same as warm in offline mode with HTTP server shut down
+#   prewarm - fresh MIB cache is filled from a local directory
+#             of ASN.1 MIBs, offline mode
+#
+# Then runs snmptranslate with --mib-offline against an empty MIB cache.
+#
+# Exits with non-zero status if any MIB is fetched over HTTP more
+# than once, any run but empty fails to compile all MIBs, the empty
+# run compiles or fetches any MIB or fails other than with a pysnmp
+# error, or snmptranslate does not fail with an error message.
+#
+# Usage: python benchmarks/mibcache.py [-c COUNT]
+#
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+from timeit import default_timer as now
+
+try:
+    from http import server as httpserver
+
+except ImportError:
+    import SimpleHTTPServer as httpserver
+
+try:
+    from socketserver import ThreadingMixIn
+    from socketserver import TCPServer
+
+except ImportError:
+    from SocketServer import ThreadingMixIn
+    from SocketServer import TCPServer
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+sys.path.insert(0, os.path.dirname(BENCHMARKS_DIR))
+
+# Bare minimum of base MIBs pysmi needs to compile the corpus
+BASE_MIBS = {
+    'SNMPv2-SMI': """\
+SNMPv2-SMI DEFINITIONS ::= BEGIN
+
+org            OBJECT IDENTIFIER ::= { iso 3 }
+dod            OBJECT IDENTIFIER ::= { org 6 }
+internet       OBJECT IDENTIFIER ::= { dod 1 }
+private        OBJECT IDENTIFIER ::= { internet 4 }
+enterprises    OBJECT IDENTIFIER ::= { private 1 }
+
+Integer32 ::= INTEGER (-2147483648..2147483647)
+
+MODULE-IDENTITY MACRO ::=
+BEGIN
+    TYPE NOTATION ::= "LAST-UPDATED" value(Update ExtUTCTime)
+    VALUE NOTATION ::= value(VALUE OBJECT IDENTIFIER)
+END
+
+OBJECT-TYPE MACRO ::=
+BEGIN
+    TYPE NOTATION ::= "SYNTAX" Syntax
+    VALUE NOTATION ::= value(VALUE ObjectName)
+END
+
+END
+""",
+    'SNMPv2-TC': """\
+SNMPv2-TC DEFINITIONS ::= BEGIN
+
+END
+""",
+    'SNMPv2-CONF': """\
+SNMPv2-CONF DEFINITIONS ::= BEGIN
+
+END
+"""
+}
+
+MIB_TEMPLATE = """\
+%(name)s DEFINITIONS ::= BEGIN
+
+IMPORTS
+    MODULE-IDENTITY, OBJECT-TYPE, Integer32, enterprises
+        FROM SNMPv2-SMI%(imports)s;
+
+%(identity)s MODULE-IDENTITY
+    LAST-UPDATED "201910010000Z"
+    ORGANIZATION "snmpclitools"
+    CONTACT-INFO "snmpclitools benchmarks"
+    DESCRIPTION "Synthetic MIB module %(index)d"
+    ::= { %(parent)s %(arc)d }
+
+%(identity)sValue OBJECT-TYPE
+    SYNTAX      Integer32
+    MAX-ACCESS  read-only
+    STATUS      current
+    DESCRIPTION "Synthetic scalar %(index)d"
+    ::= { %(identity)s 1 }
+
+END
+"""
+
+
+def getMibName(index):
+    return 'BENCHMARK-MIB-%d' % index
+
+
+def getDependencies(index):
+    # Binary tree of modules with some cross-links, so that most of
+    # the modules at the same depth are independent of each other
+    if not index:
+        return []
+
+    dependencies = [(index - 1) // 2]
+
+    if index > 2 and index // 3 not in dependencies:
+        dependencies.append(index // 3)
+
+    return dependencies
+
+
+def generateMibs(directory, count):
+    """Write synthetic ASN.1 MIBs into directory, return their names"""
+    for mibName, text in BASE_MIBS.items():
+        with open(os.path.join(directory, mibName), 'w') as f:
+            f.write(text)
+
+    mibNames = []
+
+    for index in range(count):
+        dependencies = getDependencies(index)
+
+        imports = ''.join(
+            ['\n    benchmarkMib%d\n        FROM %s' % (x, getMibName(x))
+             for x in dependencies])
+
+        if dependencies:
+            parent = 'benchmarkMib%d' % dependencies[0]
+            arc = index + 2
+
+        else:
+            parent = 'enterprises'
+            arc = 99999
+
+        mibName = getMibName(index)
+
+        with open(os.path.join(directory, mibName), 'w') as f:
+            f.write(MIB_TEMPLATE % dict(
+                name=mibName, imports=imports, index=index,
+                identity='benchmarkMib%d' % index, parent=parent, arc=arc))
+
+        mibNames.append(mibName)
+
+    return mibNames
+
+
+class HttpServer(ThreadingMixIn, TCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+
+def startHttpServer(directory, fetches):
+    """Serve directory over HTTP on loopback, count successful fetches"""
+
+    class RequestHandler(httpserver.SimpleHTTPRequestHandler):
+        def translate_path(self, path):
+            return os.path.join(directory, path.strip('/'))
+
+        def send_response(self, code, *args):
+            if code == 200:
+                mibName = self.path.strip('/')
+                fetches[mibName] = fetches.get(mibName, 0) + 1
+
+            httpserver.SimpleHTTPRequestHandler.send_response(
+                self, code, *args)
+
+        def log_message(self, *args):
+            pass
+
+    server = HttpServer(('127.0.0.1', 0), RequestHandler)
+
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+
+    return server
+
+
+def compileMibs(mibNames, sources, offline):
+    """Load MIBs compiling them into empty directory.
+
+    Return MIBs failed to compile and unexpected errors.
+    """
+    from pysnmp import error
+    from pysnmp.smi import builder
+
+    from snmpclitools.cli import mibview
+
+    destination = tempfile.mkdtemp()
+
+    try:
+        mibBuilder = builder.MibBuilder()
+
+        mibBuilder.setMibCompiler(
+            mibview.LazyMibCompiler(mibBuilder,
+                                    sources=sources,
+                                    borrowers=[],
+                                    destination=destination,
+                                    offline=offline),
+            destination
+        )
+
+        failures = []
+        errors = []
+
+        for mibName in mibNames:
+            try:
+                mibBuilder.loadModules(mibName)
+
+            except error.PySnmpError:
+                failures.append(mibName)
+
+            except Exception as exc:
+                failures.append(mibName)
+                errors.append('%s: %r' % (mibName, exc))
+
+        return failures, errors
+
+    finally:
+        shutil.rmtree(destination, ignore_errors=True)
+
+
+def runTool(tool, args, env):
+    """Run SNMP tool locally, return its exit status and stderr"""
+    topDir = os.path.dirname(BENCHMARKS_DIR)
+
+    env = dict(os.environ, **env)
+    env.pop('PYSNMPDAEMONSOCKET', None)
+    env['PYTHONPATH'] = os.pathsep.join(
+        [topDir] + [x for x in [env.get('PYTHONPATH')] if x])
+
+    child = subprocess.Popen(
+        [sys.executable, os.path.join(topDir, 'scripts', tool + '.py')] + args,
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE, env=env)
+
+    stdout, stderr = child.communicate()
+
+    return child.returncode, stderr.decode('utf-8', 'replace')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='MIB cache benchmark')
+
+    parser.add_argument(
+        '-c', '--count', type=int, default=50,
+        help='number of synthetic MIBs to generate')
+
+    args = parser.parse_args()
+
+    workDir = tempfile.mkdtemp()
+
+    try:
+        asn1Dir = os.path.join(workDir, 'asn1')
+        os.mkdir(asn1Dir)
+
+        mibNames = generateMibs(asn1Dir, args.count)
+
+        os.environ['PYSNMPCACHEDIR'] = os.path.join(workDir, 'cache')
+
+        from snmpclitools.cli import mibcache
+
+        fetches = {}
+
+        server = startHttpServer(asn1Dir, fetches)
+
+        sources = ['http://127.0.0.1:%d/@mib@' % server.server_address[1]]
+
+        failures = []
+
+        cacheDir = os.environ['PYSNMPCACHEDIR']
+
+        for run, offline in (('cold', False), ('warm', False),
+                             ('empty', True), ('offline', True),
+                             ('prewarm', True)):
+            if run == 'empty':
+                os.environ['PYSNMPCACHEDIR'] = os.path.join(
+                    workDir, 'empty')
+
+            elif run == 'offline':
+                os.environ['PYSNMPCACHEDIR'] = cacheDir
+
+                server.shutdown()
+                server.server_close()
+
+            elif run == 'prewarm':
+                os.environ['PYSNMPCACHEDIR'] = os.path.join(
+                    workDir, 'prewarmed')
+
+                mibcache.getMibCache().warm(asn1Dir)
+
+            fetched = sum(fetches.values())
+
+            startedAt = now()
+
+            notCompiled, errors = compileMibs(mibNames, sources, offline)
+
+            took = now() - startedAt
+
+            fetched = sum(fetches.values()) - fetched
+
+            sys.stdout.write(
+                '%-8s %d MIBs compiled in %.6f sec, %d fetched over HTTP\n' % (
+                    run, len(mibNames) - len(notCompiled), took, fetched))
+
+            for err in errors:
+                failures.append('%s: %s' % (run, err))
+
+            if run == 'empty':
+                if len(notCompiled) < len(mibNames):
+                    failures.append('%s: %d MIBs compiled' % (
+                        run, len(mibNames) - len(notCompiled)))
+
+                if fetched:
+                    failures.append('%s: %d MIBs fetched over HTTP' % (
+                        run, fetched))
+
+            elif notCompiled:
+                failures.append('%s: %s not compiled' % (
+                    run, ', '.join(notCompiled)))
+
+        # Keep snmptranslate off user's MIB cache and compiled MIBs
+        exitCode, stderr = runTool(
+            'snmptranslate',
+            ['--mib-offline', '-m', mibNames[0], '1.3.6.1.2.1.1.1'],
+            {'PYSNMPCACHEDIR': os.path.join(workDir, 'tool'),
+             'HOME': workDir})
+
+        sys.stdout.write(
+            'tool     snmptranslate --mib-offline exited with status %d: '
+            '%s\n' % (exitCode, stderr.split('\n')[0][:60]))
+
+        if not exitCode or not stderr.startswith('Error: '):
+            failures.append('tool: no error on missing MIB in offline mode')
+
+        if 'Traceback' in stderr:
+            failures.append('tool: traceback on missing MIB in offline mode')
+
+        for mibName in sorted(fetches):
+            if fetches[mibName] > 1:
+                failures.append('%s fetched %d times' % (
+                    mibName, fetches[mibName]))
+
+    finally:
+        shutil.rmtree(workDir, ignore_errors=True)
+
+    for failure in failures:
+        sys.stdout.write('FAILED %s\n' % failure)
+
+    sys.exit(failures and 1 or 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,131 @@
+#
+# This file is part of snmpclitools software.
+#
+# Copyright (c) 2005-2019, Ilya Etingof <etingof@gmail.com>
+# License: http://snmplabs.com/snmpclitools/license.html
+#
+# Parallel MIB compiler benchmark.
+#
+# Generates a corpus of synthetic ASN.1 MIBs importing each other and
+# compiles all of them, every time into an empty destination directory:
+#
+#   load     - MIBs are loaded one after another, MIB builder compiling
+#              each MIB missing, as `-m MIB:MIB:...` does by default
+#   serial   - parallel MIB compiler running a single process
+#   parallel - parallel MIB compiler running given number of processes
+#
+# Exits with non-zero status if any run fails to compile all MIBs.
+#
+# Usage: python benchmarks/mibcompile.py [-c COUNT] [-j JOBS]
+#
+import argparse
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+from timeit import default_timer as now
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+sys.path.insert(0, os.path.dirname(BENCHMARKS_DIR))
+sys.path.insert(0, BENCHMARKS_DIR)
+
+from mibcache import generateMibs
+
+
+def loadMibs(mibNames, sources, destination, jobs):
+    from pysnmp.smi import builder
+
+    from snmpclitools.cli import mibview
+
+    mibBuilder = builder.MibBuilder()
+
+    mibBuilder.setMibCompiler(
+        mibview.LazyMibCompiler(mibBuilder,
+                                sources=sources,
+                                borrowers=[],
+                                destination=destination),
+        destination
+    )
+
+    for mibName in mibNames:
+        try:
+            mibBuilder.loadModules(mibName)
+
+        except Exception:
+            pass
+
+
+def compileMibs(mibNames, sources, destination, jobs):
+    from snmpclitools.cli import mibcompiler
+
+    mibcompiler.compileMibs(mibNames, sources, [], destination, jobs=jobs)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Parallel MIB compiler benchmark')
+
+    parser.add_argument(
+        '-c', '--count', type=int, default=300,
+        help='number of synthetic MIBs to generate')
+    parser.add_argument(
+        '-j', '--jobs', type=int, default=multiprocessing.cpu_count(),
+        help='number of MIB compiler processes')
+
+    args = parser.parse_args()
+
+    workDir = tempfile.mkdtemp()
+
+    failures = []
+
+    try:
+        asn1Dir = os.path.join(workDir, 'asn1')
+        os.mkdir(asn1Dir)
+
+        mibNames = generateMibs(asn1Dir, args.count)
+
+        os.environ['PYSNMPCACHEDIR'] = os.path.join(workDir, 'cache')
+
+        sources = ['file://%s' % asn1Dir]
+
+        sys.stdout.write('%d MIBs, %d CPUs\n' % (
+            len(mibNames), multiprocessing.cpu_count()))
+
+        timings = {}
+
+        for run, fun, jobs in (('load', loadMibs, 1),
+                               ('serial', compileMibs, 1),
+                               ('parallel', compileMibs, args.jobs)):
+            destination = os.path.join(workDir, run)
+
+            startedAt = now()
+
+            fun(mibNames, sources, destination, jobs)
+
+            timings[run] = took = now() - startedAt
+
+            compiled = [x for x in mibNames
+                        if os.path.exists(os.path.join(destination, x + '.py'))]
+
+            sys.stdout.write(
+                '%-8s %d processes, %d MIBs compiled in %.6f sec '
+                '(x%.2f)\n' % (run, jobs, len(compiled), took,
+                               timings['load'] / took))
+
+            if len(compiled) != len(mibNames):
+                failures.append('%s: %d MIBs not compiled' % (
+                    run, len(mibNames) - len(compiled)))
+
+    finally:
+        shutil.rmtree(workDir, ignore_errors=True)
+
+    for failure in failures:
+        sys.stdout.write('FAILED %s\n' % failure)
+
+    sys.exit(failures and 1 or 0)
+
+
+if __name__ == '__main__':
+    main()
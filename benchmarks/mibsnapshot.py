@@ -0,0 +1,170 @@
+#
+# This file is part of snmpclitools software.
+#
+# Copyright (c) 2005-2019, Ilya Etingof <etingof@gmail.com>
+# License: http://snmplabs.com/snmpclitools/license.html
+#
+# MIB snapshot benchmark.
+#
+# Writes a corpus of synthetic compiled MIB modules importing each other
+# and loads the leaf ones (pulling in the rest) into fresh MIB builder
+# several times: with no snapshot, taking the snapshot and restoring it.
+# Then touches one of the MIB modules making sure the snapshot is not
+# used anymore. Exits with non-zero status if MIB symbols restored differ
+# from MIB symbols loaded or stale snapshot is restored.
+#
+# Usage: python benchmarks/mibsnapshot.py [-c COUNT] [-o OBJECTS] [-r RUNS]
+#
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+from timeit import default_timer as now
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+sys.path.insert(0, os.path.dirname(BENCHMARKS_DIR))
+
+from pysnmp.smi import builder
+
+from snmpclitools.cli import mibsnapshot
+
+MIB_HEADER = """\
+Integer32, MibIdentifier, MibScalar = mibBuilder.importSymbols(
+    "SNMPv2-SMI", "Integer32", "MibIdentifier", "MibScalar")
+%(imports)s
+snapshotMib%(index)d = MibIdentifier((1, 3, 6, 1, 4, 1, 99996, %(index)d))
+"""
+
+MIB_OBJECT = """\
+snapshotMib%(index)dObject%(object)d = MibScalar(
+    (1, 3, 6, 1, 4, 1, 99996, %(index)d, %(object)d),
+    Integer32()).setMaxAccess("readonly")
+"""
+
+MIB_FOOTER = """\
+mibBuilder.exportSymbols("%(name)s", %(exports)s)
+"""
+
+
+def getMibName(index):
+    return 'SNAPSHOT-MIB-%d' % index
+
+
+def generateMibs(directory, count, objects):
+    """Write synthetic compiled MIB modules, return names of leaf ones"""
+    for index in range(count):
+        if index:
+            parent = (index - 1) // 2
+            imports = ('snapshotMib%d, = mibBuilder.importSymbols('
+                       '"%s", "snapshotMib%d")\n' % (
+                           parent, getMibName(parent), parent))
+
+        else:
+            imports = ''
+
+        text = MIB_HEADER % dict(index=index, imports=imports)
+
+        exports = ['snapshotMib%d=snapshotMib%d' % (index, index)]
+
+        for obj in range(1, objects + 1):
+            text += MIB_OBJECT % dict(index=index, object=obj)
+            exports.append('snapshotMib%dObject%d=snapshotMib%dObject%d' % (
+                index, obj, index, obj))
+
+        text += MIB_FOOTER % dict(name=getMibName(index),
+                                  exports=', '.join(exports))
+
+        with open(os.path.join(directory, getMibName(index) + '.py'), 'w') as f:
+            f.write(text)
+
+    return [getMibName(x) for x in range(count // 2, count)]
+
+
+def loadMibs(mibDir, mibNames, snapshot):
+    """Load MIBs into fresh MIB builder, return loaded MIB symbols"""
+    mibBuilder = builder.MibBuilder()
+    mibBuilder.addMibSources(builder.DirMibSource(mibDir))
+
+    if snapshot:
+        mibsnapshot.loadModules(mibBuilder, *mibNames)
+
+    else:
+        mibBuilder.loadModules(*mibNames)
+
+    return dict([(x, sorted(mibBuilder.mibSymbols[x]))
+                 for x in mibBuilder.mibSymbols])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='MIB snapshot benchmark')
+
+    parser.add_argument(
+        '-c', '--count', type=int, default=600,
+        help='number of synthetic MIB modules to generate')
+
+    parser.add_argument(
+        '-o', '--objects', type=int, default=30,
+        help='number of MIB objects per MIB module')
+
+    parser.add_argument(
+        '-r', '--runs', type=int, default=3,
+        help='number of times to restore MIB modules')
+
+    args = parser.parse_args()
+
+    workDir = tempfile.mkdtemp()
+
+    failures = []
+
+    try:
+        os.environ['PYSNMPCACHEDIR'] = os.path.join(workDir, 'cache')
+
+        mibDir = os.path.join(workDir, 'mibs')
+        os.mkdir(mibDir)
+
+        mibNames = generateMibs(mibDir, args.count, args.objects)
+
+        results = {}
+
+        for run, snapshot, runs in (('no snapshot', False, args.runs),
+                                    ('snapshot', True, 1),
+                                    ('restore', True, args.runs)):
+            took = []
+
+            for _ in range(runs):
+                startedAt = now()
+
+                results[run] = loadMibs(mibDir, mibNames, snapshot)
+
+                took.append(now() - startedAt)
+
+            sys.stdout.write(
+                '%-12s %d MIB modules loaded in %.6f sec (best of %d)\n' % (
+                    run, len(results[run]), min(took), runs))
+
+        if results['no snapshot'] != results['restore']:
+            failures.append('different MIB symbols restored from snapshot')
+
+        # Snapshot goes stale once any MIB module it holds changes
+        mibBuilder = builder.MibBuilder()
+        mibBuilder.addMibSources(builder.DirMibSource(mibDir))
+
+        with open(os.path.join(mibDir, getMibName(0) + '.py'), 'a') as f:
+            f.write('\n')
+
+        if mibsnapshot.restore(mibBuilder, mibNames):
+            failures.append('stale snapshot restored')
+
+    finally:
+        shutil.rmtree(workDir, ignore_errors=True)
+
+    for failure in failures:
+        sys.stdout.write('FAILED %s\n' % failure)
+
+    sys.exit(failures and 1 or 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,220 @@
+#
+# This file is part of snmpclitools software.
+#
+# Copyright (c) 2005-2019, Ilya Etingof <etingof@gmail.com>
+# License: http://snmplabs.com/snmpclitools/license.html
+#
+# MIB texts loading benchmark.
+#
+# Writes a corpus of synthetic compiled MIB modules with DESCRIPTION
+# texts of realistic size and loads all of them (like -m ALL does) into
+# fresh MIB builder with and without MIB texts, measuring load time and
+# memory taken by loaded MIBs. Then reports full details (-Td) of a MIB
+# object loading texts of just its MIB module. Exits with non-zero
+# status if the texts reported differ from the texts loaded up front.
+#
+# Usage: python benchmarks/mibtexts.py [-c COUNT] [-o OBJECTS] [-r RUNS]
+#
+import argparse
+import gc
+import os
+import shutil
+import sys
+import tempfile
+from timeit import default_timer as now
+
+try:
+    import tracemalloc
+
+except ImportError:
+    tracemalloc = None
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+sys.path.insert(0, os.path.dirname(BENCHMARKS_DIR))
+
+from pysnmp.smi import builder
+from pysnmp.smi import view
+
+from snmpclitools.cli import mibview
+from snmpclitools.scripts import snmptranslate
+
+MIB_HEADER = """\
+Integer32, ModuleIdentity, MibScalar = mibBuilder.importSymbols(
+    "SNMPv2-SMI", "Integer32", "ModuleIdentity", "MibScalar")
+textsMib%(index)d = ModuleIdentity((1, 3, 6, 1, 4, 1, 99998, %(index)d))
+if mibBuilder.loadTexts:
+    textsMib%(index)d.setDescription("%(text)s")
+"""
+
+MIB_OBJECT = """\
+textsMib%(index)dObject%(object)d = MibScalar(
+    (1, 3, 6, 1, 4, 1, 99998, %(index)d, %(object)d),
+    Integer32()).setMaxAccess("readonly")
+if mibBuilder.loadTexts:
+    textsMib%(index)dObject%(object)d.setStatus("current")
+if mibBuilder.loadTexts:
+    textsMib%(index)dObject%(object)d.setDescription("%(text)s")
+"""
+
+MIB_FOOTER = """\
+mibBuilder.exportSymbols("%(name)s", %(exports)s)
+"""
+
+# About the size of a typical DESCRIPTION clause
+TEXT = ('Synthetic MIB object %d of MIB module %d. This value is '
+        'maintained for the sole purpose of taking up as much memory '
+        'as DESCRIPTION clauses of real-world MIB objects usually do, '
+        'including the notes on how the value is to be interpreted by '
+        'the management applications and what happens on agent restart.')
+
+
+def getMibName(index):
+    return 'TEXTS-MIB-%d' % index
+
+
+def generateMibs(directory, count, objects):
+    """Write synthetic compiled MIB modules, return their names"""
+    mibNames = []
+
+    for index in range(count):
+        text = MIB_HEADER % dict(index=index, text=TEXT % (0, index))
+
+        exports = ['textsMib%d=textsMib%d' % (index, index)]
+
+        for obj in range(1, objects + 1):
+            text += MIB_OBJECT % dict(
+                index=index, object=obj, text=TEXT % (obj, index))
+            exports.append('textsMib%dObject%d=textsMib%dObject%d' % (
+                index, obj, index, obj))
+
+        mibName = getMibName(index)
+
+        text += MIB_FOOTER % dict(name=mibName, exports=', '.join(exports))
+
+        with open(os.path.join(directory, mibName + '.py'), 'w') as f:
+            f.write(text)
+
+        mibNames.append(mibName)
+
+    return mibNames
+
+
+def loadMibs(mibDir, loadTexts):
+    """Load all MIBs into fresh MIB builder, return it and load time"""
+    mibBuilder = builder.MibBuilder()
+    mibBuilder.loadTexts = loadTexts
+    mibBuilder.addMibSources(builder.DirMibSource(mibDir))
+
+    startedAt = now()
+
+    mibBuilder.loadModules()
+
+    return mibBuilder, now() - startedAt
+
+
+def measureMemory(mibDir, loadTexts):
+    """Return memory taken by MIBs loaded into fresh MIB builder"""
+    if tracemalloc is None:
+        return 0
+
+    gc.collect()
+
+    tracemalloc.start()
+
+    try:
+        mibBuilder, took = loadMibs(mibDir, loadTexts)
+
+        gc.collect()
+
+        return tracemalloc.get_traced_memory()[0]
+
+    finally:
+        tracemalloc.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='MIB texts loading benchmark')
+
+    parser.add_argument(
+        '-c', '--count', type=int, default=300,
+        help='number of synthetic MIB modules to generate')
+
+    parser.add_argument(
+        '-o', '--objects', type=int, default=50,
+        help='number of MIB objects per MIB module')
+
+    parser.add_argument(
+        '-r', '--runs', type=int, default=3,
+        help='number of times to load MIB modules')
+
+    args = parser.parse_args()
+
+    workDir = tempfile.mkdtemp()
+
+    failures = []
+
+    try:
+        mibDir = os.path.join(workDir, 'mibs')
+        os.mkdir(mibDir)
+
+        mibNames = generateMibs(mibDir, args.count, args.objects)
+
+        loaded = {}
+        took = {}
+
+        for _ in range(args.runs):
+            for run, loadTexts in (('texts', True), ('no texts', False)):
+                loaded[run], t = loadMibs(mibDir, loadTexts)
+
+                took[run] = min(took.get(run, t), t)
+
+        for run, loadTexts in (('texts', True), ('no texts', False)):
+            memory = measureMemory(mibDir, loadTexts)
+
+            sys.stdout.write(
+                '%-9s %d MIB modules loaded in %.6f sec (best of %d), '
+                '%.1f MB\n' % (run, len(mibNames), took[run], args.runs,
+                               memory / 1048576.0))
+
+        # Full details of one MIB object, texts loaded on demand
+        mibViewProxy = snmptranslate.MibViewProxy(
+            view.MibViewController(loaded['no texts']))
+
+        mibViewProxy.translateFullDetails = True
+
+        engine = mibview.MibEngine()
+        engine.getMibBuilder().setMibSources(
+            *loaded['no texts'].getMibSources())
+
+        mibViewProxy.mibTextsBuilder = mibview.getMibTextsBuilder(engine)
+
+        modName = mibNames[-1]
+        symName = 'textsMib%dObject1' % (args.count - 1)
+
+        mibNode, = loaded['no texts'].importSymbols(modName, symName)
+
+        startedAt = now()
+
+        mibNode = mibViewProxy.getMibNodeTexts(modName, symName, mibNode)
+
+        sys.stdout.write('-Td       %s::%s texts loaded in %.6f sec\n' % (
+            modName, symName, now() - startedAt))
+
+        expected, = loaded['texts'].importSymbols(modName, symName)
+
+        if mibNode.getDescription() != expected.getDescription():
+            failures.append('%s::%s texts differ' % (modName, symName))
+
+    finally:
+        shutil.rmtree(workDir, ignore_errors=True)
+
+    for failure in failures:
+        sys.stdout.write('FAILED %s\n' % failure)
+
+    sys.exit(failures and 1 or 0)
+
+
+if __name__ == '__main__':
+    main()
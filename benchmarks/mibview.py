@@ -0,0 +1,466 @@
+#
+# This file is part of snmpclitools software.
+#
+# Copyright (c) 2005-2019, Ilya Etingof <etingof@gmail.com>
+# License: http://snmplabs.com/snmpclitools/license.html
+#
+# MIB view name resolution and output formatting benchmark.
+#
+# Synthesizes a table walk over every OID known to the loaded MIBs
+# and times OID name resolution and complete varbind formatting done
+# through MIB view controller, through precompiled OID index and with
+# OID cache of MIB view proxy on top of it. Then compares compiled
+# varbind formatter against reference one, testing output options on
+# every varbind, for a number of output options combinations. Finally
+# times machine-readable (JSON and CSV) output along with parsing it
+# back, against parsing text output with regular expression.
+# Exits with non-zero status if any of these produce different output.
+#
+# Usage: python benchmarks/mibview.py [-m MIB[:...]] [-r ROWS] [-n REPETITIONS]
+#
+import argparse
+import csv
+import json
+import os
+import re
+import shutil
+import sys
+import tempfile
+from timeit import default_timer as now
+
+from pyasn1.type import namedval
+from pyasn1.type import univ
+from pysnmp.proto import rfc1902
+from pysnmp.smi.error import NoSuchObjectError
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+sys.path.insert(0, os.path.dirname(BENCHMARKS_DIR))
+
+from snmpclitools.cli import base
+from snmpclitools.cli import mibview
+from snmpclitools.cli import oidindex
+
+# Output options (as in -O) combinations to compare formatters at
+OUTPUT_OPTIONS = ('', 'q', 'Q', 'f', 's', 'S', 'n', 'e', 'b', 'E', 'X',
+                  'v', 'U', 't', 'fbU', 'sXQe', 'SEq', 'nv')
+
+# Instance OID arcs of table rows, printable ASCII but space
+FIRST_ROW_ARC = 33
+LAST_ROW_ARC = 126
+
+
+class ReferenceMibViewProxy(mibview.MibViewProxy):
+    """Formats varbinds testing output options on every varbind"""
+    intValue = univ.Integer()
+    timeValue = rfc1902.TimeTicks()
+    oidValue = univ.ObjectIdentifier()
+    bitsValue = rfc1902.Bits()
+
+    def getPrettyOidVal(self, mibViewController, oid, val):
+        entry = None
+
+        if self.oidIndex is not None:
+            entry, suffix = self.oidIndex.lookup(oid)
+
+        if entry is None:
+            prefix, label, suffix = mibViewController.getNodeName(oid)
+
+        else:
+            prefix, label = entry.name, entry.label
+
+        mibObject = self.getMibObject(mibViewController, prefix, label, entry)
+
+        out = ''
+
+        if self.buildObjectName:
+            out = mibObject.name
+
+            if suffix:
+                if suffix == (0,):
+                    out += '.0'
+
+                else:
+                    rowNode = mibObject.getRowNode(mibViewController)
+
+                    if self.buildNumericIndices:
+                        out += '.' + '.'.join([str(x) for x in suffix])
+
+                    else:
+                        try:
+                            for i in rowNode.getIndicesFromInstId(suffix):
+                                if self.buildEscQuotes:
+                                    out += '.\\\"%s\\\"' % i.prettyOut(i)
+
+                                elif self.buildSquareBrackets:
+                                    out += '.[%s]' % i.prettyOut(i)
+
+                                else:
+                                    out += '.\"%s\"' % i.prettyOut(i)
+
+                        except Exception:
+                            out += '.' + '.'.join([str(x) for x in suffix])
+
+        if self.buildObjectName and self.buildValue:
+            if self.buildEqualSign:
+                out += ' = '
+
+            else:
+                out += ' '
+
+        if self.buildValue:
+            if isinstance(val, univ.Null):
+                return out + val.prettyPrint()
+
+            syntax = mibObject.syntax
+
+            if syntax is None:
+                syntax = val
+
+            if self.buildTypeInfo:
+                out += mibObject.typeInfo or '%s: ' % syntax.__class__.__name__
+
+            if self.buildRawVals:
+                out += str(val)
+
+            elif self.buildHexVals:
+                if self.intValue.isSuperTypeOf(val):
+                    out += '%x' % int(val)
+
+                elif self.timeValue.isSameTypeWith(val):
+                    out += '%x' % int(val)
+
+                elif self.oidValue.isSuperTypeOf(val):
+                    out += ' '.join(['%x' % x for x in tuple(val)])
+
+                else:
+                    out += ' '.join(['%.2x' % x for x in val.asNumbers()])
+
+            elif self.timeValue.isSameTypeWith(val):
+                if self.buildRawTimeTicks:
+                    out += str(int(val))
+
+                else:
+                    val = int(val)
+                    d, m = divmod(val, 8640000)
+                    out += '%d days ' % d
+                    d, m = divmod(m, 360000)
+                    out += '%d:' % d
+                    d, m = divmod(m, 6000)
+                    out += '%d:' % d
+                    d, m = divmod(m, 100)
+                    out += '%d.%d' % (d, m)
+
+            elif self.oidValue.isSuperTypeOf(val):
+                oid, label, suffix = (
+                    self.oidIndex or mibViewController).getNodeName(val)
+                out += '.'.join(label + tuple([str(x) for x in suffix]))
+
+            elif (not self.buildEnums and
+                  (self.intValue.isSuperTypeOf(val) or
+                   self.bitsValue.isSuperTypeOf(val))):
+                out += syntax.clone(
+                    val, namedValues=namedval.NamedValues()).prettyPrint()
+
+            else:
+                out += syntax.clone(val).prettyPrint()
+
+            if self.buildUnits:
+                out += mibObject.units
+
+        return out
+
+
+def getRowArc(row):
+    # Printable characters as decoded string indices, or text output
+    # lines would break within instance names
+    return FIRST_ROW_ARC + row % (LAST_ROW_ARC - FIRST_ROW_ARC + 1)
+
+
+def getVarBinds(mibViewController, rows):
+    # Instances of every MIB object in column-major order, like a walk
+    varBinds = []
+
+    mibViewProxy = mibview.MibViewProxy(mibViewController)
+
+    try:
+        oid, label, suffix = mibViewController.getFirstNodeName()
+
+        while True:
+            mibNode, = mibViewController.mibBuilder.importSymbols(
+                *mibViewController.getNodeLocation(oid)[:2])
+
+            syntax = getattr(mibNode, 'syntax', None)
+
+            for value in (1, 'x'):
+                try:
+                    val = syntax.clone(value)
+
+                    mibViewProxy.getPrettyOidVal(
+                        mibViewController, oid + (1,), val)
+
+                except Exception:
+                    continue
+
+                # OIDs of SNMP responses
+                for row in range(rows):
+                    varBinds.append(
+                        (rfc1902.ObjectName(oid + (getRowArc(row),)), val))
+
+                break
+
+            oid, label, suffix = mibViewController.getNextNodeName(oid)
+
+    except NoSuchObjectError:
+        pass
+
+    return varBinds
+
+
+def resolveByController(mibViewController, varBinds):
+    for oid, val in varBinds:
+        prefix, label, suffix = mibViewController.getNodeName(oid)
+        modName, nodeDesc, _ = mibViewController.getNodeLocation(prefix)
+        mibViewController.mibBuilder.importSymbols(modName, nodeDesc)
+
+
+def resolveByIndex(oidIndex, varBinds):
+    for oid, val in varBinds:
+        entry, suffix = oidIndex.lookup(oid)
+        oidIndex.getNode(entry)
+
+
+def formatVarBinds(mibViewController, mibViewProxy, varBinds):
+    return [mibViewProxy.getPrettyOidVal(mibViewController, oid, val)
+            for oid, val in varBinds]
+
+
+# What ingestion pipelines do to text output
+TEXT_VARBIND = re.compile(r'^(\S+?)::(\S+?)(\..*)? = (?:(\S+): )?(.*)$')
+
+
+def parseText(text):
+    # Lines not looking like a varbind are not counted
+    records = []
+
+    for line in text.split('\n'):
+        match = TEXT_VARBIND.match(line)
+
+        if match is not None:
+            records.append(match.groups())
+
+    return records
+
+
+def parseJson(text):
+    return [json.loads(x) for x in text.splitlines()]
+
+
+def parseCsv(text):
+    return list(csv.DictReader(text.splitlines(True)))
+
+
+def formatAndParse(mibViewController, mibViewProxy, varBinds, parse):
+    # Output as tools write it
+    text = ''.join(['%s\n' % x for x in formatVarBinds(
+        mibViewController, mibViewProxy, varBinds)])
+
+    return parse(text)
+
+
+def measure(repetitions, fun, *args):
+    best = None
+
+    for _ in range(repetitions):
+        startedAt = now()
+
+        fun(*args)
+
+        took = now() - startedAt
+
+        if best is None or took < best:
+            best = took
+
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='MIB view resolution benchmark')
+
+    parser.add_argument(
+        '-m', '--mibs', default='ALL',
+        help='MIBs to load (ALL loads all compiled MIBs)')
+    parser.add_argument(
+        '-r', '--rows', type=int, default=20,
+        help='table rows per MIB object')
+    parser.add_argument(
+        '-n', '--repetitions', type=int, default=5,
+        help='runs per measurement, best one is reported')
+
+    args = parser.parse_args()
+
+    snmpEngine = mibview.MibEngine()
+
+    mibBuilder = snmpEngine.getMibBuilder()
+
+    for mibFile in args.mibs.split(':'):
+        if mibFile.lower() == 'all':
+            mibBuilder.loadModules()
+
+        else:
+            mibBuilder.loadModules(mibFile)
+
+    mibViewController = mibview.getMibViewController(snmpEngine)
+
+    varBinds = getVarBinds(mibViewController, args.rows)
+
+    indexDir = tempfile.mkdtemp()
+
+    try:
+        oidIndex = oidindex.OidIndex(mibViewController, indexDir)
+
+        startedAt = now()
+        oidIndex.refresh()
+        built = now() - startedAt
+
+        oidIndex = oidindex.OidIndex(mibViewController, indexDir)
+
+        startedAt = now()
+        oidIndex.refresh()
+        loaded = now() - startedAt
+
+    finally:
+        shutil.rmtree(indexDir, ignore_errors=True)
+
+    sys.stdout.write(
+        '%d modules, %d varbinds\n'
+        'OID index built in %.6f sec, loaded in %.6f sec\n' % (
+            len(mibBuilder.mibSymbols), len(varBinds), built, loaded))
+
+    byController = measure(
+        args.repetitions, resolveByController, mibViewController, varBinds)
+    byIndex = measure(
+        args.repetitions, resolveByIndex, oidIndex, varBinds)
+
+    sys.stdout.write(
+        'resolve: controller %.6f sec, index %.6f sec (x%.2f)\n' % (
+            byController, byIndex, byController / byIndex))
+
+    proxies = []
+
+    for proxyOidIndex, oidCacheSize in ((None, 0), (oidIndex, 0),
+                                            (oidIndex, None)):
+        mibViewProxy = mibview.MibViewProxy(mibViewController, proxyOidIndex)
+
+        if oidCacheSize is not None:
+            mibViewProxy.oidCacheSize = oidCacheSize
+
+        proxies.append(mibViewProxy)
+
+    byController, byIndex, byCache = [
+        measure(args.repetitions, formatVarBinds, mibViewController, x, varBinds)
+        for x in proxies]
+
+    sys.stdout.write(
+        'format: controller %.6f sec, index %.6f sec (x%.2f), '
+        'index and OID cache %.6f sec (x%.2f)\n' % (
+            byController, byIndex, byController / byIndex,
+            byCache, byController / byCache))
+
+    outputs = [formatVarBinds(mibViewController, x, varBinds) for x in proxies]
+
+    failures = []
+
+    if [x for x in outputs[1:] if x != outputs[0]]:
+        failures.append('resolution changes output')
+
+    # Output options as parsed from command line
+    generator = mibview._MibViewGenerator()
+
+    for options in OUTPUT_OPTIONS:
+        proxies = []
+
+        for proxyClass in ReferenceMibViewProxy, mibview.MibViewProxy:
+            mibViewProxy = proxyClass(mibViewController, oidIndex)
+
+            if options:
+                node = base.ConfigNode('OutputOption')
+                node[:] = [base.ConfigToken('outputopts'),
+                           base.ConfigToken('string', options)]
+
+                generator.n_OutputOption(
+                    (None, {'mibViewProxy': mibViewProxy}), node)
+
+            proxies.append(mibViewProxy)
+
+        byReference, byCompiled = [
+            measure(args.repetitions, formatVarBinds,
+                    mibViewController, x, varBinds)
+            for x in proxies]
+
+        sys.stdout.write(
+            'format -O%-5s reference %.6f sec, compiled %.6f sec (x%.2f)\n' % (
+                options, byReference, byCompiled, byReference / byCompiled))
+
+        outputs = [formatVarBinds(mibViewController, x, varBinds)
+                   for x in proxies]
+
+        if outputs[0] != outputs[1]:
+            failures.append('-O%s output differs' % options)
+
+    # Machine-readable output
+    records = {}
+
+    for outputFormat, parse in (('text', parseText), ('json', parseJson),
+                                ('csv', parseCsv)):
+        mibViewProxy = mibview.MibViewProxy(mibViewController, oidIndex)
+        mibViewProxy.outputFormat = outputFormat
+
+        took = measure(args.repetitions, formatAndParse, mibViewController,
+                       mibViewProxy, varBinds, parse)
+
+        sys.stdout.write(
+            'format and parse --format %-4s %.6f sec\n' % (outputFormat, took))
+
+        mibViewProxy = mibview.MibViewProxy(mibViewController, oidIndex)
+        mibViewProxy.outputFormat = outputFormat
+
+        records[outputFormat] = formatAndParse(
+            mibViewController, mibViewProxy, varBinds, parse)
+
+    for record in records['csv']:
+        record['index'] = json.loads(record['index'])
+
+        if record['value'] == '' and record['type'] == 'Null':
+            record['value'] = None
+
+    expected = [dict([(x, isinstance(y, int) and str(y) or y)
+                      for x, y in record.items()])
+                for record in records['json']]
+
+    if expected != records['csv']:
+        failures.append('CSV records differ from JSON records')
+
+    for outputFormat in ('text', 'csv'):
+        if len(records[outputFormat]) != len(records['json']):
+            failures.append('%d %s records, %d JSON records' % (
+                len(records[outputFormat]), outputFormat,
+                len(records['json'])))
+
+    for record, (modName, name, index, typeName, value) in zip(
+            records['json'], records['text']):
+        if (record['name'] != '%s::%s' % (modName, name) or
+                record['formatted'].rstrip() != value.rstrip()):
+            failures.append('%s record differs from text output' % (
+                record['oid'],))
+            break
+
+    for failure in failures:
+        sys.stdout.write('FAILED %s\n' % failure)
+
+    sys.exit(failures and 1 or 0)
+
+
+if __name__ == '__main__':
+    main()
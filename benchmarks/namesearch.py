@@ -0,0 +1,160 @@
+#
+# This file is part of snmpclitools software.
+#
+# Copyright (c) 2005-2019, Ilya Etingof <etingof@gmail.com>
+# License: http://snmplabs.com/snmpclitools/license.html
+#
+# MIB object name search benchmark.
+#
+# Writes a corpus of synthetic compiled MIB modules (just the code
+# exporting MIB symbols, the modules are never loaded), indexes MIB
+# object names they define and searches them for a few regular
+# expressions matching every name one by one and through the trigram
+# index. Exits with non-zero status if the two find different names.
+#
+# Usage: python benchmarks/namesearch.py [-c COUNT] [-o OBJECTS]
+#
+import argparse
+import os
+import re
+import shutil
+import sys
+import tempfile
+from timeit import default_timer as now
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+sys.path.insert(0, os.path.dirname(BENCHMARKS_DIR))
+
+from pysnmp.smi import builder
+
+from snmpclitools.cli import nameindex
+
+WORDS = ('if', 'ip', 'tcp', 'udp', 'host', 'port', 'entry', 'table',
+         'in', 'out', 'octets', 'packets', 'errors', 'discards', 'admin',
+         'oper', 'status', 'index', 'descr', 'alias', 'speed', 'type')
+
+PATTERNS = ('ifInOctets', 'Octets$', '^tcp.*Errors', 'port[A-Z]+Speed',
+            'zzz', 'Index|Descr')
+
+
+def getName(index):
+    words = []
+
+    while True:
+        words.append(WORDS[index % len(WORDS)])
+        index //= len(WORDS)
+
+        if not index:
+            break
+
+    return words[0] + ''.join([x.capitalize() for x in words[1:]])
+
+
+def generateMibs(directory, count, objects):
+    """Write synthetic compiled MIB modules into directory"""
+    for index in range(count):
+        mibName = 'NAMESEARCH-MIB-%d' % index
+
+        names = [getName(index * objects + x) for x in range(objects)]
+
+        # Some MIB symbols are not Python identifiers
+        names[0] = names[0] + '-x'
+
+        with open(os.path.join(directory, mibName + '.py'), 'w') as f:
+            f.write('mibBuilder.exportSymbols("%s", %s, **{"%s": x})\n' % (
+                mibName, ', '.join(['%s=%s' % (x, x) for x in names[1:]]),
+                names[0]))
+
+    return count * objects
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='MIB object name search benchmark')
+
+    parser.add_argument(
+        '-c', '--count', type=int, default=500,
+        help='number of synthetic MIB modules to generate')
+
+    parser.add_argument(
+        '-o', '--objects', type=int, default=100,
+        help='number of MIB objects per MIB module')
+
+    args = parser.parse_args()
+
+    workDir = tempfile.mkdtemp()
+
+    failures = []
+
+    try:
+        os.environ['PYSNMPCACHEDIR'] = os.path.join(workDir, 'cache')
+
+        mibDir = os.path.join(workDir, 'mibs')
+        os.mkdir(mibDir)
+
+        generateMibs(mibDir, args.count, args.objects)
+
+        mibBuilder = builder.MibBuilder()
+        mibBuilder.setMibSources(builder.DirMibSource(mibDir))
+
+        mibNameIndex = nameindex.MibNameIndex(mibBuilder)
+
+        for run in ('build', 'load'):
+            startedAt = now()
+
+            mibNameIndex.refresh()
+
+            sys.stdout.write('%-8s names indexed in %.6f sec\n' % (
+                run, now() - startedAt))
+
+            # Next time the index is loaded from the tools cache
+            mibNameIndex = nameindex.MibNameIndex(mibBuilder)
+
+        mibNameIndex.refresh()
+
+        startedAt = now()
+
+        mibNameIndex.search('^$')
+
+        sys.stdout.write('trigrams indexed in %.6f sec\n' % (now() - startedAt))
+
+        names = mibNameIndex.search('')
+
+        sys.stdout.write('%d names in %d MIB modules\n' % (
+            len(names), args.count))
+
+        for pattern in PATTERNS:
+            startedAt = now()
+
+            match = re.compile(pattern).search
+
+            expected = [x for x in names if match(x[0])]
+
+            scanned = now() - startedAt
+
+            startedAt = now()
+
+            found = mibNameIndex.search(pattern)
+
+            searched = now() - startedAt
+
+            sys.stdout.write(
+                '%-20s %6d found, scan %.6f sec, index %.6f sec\n' % (
+                    pattern, len(found), scanned, searched))
+
+            if found != expected:
+                failures.append('%s: %d names found, %d expected' % (
+                    pattern, len(found), len(expected)))
+
+    finally:
+        shutil.rmtree(workDir, ignore_errors=True)
+
+    for failure in failures:
+        sys.stdout.write('FAILED %s\n' % failure)
+
+    sys.exit(failures and 1 or 0)
+
+
+if __name__ == '__main__':
+    main()
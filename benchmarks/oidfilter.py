@@ -0,0 +1,202 @@
+#
+# This file is part of snmpclitools software.
+#
+# Copyright (c) 2005-2019, Ilya Etingof <etingof@gmail.com>
+# License: http://snmplabs.com/snmpclitools/license.html
+#
+# snmptranslate filter throughput benchmark.
+#
+# Synthesizes Net-SNMP style walk dumps over every OID known to the
+# loaded MIBs, as if the same agent was walked over and over, then
+# measures lines per second translated:
+#
+#   process  - running snmptranslate once per OID (on a sample of lines)
+#   filter   - running snmptranslate --filter once over the whole dump
+#   uncached - filtering in-process with translated OIDs cache disabled
+#   cached   - filtering in-process with translated OIDs cache
+#
+# Exits with non-zero status if the cache changes output or dotted
+# numbers other than OIDs (IPv4 addresses, versions) get translated.
+#
+# Usage: python benchmarks/oidfilter.py [-m MIB[:...]] [-l LINES] [-r ROWS]
+#                                      [-s SAMPLE]
+#
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+from timeit import default_timer as now
+
+try:
+    from StringIO import StringIO
+
+except ImportError:
+    from io import StringIO
+
+from pysnmp.smi.error import NoSuchObjectError
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+ROOT_DIR = os.path.dirname(BENCHMARKS_DIR)
+
+sys.path.insert(0, ROOT_DIR)
+
+from snmpclitools.cli import mibview
+from snmpclitools.scripts import snmptranslate
+
+TOOL = os.path.join(ROOT_DIR, 'scripts', 'snmptranslate.py')
+
+# Log lines carrying dotted numbers other than OIDs
+NOT_OIDS = [
+    'Connection from 2.2.2.2 port 161\n',
+    'Agent version 1.10.0.3 (build 1.2.0.4.7) started\n',
+    'Route 1.0.0.0.24 via 10.0.0.1\n',
+]
+
+
+def getLines(mibViewController, count, rows):
+    # Repeated walk dumps of a few table rows of all known OIDs
+    oids = []
+
+    try:
+        oid, label, suffix = mibViewController.getFirstNodeName()
+
+        while True:
+            if oid[:4] == (1, 3, 6, 1):
+                oids.append('.'.join([str(x) for x in oid]))
+
+            oid, label, suffix = mibViewController.getNextNodeName(oid)
+
+    except NoSuchObjectError:
+        pass
+
+    walk = ['.%s.%d = INTEGER: %d\n' % (oid, row, row)
+            for oid in oids for row in range(1, rows + 1)]
+
+    lines = []
+
+    while len(lines) < count:
+        lines.extend(walk[:count - len(lines)])
+
+    return lines
+
+
+def runTool(args, inputFile):
+    with open(os.devnull, 'w') as devnull:
+        subprocess.check_call(
+            [sys.executable, TOOL] + args, stdin=inputFile, stdout=devnull,
+            env=dict(os.environ, PYTHONPATH=ROOT_DIR))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='snmptranslate filter throughput benchmark')
+
+    parser.add_argument(
+        '-m', '--mibs', default='ALL',
+        help='MIBs to load (ALL loads all compiled MIBs)')
+    parser.add_argument(
+        '-l', '--lines', type=int, default=500000,
+        help='lines of walk dump to translate')
+    parser.add_argument(
+        '-r', '--rows', type=int, default=10,
+        help='table rows per OID in walk dump')
+    parser.add_argument(
+        '-s', '--sample', type=int, default=20,
+        help='lines to translate running a process per OID')
+
+    args = parser.parse_args()
+
+    snmpEngine = mibview.MibEngine()
+
+    mibBuilder = snmpEngine.getMibBuilder()
+
+    for mibFile in args.mibs.split(':'):
+        if mibFile.lower() == 'all':
+            mibBuilder.loadModules()
+
+        else:
+            mibBuilder.loadModules(mibFile)
+
+    mibViewController = mibview.getMibViewController(snmpEngine)
+
+    lines = getLines(mibViewController, args.lines, args.rows)
+
+    sys.stdout.write('%d lines, %d distinct OIDs\n' % (
+        len(lines), len(set([x.split()[0] for x in lines]))))
+
+    rates = []
+
+    dumpFile = tempfile.NamedTemporaryFile(mode='w+')
+
+    try:
+        dumpFile.writelines(lines)
+        dumpFile.flush()
+
+        mibs = ['-m', args.mibs]
+
+        startedAt = now()
+
+        for line in lines[:args.sample]:
+            runTool(mibs + [line.split()[0].lstrip('.')], None)
+
+        rates.append(('process', args.sample / (now() - startedAt)))
+
+        dumpFile.seek(0)
+
+        startedAt = now()
+
+        runTool(mibs + ['--filter'], dumpFile)
+
+        rates.append(('filter', len(lines) / (now() - startedAt)))
+
+    finally:
+        dumpFile.close()
+
+    outputs = []
+
+    for run, cacheSize in (('uncached', 0),
+                           ('cached', snmptranslate.FILTER_CACHE_SIZE)):
+        mibViewProxy = snmptranslate.MibViewProxy(mibViewController)
+        mibViewProxy.buildValue = False
+
+        outputFile = StringIO()
+
+        startedAt = now()
+
+        snmptranslate.filterLines(
+            mibViewProxy, mibViewController, lines, outputFile, cacheSize)
+
+        rates.append((run, len(lines) / (now() - startedAt)))
+
+        outputs.append(outputFile.getvalue())
+
+    for run, rate in rates:
+        sys.stdout.write('%-8s %12.1f lines/sec (x%.1f)\n' % (
+            run, rate, rate / rates[0][1]))
+
+    failures = []
+
+    if outputs[0] != outputs[1]:
+        failures.append('cache changes output')
+
+    mibViewProxy = snmptranslate.MibViewProxy(mibViewController)
+
+    outputFile = StringIO()
+
+    snmptranslate.filterLines(
+        mibViewProxy, mibViewController, NOT_OIDS, outputFile)
+
+    if outputFile.getvalue() != ''.join(NOT_OIDS):
+        failures.append('dotted numbers taken for OIDs: %r' % (
+            outputFile.getvalue(),))
+
+    for failure in failures:
+        sys.stdout.write('FAILED %s\n' % failure)
+
+    sys.exit(failures and 1 or 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+#
+# This file is part of snmpclitools software.
+#
+# Copyright (c) 2005-2019, Ilya Etingof <etingof@gmail.com>
+# License: http://snmplabs.com/snmpclitools/license.html
+#
+# Buffered output benchmark.
+#
+# Writes a line per variable-binding into a stream taking a while to
+# accept each write (like a pipe to a busy reader or a slow terminal)
+# directly and through the buffered output writer, measuring how long
+# the writing side is blocked. Exits with non-zero status if the stream
+# receives different output.
+#
+# Usage: python benchmarks/output.py [-n LINES] [-l LATENCY]
+#
+import argparse
+import os
+import sys
+import time
+from timeit import default_timer as now
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+sys.path.insert(0, os.path.dirname(BENCHMARKS_DIR))
+
+from snmpclitools.cli import output
+
+LINE = 'IF-MIB::ifInOctets.%d = Counter32: %d\n'
+
+
+class SlowStream(object):
+    """Stream blocking writer for a while on each write"""
+    def __init__(self, latency):
+        self.latency = latency
+        self.chunks = []
+
+    def write(self, data):
+        time.sleep(self.latency)
+        self.chunks.append(data)
+
+    def flush(self):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Buffered output benchmark')
+
+    parser.add_argument(
+        '-n', '--lines', type=int, default=20000,
+        help='number of output lines to write')
+
+    parser.add_argument(
+        '-l', '--latency', type=float, default=0.0001,
+        help='time stream takes to accept each write (seconds)')
+
+    args = parser.parse_args()
+
+    failures = []
+
+    results = {}
+
+    for run in ('direct', 'buffered'):
+        stream = SlowStream(args.latency)
+
+        if run == 'buffered':
+            writer = output.OutputWriter(stream)
+
+        else:
+            writer = stream
+
+        blocked = 0
+
+        startedAt = now()
+
+        for index in range(args.lines):
+            writeStartedAt = now()
+
+            writer.write(LINE % (index, index * 1000))
+
+            blocked += now() - writeStartedAt
+
+        if run == 'buffered':
+            writer.close()
+
+        took = now() - startedAt
+
+        results[run] = ''.join(stream.chunks)
+
+        sys.stdout.write(
+            '%-9s %d lines in %d writes, blocked for %.6f sec, '
+            'done in %.6f sec\n' % (run, args.lines, len(stream.chunks),
+                                    blocked, took))
+
+    if results['direct'] != results['buffered']:
+        failures.append('different output written')
+
+    for failure in failures:
+        sys.stdout.write('FAILED %s\n' % failure)
+
+    sys.exit(failures and 1 or 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,173 @@
+#
+# This file is part of snmpclitools software.
+#
+# Copyright (c) 2005-2019, Ilya Etingof <etingof@gmail.com>
+# License: http://snmplabs.com/snmpclitools/license.html
+#
+# Table row assembly benchmark.
+#
+# Walks a large synthetic table, one column of which has no instances
+# in the first half of the rows, side by side in GETBULK requests the
+# way snmptable does. All columns are walked in every request (lockstep)
+# or leading columns are held back once incomplete rows pile up
+# (paced), measuring requests taken and rows kept in memory. Paced walk
+# is also cut short halfway, as if the agent stopped responding. Exits
+# with non-zero status if rows assembled differ from the table, paced
+# walk keeps more rows than it should or an interrupted walk loses rows
+# received.
+#
+# Usage: python benchmarks/rowassembly.py [-r ROWS] [-c COLUMNS]
+#                                         [-m MAXREPS] [-k MAXROWS]
+#
+import argparse
+import bisect
+import os
+import sys
+from timeit import default_timer as now
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+sys.path.insert(0, os.path.dirname(BENCHMARKS_DIR))
+
+from snmpclitools.cli import table
+
+
+def getTable(rows, columns):
+    """Return row indices present in each column"""
+    indices = [(x,) for x in range(1, rows + 1)]
+
+    # the last column is populated at the second half of the rows only
+    return [indices] * (columns - 1) + [indices[rows // 2:]]
+
+
+def walkTable(columnIndices, maxReps, maxRows, maxRequests=None):
+    """Walk table columns side by side.
+
+    Returns rows, requests taken, row assembler and the last index
+    received in each column. Walk interrupted after `maxRequests`
+    requests yields all the rows assembled so far, the way snmptable
+    reports them on error.
+    """
+    rowAssembler = table.RowAssembler(len(columnIndices))
+
+    lastIndices = [()] * len(columnIndices)
+
+    requests = 0
+
+    rows = []
+
+    while True:
+        if requests == maxRequests:
+            for column in range(len(columnIndices)):
+                rowAssembler.finish(column)
+
+            rows.extend(rowAssembler.pop())
+            break
+
+        if maxRows is None:
+            columns = [x for x in range(len(columnIndices))
+                       if not rowAssembler.isFinished(x)]
+
+        else:
+            columns = rowAssembler.getColumnsToWalk(maxRows)
+
+        if not columns:
+            break
+
+        requests += 1
+
+        for column in columns:
+            indices = columnIndices[column]
+
+            position = bisect.bisect_right(indices, lastIndices[column])
+
+            for index in indices[position:position + maxReps]:
+                rowAssembler.add(column, index, index)
+
+                lastIndices[column] = index
+
+            if position + maxReps >= len(indices):
+                rowAssembler.finish(column)
+
+        rows.extend(rowAssembler.pop())
+
+    return rows, requests, rowAssembler, lastIndices
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Table row assembly benchmark')
+
+    parser.add_argument(
+        '-r', '--rows', type=int, default=100000,
+        help='table rows')
+    parser.add_argument(
+        '-c', '--columns', type=int, default=10,
+        help='table columns')
+    parser.add_argument(
+        '-m', '--max-repetitions', type=int, default=25,
+        help='table rows in each GETBULK response')
+    parser.add_argument(
+        '-k', '--max-rows', type=int, default=table.MAX_ROWS,
+        help='incomplete rows to keep before holding leading columns back')
+
+    args = parser.parse_args()
+
+    columnIndices = getTable(args.rows, args.columns)
+
+    failures = []
+
+    for run, maxRows in (('lockstep', None), ('paced', args.max_rows)):
+        startedAt = now()
+
+        rows, requests, rowAssembler, lastIndices = walkTable(
+            columnIndices, args.max_repetitions, maxRows)
+
+        took = now() - startedAt
+
+        sys.stdout.write(
+            '%-8s %d rows x %d columns in %d requests, %.6f sec, '
+            '%d rows in flight\n' % (run, len(rows), args.columns, requests,
+                                     took, rowAssembler.peakRows))
+
+        if len(rows) != args.rows:
+            failures.append('%s: %d rows assembled' % (run, len(rows)))
+
+        incomplete = len([x for x in rows if None in x[1]])
+
+        if incomplete != args.rows // 2:
+            failures.append('%s: %d incomplete rows' % (run, incomplete))
+
+        # a request walking all columns may go past the limit
+        if (maxRows is not None and rowAssembler.peakRows >
+                maxRows + args.max_repetitions * args.columns):
+            failures.append('%s: %d rows kept in memory' % (
+                run, rowAssembler.peakRows))
+
+    # agent stops responding halfway through the table
+    rows, requests, rowAssembler, lastIndices = walkTable(
+        columnIndices, args.max_repetitions, args.max_rows,
+        args.rows // args.max_repetitions // 2)
+
+    # any row having a column instance received is to be reported
+    received = max(lastIndices)[0]
+
+    sys.stdout.write(
+        '%-8s %d rows x %d columns in %d requests\n' % (
+            'timeout', len(rows), args.columns, requests))
+
+    if [x[0] for x in rows] != [(x,) for x in range(1, len(rows) + 1)]:
+        failures.append('timeout: rows assembled out of order')
+
+    if len(rows) != received:
+        failures.append('timeout: %d rows of %d received reported' % (
+            len(rows), received))
+
+    for failure in failures:
+        sys.stdout.write('FAILED %s\n' % failure)
+
+    sys.exit(failures and 1 or 0)
+
+
+if __name__ == '__main__':
+    main()
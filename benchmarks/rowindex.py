@@ -0,0 +1,154 @@
+#
+# This file is part of snmpclitools software.
+#
+# Copyright (c) 2005-2019, Ilya Etingof <etingof@gmail.com>
+# License: http://snmplabs.com/snmpclitools/license.html
+#
+# Table row index cache benchmark.
+#
+# Synthesizes a column-wise and a row-wise (columns side by side) walk
+# over a large table and times varbind formatting with and without the
+# cache of decoded row indices. Exits with non-zero status if the cache
+# changes output or indices of any row get decoded more than once.
+#
+# Usage: python benchmarks/rowindex.py [-t MIB::TABLE] [-r ROWS] [-c COLUMNS]
+#
+import argparse
+import os
+import sys
+from timeit import default_timer as now
+
+from pyasn1.type import univ
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+sys.path.insert(0, os.path.dirname(BENCHMARKS_DIR))
+
+from snmpclitools.cli import mibview
+
+
+def getVarBinds(mibViewController, modName, tableName, rows, columns):
+    # Instances of table columns in column-major order, like a walk
+    mibBuilder = mibViewController.mibBuilder
+
+    tableNode, = mibBuilder.importSymbols(modName, tableName)
+
+    oid, label, suffix = mibViewController.getNextNodeName(tableNode.name)
+
+    rowNode, = mibBuilder.importSymbols(
+        *mibViewController.getNodeLocation(oid)[:2])
+
+    indices = []
+
+    for row in range(rows):
+        values = []
+
+        for implied, mibMod, mibSym in rowNode.getIndexNames():
+            indexNode, = mibBuilder.importSymbols(mibMod, mibSym)
+
+            try:
+                values.append(indexNode.syntax.clone(row + 1))
+
+            except Exception:
+                values.append(indexNode.syntax.clone('row-%d' % row))
+
+        indices.append(rowNode.getInstIdFromIndices(*values))
+
+    varBinds = []
+
+    val = univ.Null('')
+
+    oid, label, suffix = mibViewController.getNextNodeName(rowNode.name)
+
+    while columns and oid[:len(rowNode.name)] == rowNode.name:
+        varBinds.extend([(oid + x, val) for x in indices])
+
+        oid, label, suffix = mibViewController.getNextNodeName(oid)
+
+        columns -= 1
+
+    return varBinds
+
+
+def formatVarBinds(mibViewController, mibViewProxy, varBinds):
+    return [mibViewProxy.getPrettyOidVal(mibViewController, oid, val)
+            for oid, val in varBinds]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Table row index cache benchmark')
+
+    parser.add_argument(
+        '-t', '--table', default='SNMP-TARGET-MIB::snmpTargetAddrTable',
+        help='MIB table to walk')
+    parser.add_argument(
+        '-r', '--rows', type=int, default=100000,
+        help='table rows')
+    parser.add_argument(
+        '-c', '--columns', type=int, default=4,
+        help='table columns to walk')
+
+    args = parser.parse_args()
+
+    modName, tableName = args.table.split('::')
+
+    snmpEngine = mibview.MibEngine()
+
+    snmpEngine.getMibBuilder().loadModules(modName)
+
+    mibViewController = mibview.getMibViewController(snmpEngine)
+
+    varBinds = getVarBinds(
+        mibViewController, modName, tableName, args.rows, args.columns)
+
+    sys.stdout.write('%s: %d rows, %d varbinds\n' % (
+        args.table, args.rows, len(varBinds)))
+
+    columns = len(varBinds) // args.rows
+
+    # the same instances as GETBULK over all the columns returns them
+    sideBySide = [varBinds[x * args.rows + y]
+                  for y in range(args.rows) for x in range(columns)]
+
+    failures = []
+
+    for walk, walkVarBinds in (('column-wise', varBinds),
+                               ('side by side', sideBySide)):
+        outputs = []
+        timings = []
+
+        for indexCacheSize in 0, mibview.MibViewProxy.DEFAULT_INDEX_CACHE_SIZE:
+            mibViewProxy = mibview.MibViewProxy(mibViewController)
+            mibViewProxy.indexCacheSize = indexCacheSize
+
+            startedAt = now()
+
+            outputs.append(
+                formatVarBinds(mibViewController, mibViewProxy, walkVarBinds))
+
+            timings.append(now() - startedAt)
+
+            hits, misses = mibViewProxy.getIndexCacheStats()
+
+            sys.stdout.write(
+                '%-12s index cache size %d: %.6f sec (x%.2f), '
+                '%d hits, %d misses\n' % (
+                    walk, indexCacheSize, timings[-1],
+                    timings[0] / timings[-1], hits, misses))
+
+        if outputs[0] != outputs[1]:
+            failures.append('%s: index cache changes output' % walk)
+
+        if misses > args.rows:
+            failures.append('%s: %d rows decoded %d times' % (
+                walk, args.rows, misses))
+
+    for failure in failures:
+        sys.stdout.write('FAILED %s\n' % failure)
+
+    sys.exit(failures and 1 or 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,248 @@
+#
+# This file is part of snmpclitools software.
+#
+# Copyright (c) 2005-2019, Ilya Etingof <etingof@gmail.com>
+# License: http://snmplabs.com/snmpclitools/license.html
+#
+# Tools startup benchmark.
+#
+# Runs each scenario many times, every time in a fresh Python process,
+# against the stand-in agent listening on loopback interface. Per-phase
+# timings (imports, SNMP engine creation, command line parsing, each
+# AST generator, MIB loading, transport opening, first response and
+# results output) are aggregated and saved as JSON so that results
+# taken at different commits could be compared.
+#
+# Usage: python benchmarks/startup.py [-n REPETITIONS] [-o FILE] [-c FILE]
+#
+import argparse
+import importlib
+import json
+import os
+import platform
+import subprocess
+import sys
+from timeit import default_timer as now
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+TOP_DIR = os.path.dirname(BENCHMARKS_DIR)
+
+SCENARIOS = (
+    ('snmpget-v2c', 'snmpget',
+     ['-v2c', '-c', 'public', '127.0.0.1:{port}', 'sysDescr.0']),
+    ('snmpget-v3', 'snmpget',
+     ['-v3', '-l', 'authPriv', '-u', 'usr', '-a', 'SHA', '-A', 'authkey1',
+      '-x', 'AES', '-X', 'privkey1', '127.0.0.1:{port}', 'sysDescr.0']),
+    ('snmpwalk-v2c', 'snmpwalk',
+     ['-v2c', '-c', 'public', '127.0.0.1:{port}', 'system']),
+    ('snmpbulkwalk-v2c', 'snmpbulkwalk',
+     ['-v2c', '-c', 'public', '127.0.0.1:{port}', 'system']),
+    ('snmptable-v2c', 'snmptable',
+     ['-v2c', '-c', 'public', '-Cr2', '127.0.0.1:{port}',
+      'SNMP-VIEW-BASED-ACM-MIB::vacmAccessTable']),
+    ('snmptranslate', 'snmptranslate',
+     ['-On', 'SNMPv2-MIB::sysDescr.0']),
+)
+
+
+def runChild(tool, argv):
+    # Runs in a fresh process: time one tool run, dump phases as JSON
+    from snmpclitools.cli import timing
+
+    timer = timing.Timer()
+
+    with timer.measure('imports'):
+        module = importlib.import_module('snmpclitools.scripts.' + tool)
+
+        from snmpclitools.cli import app
+
+    savedStdout = sys.stdout
+
+    sys.stdout = open(os.devnull, 'w')
+
+    try:
+        exitCode = app.run(module, None, argv, {'timer': timer})
+
+    finally:
+        sys.stdout.close()
+        sys.stdout = savedStdout
+
+    json.dump({'exitCode': exitCode, 'phases': timer.asList()}, sys.stdout)
+
+
+def startAgent(port):
+    agent = subprocess.Popen(
+        [sys.executable, os.path.join(BENCHMARKS_DIR, 'agent.py'), str(port)],
+        stdout=subprocess.PIPE)
+
+    if agent.stdout.readline().strip() != b'ready':
+        agent.wait()
+        raise RuntimeError('stand-in agent failed to start')
+
+    return agent
+
+
+def runScenario(tool, argv, env):
+    startedAt = now()
+
+    output = subprocess.check_output(
+        [sys.executable, os.path.abspath(__file__), '--child', tool] + argv,
+        env=env)
+
+    process = now() - startedAt
+
+    result = json.loads(output.decode('utf-8'))
+
+    if result['exitCode']:
+        raise RuntimeError('%s %s failed' % (tool, ' '.join(argv)))
+
+    phases = [(x['phase'], x['depth'], x['seconds']) for x in result['phases']]
+    phases.insert(0, ('process', 0, process))
+
+    return phases
+
+
+def summarize(samples):
+    samples = sorted(samples)
+    count = len(samples)
+
+    if count % 2:
+        median = samples[count // 2]
+
+    else:
+        median = (samples[count // 2 - 1] + samples[count // 2]) / 2
+
+    return {'min': samples[0], 'median': median, 'max': samples[-1]}
+
+
+def getCommit():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=TOP_DIR).decode('ascii').strip()
+
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def runBenchmark(repetitions, port):
+    env = os.environ.copy()
+    env['PYTHONPATH'] = os.pathsep.join(
+        [TOP_DIR] + [x for x in [env.get('PYTHONPATH')] if x])
+
+    # Talk to the tools directly, not to the daemon
+    env.pop('PYSNMPDAEMONSOCKET', None)
+
+    import pysnmp
+
+    results = {
+        'commit': getCommit(),
+        'python': platform.python_version(),
+        'pysnmp': pysnmp.__version__,
+        'repetitions': repetitions,
+        'scenarios': {}
+    }
+
+    agent = startAgent(port)
+
+    try:
+        for name, tool, argv in SCENARIOS:
+            argv = [x.format(port=port) for x in argv]
+
+            order = []
+            depths = {}
+            samples = {}
+
+            for _ in range(repetitions):
+                for phase, depth, seconds in runScenario(tool, argv, env):
+                    if phase not in samples:
+                        order.append(phase)
+                        depths[phase] = depth
+                        samples[phase] = []
+
+                    samples[phase].append(seconds)
+
+            results['scenarios'][name] = {
+                'tool': tool,
+                'argv': argv,
+                'phases': [dict(phase=phase, depth=depths[phase],
+                                **summarize(samples[phase]))
+                           for phase in order]
+            }
+
+    finally:
+        agent.terminate()
+        agent.wait()
+
+    return results
+
+
+def report(results, baseline=None):
+    text = 'commit %s, Python %s, pysnmp %s, %s runs\n' % (
+        results['commit'], results['python'], results['pysnmp'],
+        results['repetitions'])
+
+    for name in sorted(results['scenarios']):
+        text += '\n%s\n' % name
+
+        reference = {}
+
+        if baseline and name in baseline['scenarios']:
+            for phase in baseline['scenarios'][name]['phases']:
+                reference[phase['phase']] = phase['median']
+
+        for phase in results['scenarios'][name]['phases']:
+            line = '   %-32s %.6f sec (%.6f..%.6f)' % (
+                '  ' * phase['depth'] + phase['phase'], phase['median'],
+                phase['min'], phase['max'])
+
+            if reference.get(phase['phase']):
+                line += ' %+.1f%%' % (
+                    (phase['median'] / reference[phase['phase']] - 1) * 100)
+
+            text += line + '\n'
+
+    return text
+
+
+def main():
+    if len(sys.argv) > 2 and sys.argv[1] == '--child':
+        runChild(sys.argv[2], sys.argv[3:])
+        return
+
+    parser = argparse.ArgumentParser(description='SNMP tools startup benchmark')
+
+    parser.add_argument(
+        '-n', '--repetitions', type=int, default=10,
+        help='runs per scenario')
+    parser.add_argument(
+        '-p', '--port', type=int, default=1161,
+        help='UDP port of the stand-in agent')
+    parser.add_argument(
+        '-o', '--output',
+        help='JSON file to save results to (startup-<commit>.json by default)')
+    parser.add_argument(
+        '-c', '--compare',
+        help='JSON file with earlier results to compare medians against')
+
+    args = parser.parse_args()
+
+    results = runBenchmark(args.repetitions, args.port)
+
+    output = args.output or 'startup-%s.json' % results['commit']
+
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+
+    baseline = None
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+    sys.stdout.write(report(results, baseline))
+    sys.stdout.write('\nResults saved to %s\n' % output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,246 @@
+#
+# This file is part of snmpclitools software.
+#
+# Copyright (c) 2005-2019, Ilya Etingof <etingof@gmail.com>
+# License: http://snmplabs.com/snmpclitools/license.html
+#
+# snmptranslate mass mode benchmark.
+#
+# Generates and compiles a corpus of synthetic MIBs, then dumps the whole
+# MIB tree in each of the mass mode report forms (-Ta, -To, -Tl, -Ts)
+# walking MIB tree node by node and walking OID index snapshot of it.
+# Exits with non-zero status if the two produce different output.
+#
+# Usage: python benchmarks/translate.py [-c COUNT] [-o OBJECTS]
+#
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+from timeit import default_timer as now
+
+try:
+    from StringIO import StringIO
+
+except ImportError:
+    from io import StringIO
+
+try:
+    import tracemalloc
+
+except ImportError:
+    tracemalloc = None
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+sys.path.insert(0, os.path.dirname(BENCHMARKS_DIR))
+
+from pysnmp.smi import builder
+
+from snmpclitools.cli import mibcompiler
+from snmpclitools.cli import mibview
+from snmpclitools.cli import oidindex
+from snmpclitools.scripts import snmptranslate
+
+sys.path.insert(0, BENCHMARKS_DIR)
+
+from mibcache import BASE_MIBS
+
+MIB_TEMPLATE = """\
+%(name)s DEFINITIONS ::= BEGIN
+
+IMPORTS
+    MODULE-IDENTITY, OBJECT-TYPE, Integer32, enterprises
+        FROM SNMPv2-SMI;
+
+%(identity)s MODULE-IDENTITY
+    LAST-UPDATED "201910010000Z"
+    ORGANIZATION "snmpclitools"
+    CONTACT-INFO "snmpclitools benchmarks"
+    DESCRIPTION "Synthetic MIB module %(index)d"
+    ::= { enterprises %(arc)d }
+
+%(objects)s
+END
+"""
+
+OBJECT_TEMPLATE = """\
+%(identity)sObject%(index)d OBJECT-TYPE
+    SYNTAX      Integer32
+    MAX-ACCESS  read-only
+    STATUS      current
+    DESCRIPTION "Synthetic scalar %(index)d"
+    ::= { %(identity)s %(index)d }
+
+"""
+
+# Mass mode report forms (as in -T)
+REPORTS = ('a', 'o', 'l', 's')
+
+
+def generateMibs(directory, count, objects):
+    """Write synthetic ASN.1 MIBs into directory, return their names"""
+    for mibName, text in BASE_MIBS.items():
+        with open(os.path.join(directory, mibName), 'w') as f:
+            f.write(text)
+
+    mibNames = []
+
+    for index in range(count):
+        mibName = 'TRANSLATE-MIB-%d' % index
+        identity = 'translateMib%d' % index
+
+        with open(os.path.join(directory, mibName), 'w') as f:
+            f.write(MIB_TEMPLATE % dict(
+                name=mibName, identity=identity, index=index,
+                arc=50000 + index,
+                objects=''.join([OBJECT_TEMPLATE % dict(
+                    identity=identity, index=x + 1)
+                    for x in range(objects)])))
+
+        mibNames.append(mibName)
+
+    return mibNames
+
+
+class NullWriter(object):
+    def write(self, data):
+        pass
+
+
+def translate(ctx):
+    # Run snmptranslate report capturing its output
+    stdout = sys.stdout
+
+    try:
+        sys.stdout = StringIO()
+
+        startedAt = now()
+
+        snmptranslate.finish(None, ctx)
+
+        took = now() - startedAt
+
+        output = sys.stdout.getvalue()
+
+        peak = 0
+
+        # Tracing memory slows things down, hence a separate run
+        if tracemalloc:
+            sys.stdout = NullWriter()
+
+            tracemalloc.start()
+
+            try:
+                snmptranslate.finish(None, ctx)
+
+                peak = tracemalloc.get_traced_memory()[1]
+
+            finally:
+                tracemalloc.stop()
+
+        return output, took, peak
+
+    finally:
+        sys.stdout = stdout
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='snmptranslate mass mode benchmark')
+
+    parser.add_argument(
+        '-c', '--count', type=int, default=50,
+        help='number of synthetic MIBs to generate')
+    parser.add_argument(
+        '-o', '--objects', type=int, default=200,
+        help='number of MIB objects per MIB')
+
+    args = parser.parse_args()
+
+    workDir = tempfile.mkdtemp()
+
+    failures = []
+
+    try:
+        asn1Dir = os.path.join(workDir, 'asn1')
+        os.mkdir(asn1Dir)
+
+        pyDir = os.path.join(workDir, 'py')
+
+        os.environ['PYSNMPCACHEDIR'] = os.path.join(workDir, 'cache')
+
+        mibNames = generateMibs(asn1Dir, args.count, args.objects)
+
+        statuses = mibcompiler.compileMibs(
+            mibNames, ['file://%s' % asn1Dir], [], pyDir)
+
+        notCompiled = [x for x in mibNames
+                       if statuses.get(x, ('missing',))[0] != 'compiled']
+
+        if notCompiled:
+            sys.stdout.write('FAILED %s not compiled\n' % ', '.join(notCompiled))
+            sys.exit(1)
+
+        snmpEngine = mibview.MibEngine()
+
+        mibBuilder = snmpEngine.getMibBuilder()
+
+        mibBuilder.addMibSources(builder.DirMibSource(pyDir))
+        mibBuilder.loadModules(*mibNames)
+
+        mibViewController = mibview.getMibViewController(snmpEngine)
+
+        # Loads default MIBs, these should make it into the index
+        snmptranslate.MibViewProxy(mibViewController)
+
+        oidIndex = oidindex.OidIndex(mibViewController)
+        oidIndex.refresh()
+
+        sys.stdout.write('%d MIBs, %d MIB tree nodes\n' % (
+            len(mibBuilder.mibSymbols), len(list(oidIndex.walk()))))
+
+        for report in REPORTS:
+            outputs = []
+
+            for walkIndex in False, True:
+                mibViewProxy = snmptranslate.MibViewProxy(
+                    mibViewController, oidIndex)
+
+                generator = snmptranslate._Generator()
+
+                generator.n_TranslateOption(
+                    (None, {'mibViewProxy': mibViewProxy}),
+                    [None, mibview.base.ConfigToken('string', report)])
+
+                ctx = {'mibViewProxy': mibViewProxy,
+                       'mibViewController': mibViewController,
+                       'oidIndex': walkIndex and oidIndex or None,
+                       'varBinds': [((1, 3, 6), None)]}
+
+                outputs.append(translate(ctx))
+
+            (treeOutput, treeTook, treePeak), (indexOutput, indexTook, indexPeak) = outputs
+
+            sys.stdout.write(
+                '-T%s: %d lines, MIB tree %.6f sec (peak %d KB), '
+                'OID index %.6f sec (peak %d KB) (x%.2f)\n' % (
+                    report, treeOutput.count('\n'), treeTook,
+                    treePeak // 1024, indexTook, indexPeak // 1024,
+                    treeTook / indexTook))
+
+            if treeOutput != indexOutput:
+                failures.append('-T%s output differs' % report)
+
+    finally:
+        shutil.rmtree(workDir, ignore_errors=True)
+
+    for failure in failures:
+        sys.stdout.write('FAILED %s\n' % failure)
+
+    sys.exit(failures and 1 or 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,12 @@
+#!/usr/bin/env python
+#
+# This file is part of snmpclitools software.
+#
+# Copyright (c) 2005-2019, Ilya Etingof <etingof@gmail.com>
+# License: http://snmplabs.com/snmpclitools/license.html
+#
+# GETBULK table walker
+#
+from snmpclitools.cli import daemon
+
+daemon.runTool('snmptable')
@@ -64,6 +64,7 @@ try:
     params = {
         'install_requires': ['pysmi>=0.3.4,<0.4.0',
                              'pysnmp>=4.4.4,<5.0.0'],
+        'extras_require': {'parquet': ['pyarrow']},
         'zip_safe': True
     }
 
@@ -95,13 +96,18 @@ params.update(
         'classifiers': [x for x in classifiers.split('\n') if x],
         'platforms': ['any'],
         'license': 'BSD',
-        'packages': ['snmpclitools', 'snmpclitools.cli'],
+        'packages': ['snmpclitools', 'snmpclitools.cli',
+                     'snmpclitools.scripts'],
         'scripts': ['scripts/snmpget.py',
                     'scripts/snmpset.py',
                     'scripts/snmpwalk.py',
                     'scripts/snmpbulkwalk.py',
+                    'scripts/snmptable.py',
                     'scripts/snmptrap.py',
-                    'scripts/snmptranslate.py']
+                    'scripts/snmptranslate.py',
+                    'scripts/mibcompile.py',
+                    'scripts/mibpack.py',
+                    'scripts/snmpclitoolsd.py']
     }
 )
 
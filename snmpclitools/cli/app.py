@@ -0,0 +1,440 @@
+#
+# This file is part of snmpclitools software.
+#
+# Copyright (c) 2005-2019, Ilya Etingof <etingof@gmail.com>
+# License: http://snmplabs.com/snmpclitools/license.html
+#
+# Run SNMP tool against SNMP engine
+#
+import sys
+import traceback
+from contextlib import contextmanager
+
+from pysnmp import error
+
+from snmpclitools.cli import main as general
+from snmpclitools.cli import output
+from snmpclitools.cli import timing
+from snmpclitools.error import UsmUserBusyError
+
+# Max number of batch commands run concurrently
+BATCH_WINDOW = 256
+
+# Options not taking any value
+FLAG_OPTIONS = ('-h', '--help', '-V', '--version', '-d', '--mib-offline',
+                '--filter')
+
+
+def run(tool, snmpEngine, argv, ctx=None):
+    """Run SNMP command-line tool.
+
+    Parameters
+    ----------
+    tool:
+        SNMP tool module (e.g. :py:mod:`snmpclitools.scripts.snmpget`)
+        implementing `Scanner` and `Parser` classes, `getUsage()`,
+        `start(snmpEngine, ctx, ast)` and `finish(snmpEngine, ctx)`
+        functions. Tools may also implement `newEngine()`.
+    snmpEngine: :py:class:`~pysnmp.entity.engine.SnmpEngine`
+        SNMP engine to configure and run. The engine may be reused
+        for running further commands. If `None`, new engine is created
+        once the command line is known to need one.
+    argv: :py:class:`list`
+        Command-line arguments (excluding program name)
+    ctx: :py:class:`dict`
+        Initial tool context, new one is created if omitted
+
+    Returns
+    -------
+    :py:class:`int`
+        Process exit code
+    """
+    try:
+        with output.buffered():
+            return _run(tool, snmpEngine, argv, ctx)
+
+    except EnvironmentError:
+        # Buffered output could not be written out
+        sys.stderr.write('Process terminated: %s\n' % sys.exc_info()[1])
+        return 1
+
+
+def _run(tool, snmpEngine, argv, ctx):
+    try:
+        batchFile, argv = getBatchFile(argv)
+
+    except error.PySnmpError:
+        sys.stderr.write('Error: %s\n%s' % (sys.exc_info()[1], tool.getUsage()))
+        return 1
+
+    if batchFile is not None:
+        return runBatch(tool, snmpEngine, batchFile, argv)
+
+    if ctx is None:
+        ctx = {}
+
+    timer = ctx.setdefault('timer', timing.Timer())
+
+    try:
+        ast = prepare(tool, ctx, argv)
+
+        if snmpEngine is None:
+            with timer.measure('engine'):
+                snmpEngine = newEngine(tool)
+
+        tool.start(snmpEngine, ctx, ast)
+
+        ctx['sentAt'] = timing.now()
+
+        if snmpEngine.transportDispatcher:
+            snmpEngine.transportDispatcher.runDispatcher()
+
+    except KeyboardInterrupt:
+        sys.stderr.write('Shutting down...\n')
+
+    except error.PySnmpError:
+        sys.stderr.write('Error: %s\n%s' % (sys.exc_info()[1], tool.getUsage()))
+        return 1
+
+    except Exception:
+        sys.stderr.write('Process terminated: %s\n' % sys.exc_info()[1])
+
+        for line in traceback.format_exception(*sys.exc_info()):
+            sys.stderr.write(line.replace('\n', ';'))
+
+        return 1
+
+    with timer.measure('finish'):
+        tool.finish(snmpEngine, ctx)
+
+    if ctx.get('reportTiming'):
+        sys.stderr.write(getTimingReport(ctx))
+
+    return 0
+
+
+def getTimingReport(ctx):
+    """Return -Dtiming report on tool run phases and MIB view caches"""
+    text = ctx['timer'].report()
+
+    mibViewProxy = ctx.get('mibViewProxy')
+
+    if mibViewProxy is not None:
+        text += '   OID cache: %s hits, %s misses\n' % (
+            mibViewProxy.getOidCacheStats())
+
+        text += '   Index cache: %s hits, %s misses\n' % (
+            mibViewProxy.getIndexCacheStats())
+
+    return text
+
+
+def main(tool, ctx=None):
+    """Run SNMP command-line tool in this process and exit"""
+    sys.exit(run(tool, None, sys.argv[1:], ctx))
+
+
+def newEngine(tool):
+    """Create SNMP engine for tool.
+
+    Tools not talking SNMP may implement `newEngine()` returning a
+    lighter object. Otherwise full-blown SNMP engine is created.
+    """
+    if hasattr(tool, 'newEngine'):
+        return tool.newEngine()
+
+    # SNMP engine pulls in all protocol and crypto modules
+    from pysnmp.entity import engine
+
+    return engine.SnmpEngine()
+
+
+def parse(ctx, scannerClass, parserClass, argv):
+    """Parse command line into AST"""
+    with timing.measure(ctx, 'tokenize'):
+        tokens = scannerClass().tokenize(' '.join(argv))
+
+    with timing.measure(ctx, 'parse'):
+        return parserClass().parse(tokens)
+
+
+def prepare(tool, ctx, argv):
+    """Parse command line and apply general options.
+
+    Help, version and debugging options do not need SNMP engine, so
+    they are handled before anything heavy gets loaded.
+    """
+    ast = parse(ctx, tool.Scanner, tool.Parser, argv)
+
+    generate((None, ctx), ast, general.generator)
+
+    return ast
+
+
+def generate(cbCtx, ast, *generators):
+    """Apply AST generators to SNMP entity one by one"""
+    snmpEngine, ctx = cbCtx
+
+    for generator in generators:
+        name = '%s.%s' % (generator.__module__.split('.')[-1],
+                          generator.__name__)
+
+        with timing.measure(ctx, name):
+            generator(cbCtx, ast)
+
+
+def getBatchFile(argv):
+    """Pick batch mode option out of command line.
+
+    Only options preceding the agent are looked at, values of the
+    options and tool parameters (e.g. SNMP SET values) are never taken
+    for batch mode option. Option scan also stops at (and drops) `--`.
+
+    Parameters
+    ----------
+    argv: :py:class:`list`
+        Command-line arguments (excluding program name)
+
+    Returns
+    -------
+    :py:class:`tuple`
+        Batch file name (`-` stands for stdin) or `None` if not in
+        batch mode and the rest of the command-line arguments
+    """
+    batchFile = None
+    restArgv = []
+
+    args = iter(argv)
+
+    for arg in args:
+        if arg == '--':
+            restArgv.extend(args)
+            break
+
+        if arg == '-' or not arg.startswith('-'):
+            restArgv.append(arg)
+            restArgv.extend(args)
+            break
+
+        if arg in ('-B', '--batch'):
+            batchFile = next(args, None)
+
+            if batchFile is None:
+                raise error.PySnmpError('Missing batch file name')
+
+        elif arg.startswith('--batch='):
+            batchFile = arg[8:]
+
+        elif arg.startswith('-B'):
+            batchFile = arg[2:]
+
+        else:
+            restArgv.append(arg)
+
+            # option value may be given as the next argument
+            if arg not in FLAG_OPTIONS and (
+                    arg.startswith('--') or len(arg) == 2 or
+                    len(arg) == 3 and arg[1] == '3'):
+                value = next(args, None)
+
+                if value is not None:
+                    restArgv.append(value)
+
+    return batchFile, restArgv
+
+
+class _TaggedWriter(object):
+    # Prefix each output line with the tag of its command
+    def __init__(self, stream, tag):
+        self._stream = stream
+        self._tag = tag
+        self._buffer = ''
+
+    def write(self, data):
+        lines = (self._buffer + data).split('\n')
+
+        self._buffer = lines.pop()
+
+        for line in lines:
+            self._stream.write('%s%s\n' % (self._tag, line))
+
+    def flush(self):
+        self._stream.flush()
+
+    def close(self):
+        if self._buffer:
+            self._stream.write('%s%s\n' % (self._tag, self._buffer))
+            self._buffer = ''
+
+        self._stream.flush()
+
+
+@contextmanager
+def redirect(ctx):
+    """Direct standard output and error streams to the ones of command.
+
+    Only works for commands that have `stdout` and `stderr` streams in
+    their context, otherwise does nothing.
+    """
+    if 'stdout' not in ctx:
+        yield
+        return
+
+    savedStdout, savedStderr = sys.stdout, sys.stderr
+
+    sys.stdout, sys.stderr = ctx['stdout'], ctx['stderr']
+
+    try:
+        yield
+
+    finally:
+        sys.stdout, sys.stderr = savedStdout, savedStderr
+
+
+def callback(cbFun):
+    """Make SNMP application callback write into the streams of its command.
+
+    The callback context is expected to be the tool context. The
+    time of the first callback invocation is recorded as the
+    response time of the command.
+    """
+    def cbFunWrapper(*args):
+        cbCtx = args[-1]
+
+        if 'sentAt' in cbCtx:
+            cbCtx['timer'].add('response', timing.now() - cbCtx.pop('sentAt'))
+
+        with redirect(cbCtx):
+            return cbFun(*args)
+
+    return cbFunWrapper
+
+
+def readBatch(batchFile):
+    if batchFile == '-':
+        lines = sys.stdin.readlines()
+
+    else:
+        try:
+            with open(batchFile) as f:
+                lines = f.readlines()
+
+        except IOError:
+            lines = None
+            reason = sys.exc_info()[1]
+
+        if lines is None:
+            raise error.PySnmpError(
+                'Batch file %s not readable: %s' % (batchFile, reason))
+
+    commands = []
+
+    for line in lines:
+        line = line.strip()
+
+        if line and not line.startswith('#'):
+            commands.append(line)
+
+    return commands
+
+
+def runBatch(tool, snmpEngine, batchFile, argv):
+    """Run many SNMP tool commands against one SNMP engine.
+
+    Each non-empty line of batch file holds command-line arguments of
+    one command. Command-line arguments given along with the batch
+    option are prepended to every command. Commands are started in
+    groups of up to `BATCH_WINDOW` so that requests to different agents
+    are in flight concurrently. Commands using USM user name with other
+    keys than a command in flight are put off until the next group.
+    Each output line is prefixed with the command it originates from.
+
+    Returns
+    -------
+    :py:class:`int`
+        Process exit code
+    """
+    try:
+        commands = readBatch(batchFile)
+
+    except error.PySnmpError:
+        sys.stderr.write('Error: %s\n%s' % (sys.exc_info()[1], tool.getUsage()))
+        return 1
+
+    exitCode = 0
+
+    commands = list(enumerate(commands))
+
+    while commands:
+        contexts = []
+        deferred = []
+
+        # USM users of the commands in flight and their keys
+        usmUsersInFlight = {}
+
+        for idx, command in commands[:BATCH_WINDOW]:
+            tag = '[%s] ' % command
+
+            ctx = {
+                'nameSuffix': '-%d' % idx,
+                'usmUsersInFlight': usmUsersInFlight,
+                'timer': timing.Timer(),
+                'stdout': _TaggedWriter(sys.stdout, tag),
+                'stderr': _TaggedWriter(sys.stderr, tag)
+            }
+
+            with redirect(ctx):
+                try:
+                    ast = prepare(tool, ctx, argv + [command])
+
+                    if snmpEngine is None:
+                        with ctx['timer'].measure('engine'):
+                            snmpEngine = newEngine(tool)
+
+                    tool.start(snmpEngine, ctx, ast)
+
+                except UsmUserBusyError:
+                    deferred.append((idx, command))
+
+                except error.PySnmpError:
+                    sys.stderr.write('Error: %s\n' % sys.exc_info()[1])
+                    exitCode = 1
+
+                except Exception:
+                    sys.stderr.write('Process terminated: %s\n' % sys.exc_info()[1])
+                    exitCode = 1
+
+                else:
+                    ctx['sentAt'] = timing.now()
+                    contexts.append(ctx)
+
+        commands = deferred + commands[BATCH_WINDOW:]
+
+        try:
+            if snmpEngine and snmpEngine.transportDispatcher:
+                snmpEngine.transportDispatcher.runDispatcher()
+
+        except KeyboardInterrupt:
+            sys.stderr.write('Shutting down...\n')
+            return 1
+
+        except Exception:
+            sys.stderr.write('Process terminated: %s\n' % sys.exc_info()[1])
+
+            for line in traceback.format_exception(*sys.exc_info()):
+                sys.stderr.write(line.replace('\n', ';'))
+
+            return 1
+
+        for ctx in contexts:
+            with redirect(ctx):
+                with ctx['timer'].measure('finish'):
+                    tool.finish(snmpEngine, ctx)
+
+                if ctx.get('reportTiming'):
+                    sys.stderr.write(getTimingReport(ctx))
+
+            ctx['stdout'].close()
+            ctx['stderr'].close()
+
+    return exitCode
@@ -4,8 +4,11 @@
 # Copyright (c) 2005-2019, Ilya Etingof <etingof@gmail.com>
 # License: http://snmplabs.com/snmpclitools/license.html
 #
+import re
 import sys
 
+from snmpclitools.cli import cache
+from snmpclitools.cli import lalr
 from snmpclitools.cli import spark
 
 
@@ -92,6 +95,22 @@ class ConfigNode(object):
 # Scanner
 
 class _ScannerTemplate(spark.GenericScanner):
+    # Compiled token regexps shared by all instances of the same scanner
+    _compiledRes = {}
+
+    def __init__(self):
+        cls = self.__class__
+
+        if cls not in self._compiledRes:
+            pattern = self.reflect()
+            self._compiledRes[cls] = re.compile(pattern, re.VERBOSE)
+
+        self.re = self._compiledRes[cls]
+
+        self.index2func = {}
+        for name, number in self.re.groupindex.items():
+            self.index2func[number - 1] = getattr(self, 't_' + name)
+
     def tokenize(self, data):
         self.rv = []
         spark.GenericScanner.tokenize(self, data)
@@ -134,11 +153,99 @@ ScannerTemplate = _SecondLevelScanner
 class ParserTemplate(spark.GenericASTBuilder):
     START_SYMBOL = None
 
+    # Bump on any change to the layout of cached grammar tables
+    TABLES_FORMAT = 1
+
+    # Grammar tables shared by all instances of the same grammar
+    _grammarTables = {}
+
     def __init__(self, startSymbol=None):
         if startSymbol is None:
             startSymbol = self.START_SYMBOL
+        self.startSymbol = startSymbol
+        self.grammarKey = None
+        self.parseTables = None
         spark.GenericASTBuilder.__init__(self, ConfigNode, startSymbol)
 
+    def collectRules(self):
+        # Grammar is identified by the text of all its rules
+        ruleDocs = []
+        for name in spark._namelist(self):
+            if name[:2] == 'p_':
+                ruleDocs.append('%s %s' % (name, getattr(self, name).__doc__))
+
+        self.grammarKey = cache.getKey(
+            spark.__version__, self.TABLES_FORMAT, self.startSymbol, *ruleDocs)
+
+        tables = self._grammarTables.get(self.grammarKey)
+        if tables is None:
+            tables = cache.load('grammar', self.grammarKey)
+
+        if tables is None:
+            spark.GenericASTBuilder.collectRules(self)
+            return
+
+        self._grammarTables[self.grammarKey] = tables
+
+        for lhs, rules in tables['rules'].items():
+            self.rules[lhs] = list(rules)
+
+            for rule in rules:
+                name = tables['names'][rule]
+                self.rule2name[rule] = name
+                self.rule2func[rule] = self.preprocess(
+                    rule, getattr(self, 'p_' + name))[1]
+
+        self.first = tables['first']
+        self.parseTables = tables['lalr']
+
+    def makeFIRST(self):
+        tables = self._grammarTables.get(self.grammarKey)
+        if tables is not None:
+            self.first = tables['first']
+            self.parseTables = tables['lalr']
+            self.ruleschanged = 0
+            return
+
+        spark.GenericASTBuilder.makeFIRST(self)
+
+        rules = dict([(lhs, tuple(rules))
+                      for lhs, rules in self.rules.items()
+                      if lhs != self._START])
+
+        tables = {
+            'rules': rules,
+            'names': dict([(rule, self.rule2name[rule])
+                           for rulelist in rules.values()
+                           for rule in rulelist]),
+            'first': self.first,
+            'lalr': self.makeParseTables()
+        }
+
+        self._grammarTables[self.grammarKey] = tables
+
+        cache.store('grammar', self.grammarKey, tables)
+
+        self.parseTables = tables['lalr']
+        self.ruleschanged = 0
+
+    def makeParseTables(self):
+        # Ambiguous grammars can only be handled by Earley parser
+        try:
+            return lalr.makeTables(self.rules, self.startRule, self._EOF)
+
+        except lalr.GrammarConflict:
+            return
+
+    def parse(self, tokens):
+        if self.ruleschanged:
+            self.makeFIRST()
+
+        if self.parseTables is None:
+            return spark.GenericASTBuilder.parse(self, tokens)
+
+        return lalr.parse(self.parseTables, tokens, self.rule2func, self.error)
+
     def terminal(self, token):
         #  Reduce to homogeneous AST.
         return ConfigNode(token.type, token.attr)
@@ -146,35 +253,217 @@ class ParserTemplate(spark.GenericASTBuilder):
 
 # Generator
 
+def getPreorder(node):
+    """Flatten AST into a list of preorder traversal events.
+
+    Each event is a `(node, isExit, exitIndex)` tuple where `exitIndex`
+    points to the matching exit event of the node, so that pruned
+    subtrees can be skipped. Events are also indexed by node type.
+    The result is computed once and then reused by all generators
+    walking the same AST.
+    """
+    try:
+        return node.preorderEvents
+
+    except AttributeError:
+        pass
+
+    events = []
+    positions = {}
+
+    # (node, index of its enter event or None if not entered yet)
+    stack = [(node, None)]
+
+    while stack:
+        kid, enterIdx = stack.pop()
+
+        idx = len(events)
+
+        if enterIdx is None:
+            events.append(None)  # filled in on exit
+            stack.append((kid, idx))
+            stack.extend([(x, None) for x in reversed(kid)])
+
+        else:
+            events[enterIdx] = kid, False, idx
+            events.append((kid, True, idx))
+
+        if kid.type in positions:
+            positions[kid.type].append(idx)
+
+        else:
+            positions[kid.type] = [idx]
+
+    node.preorderEvents = events, positions
+
+    return node.preorderEvents
+
+
 class GeneratorTemplate(spark.GenericASTTraversal):
+    # Handler method names by node type, collected once per class
+    _handlerNames = {}
+
     def __init__(self):  # Skip superclass constructor
         pass
 
     def typestring(self, node):
         return node.type
 
-    def preorder(self, client, node):
+    @classmethod
+    def getHandlerNames(cls):
+        """Return `n_*` handler names by node type for this class.
+
+        Returns
+        -------
+        :py:class:`tuple`
+            Dict of `(enterName, exitName)` by node type and a flag
+            telling whether `default` method has been overridden.
+        """
         try:
-            name = 'n_' + self.typestring(node)
-            if hasattr(self, name):
-                func = getattr(self, name)
-                func(client, node)
+            return cls._handlerNames[cls]
+
+        except KeyError:
+            pass
+
+        names = {}
+
+        for name in dir(cls):
+            if name[:2] != 'n_':
+                continue
+
+            if name[-5:] == '_exit':
+                typ = name[2:-5]
+                names[typ] = names.get(typ, (None, None))[0], name
 
             else:
-                self.default(client, node)
+                typ = name[2:]
+                names[typ] = name, names.get(typ, (None, None))[1]
 
-        except spark.GenericASTTraversalPruningException:
-            return client
+        for klass in cls.__mro__:
+            if 'default' in klass.__dict__:
+                break
+
+        names = names, klass is not GeneratorTemplate
+
+        cls._handlerNames[cls] = names
+
+        return names
+
+    def getDispatchTable(self):
+        """Return bound `n_*` handlers by node type.
+
+        Returns
+        -------
+        :py:class:`tuple`
+            Dict of `(enterHandlers, exitHandlers)` lists by node type
+            and a list of handlers for node types not in the dict.
+        """
+        names, hasDefault = self.getHandlerNames()
+
+        defaults = hasDefault and [self.default] or []
+
+        dispatch = {}
 
-        for kid in node:
-            self.preorder(client, kid)
+        for typ, (enterName, exitName) in names.items():
+            dispatch[typ] = (
+                enterName and [getattr(self, enterName)] or defaults,
+                exitName and [getattr(self, exitName)] or []
+            )
 
-        name = name + '_exit'
-        if hasattr(self, name):
-            func = getattr(self, name)
-            func(client, node)
+        return dispatch, defaults
 
-        return client
+    def preorder(self, client, node):
+        dispatch, defaults = self.getDispatchTable()
+        return walk(client, node, dispatch, defaults)
 
     def default(self, client, node):
         pass
+
+
+class CompositeGenerator(object):
+    """Run many generators over AST in one pass.
+
+    Handlers of all generators are merged into a single dispatch
+    table. For every node, enter (and exit) handlers are called in
+    the order of the generators given. Pruning a subtree from any
+    handler prunes it for all generators.
+    """
+    def __init__(self, *generators):
+        self._generators = generators
+
+    def getDispatchTable(self):
+        tables = [g.getDispatchTable() for g in self._generators]
+
+        allTypes = set()
+
+        for dispatch, defaults in tables:
+            allTypes.update(dispatch)
+
+        mergedDispatch = {}
+
+        for typ in allTypes:
+            enters = []
+            exits = []
+
+            for dispatch, defaults in tables:
+                enter, exit = dispatch.get(typ, (defaults, []))
+                enters.extend(enter)
+                exits.extend(exit)
+
+            mergedDispatch[typ] = enters, exits
+
+        mergedDefaults = []
+
+        for dispatch, defaults in tables:
+            mergedDefaults.extend(defaults)
+
+        return mergedDispatch, mergedDefaults
+
+    def preorder(self, client, node):
+        dispatch, defaults = self.getDispatchTable()
+        return walk(client, node, dispatch, defaults)
+
+
+def walk(client, node, dispatch, defaults):
+    """Visit AST nodes in preorder invoking handlers by node type"""
+    events, positions = getPreorder(node)
+
+    if defaults:
+        indices = range(len(events))
+
+    else:
+        # Only visit nodes having handlers
+        indices = []
+
+        for typ in dispatch:
+            if typ in positions:
+                indices.extend(positions[typ])
+
+        indices.sort()
+
+    noHandlers = (defaults, [])
+
+    skipTo = 0
+
+    for idx in indices:
+        if idx < skipTo:
+            continue
+
+        kid, isExit, exitIdx = events[idx]
+
+        enters, exits = dispatch.get(kid.type, noHandlers)
+
+        if isExit:
+            for func in exits:
+                func(client, kid)
+
+            continue
+
+        try:
+            for func in enters:
+                func(client, kid)
+
+        except spark.GenericASTTraversalPruningException:
+            skipTo = exitIdx + 1
+
+    return client
@@ -0,0 +1,97 @@
+#
+# This file is part of snmpclitools software.
+#
+# Copyright (c) 2005-2019, Ilya Etingof <etingof@gmail.com>
+# License: http://snmplabs.com/snmpclitools/license.html
+#
+# Persistent on-disk cache for precomputed tool data.
+#
+import hashlib
+import os
+import pickle
+import sys
+import tempfile
+
+from snmpclitools import __version__ as PYSNMP_APP_VERSION
+
+if sys.platform[:3] == 'win':
+    DEFAULT_CACHE_DIR = os.path.join(
+        os.path.expanduser('~'), 'PySNMP Configuration', 'cache')
+
+else:
+    DEFAULT_CACHE_DIR = os.path.join(
+        os.path.expanduser('~'), '.pysnmp', 'cache')
+
+
+def getCacheDir():
+    """Return cache directory or `None` if caching is disabled.
+
+    The `PYSNMPCACHEDIR` environment variable overrides the default
+    location, setting it to an empty string turns caching off.
+    """
+    return os.environ.get('PYSNMPCACHEDIR', DEFAULT_CACHE_DIR) or None
+
+
+def getKey(*parts):
+    """Hash arbitrary strings into a cache key"""
+    digest = hashlib.sha1()
+
+    for part in (PYSNMP_APP_VERSION,) + parts:
+        if not isinstance(part, bytes):
+            part = str(part).encode('utf-8')
+
+        digest.update(part)
+        digest.update(b'\0')
+
+    return digest.hexdigest()
+
+
+def getPath(kind, key, suffix='.pickle'):
+    cacheDir = getCacheDir()
+    if cacheDir:
+        return os.path.join(cacheDir, '%s-%s%s' % (kind, key, suffix))
+
+
+def load(kind, key):
+    """Load cached object or return `None` if not cached"""
+    path = getPath(kind, key)
+    if not path:
+        return
+
+    try:
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+
+    except Exception:
+        return
+
+
+def store(kind, key, obj):
+    """Atomically store picklable object in the cache.
+
+    Failures are ignored - cache is always optional.
+    """
+    path = getPath(kind, key)
+    if not path:
+        return
+
+    try:
+        cacheDir = os.path.dirname(path)
+
+        if not os.path.isdir(cacheDir):
+            os.makedirs(cacheDir)
+
+        fd, tmpPath = tempfile.mkstemp(dir=cacheDir)
+
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(obj, f, pickle.HIGHEST_PROTOCOL)
+
+            os.rename(tmpPath, path)
+
+        except Exception:
+            os.remove(tmpPath)
+            raise
+
+    except Exception:
+        pass
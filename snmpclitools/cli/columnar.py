@@ -0,0 +1,293 @@
+#
+# This file is part of snmpclitools software.
+#
+# Copyright (c) 2005-2019, Ilya Etingof <etingof@gmail.com>
+# License: http://snmplabs.com/snmpclitools/license.html
+#
+# Columnar output of MIB table walks.
+#
+# Table rows are written into Apache Parquet file, one file column per
+# MIB table column. Column values are kept in typed arrays until a row
+# group fills up, then the row group is written out and the arrays are
+# started over, so memory does not grow with table size.
+#
+# Writing Parquet files takes the pyarrow package, which is imported
+# only once columnar output is asked for.
+#
+import array
+import sys
+
+from pyasn1.type import univ
+from pysnmp import error
+from pysnmp.proto import rfc1902
+
+from snmpclitools.cli import formatting
+from snmpclitools.cli import table
+
+# Rows written out at once
+ROW_GROUP_SIZE = 65536
+
+# Column types and array type codes values of those are kept in
+INT64 = 'int64'
+UINT64 = 'uint64'
+STRING = 'string'
+
+TYPE_CODES = {
+    INT64: 'q',
+    UINT64: 'Q'
+}
+
+
+def getColumnType(syntax):
+    """Return type of column holding values of SNMP type"""
+    if isinstance(syntax, rfc1902.Counter64):
+        return UINT64
+
+    if isinstance(syntax, univ.Integer):
+        return INT64
+
+    return STRING
+
+
+class ColumnarWriter(object):
+    """Write table rows into Parquet file in row groups.
+
+    Parameters
+    ----------
+    path: :py:class:`str`
+        File to write
+    fields: :py:class:`list`
+        Pairs of column name and column type (`INT64`, `UINT64` or
+        `STRING`)
+    rowGroupSize: :py:class:`int`
+        Rows to collect before writing them out
+    """
+    def __init__(self, path, fields, rowGroupSize=ROW_GROUP_SIZE):
+        try:
+            import pyarrow
+            from pyarrow import parquet
+
+        except ImportError:
+            pyarrow = None
+
+        if pyarrow is None:
+            raise error.PySnmpError(
+                'Columnar output requires pyarrow package '
+                '(pip install snmpclitools[parquet])')
+
+        self._pyarrow = pyarrow
+        self._types = [x[1] for x in fields]
+        self._rowGroupSize = rowGroupSize
+
+        self._schema = pyarrow.schema(
+            [pyarrow.field(name, getattr(pyarrow, columnType)())
+             for name, columnType in fields])
+
+        try:
+            self._writer = parquet.ParquetWriter(path, self._schema)
+
+        except EnvironmentError:
+            self._writer = None
+            reason = sys.exc_info()[1]
+
+        if self._writer is None:
+            raise error.PySnmpError('Cant write %s: %s' % (path, reason))
+
+        self.rows = 0
+
+        self._reset()
+
+    def _reset(self):
+        self._columns = []
+        self._nulls = []
+
+        for columnType in self._types:
+            if columnType in TYPE_CODES:
+                self._columns.append(array.array(TYPE_CODES[columnType]))
+
+            else:
+                self._columns.append([])
+
+            self._nulls.append([])
+
+    def writeRow(self, values):
+        """Add row to file, `None` values are nulls"""
+        for columnType, column, nulls, value in zip(
+                self._types, self._columns, self._nulls, values):
+
+            if value is None:
+                pass
+
+            elif columnType in TYPE_CODES:
+                try:
+                    column.append(value)
+
+                except (TypeError, OverflowError):
+                    value = None
+
+            else:
+                column.append(str(value))
+
+            if value is None:
+                if columnType in TYPE_CODES:
+                    column.append(0)
+
+                else:
+                    column.append('')
+
+            nulls.append(value is None)
+
+        self.rows += 1
+
+        if len(self._nulls[0]) >= self._rowGroupSize:
+            self.flush()
+
+    def flush(self):
+        """Write out rows collected so far as a row group"""
+        if not self._nulls or not self._nulls[0]:
+            return
+
+        pyarrow = self._pyarrow
+
+        arrays = []
+
+        for field, column, nulls in zip(
+                self._schema, self._columns, self._nulls):
+            arrays.append(pyarrow.array(
+                column, type=field.type, mask=pyarrow.array(nulls)))
+
+        self._writer.write_table(
+            pyarrow.Table.from_arrays(arrays, schema=self._schema))
+
+        self._reset()
+
+    def close(self):
+        """Write out remaining rows and finish the file"""
+        self.flush()
+
+        self._writer.close()
+
+
+class TableWriter(object):
+    """Write MIB table columns walked side by side into Parquet file.
+
+    File holds numeric row index, decoded row indices and a column per
+    MIB table column. Integer values are written as they are, other
+    values are rendered as per output options of MIB view proxy.
+
+    Parameters
+    ----------
+    path: :py:class:`str`
+        File to write
+    mibViewController: :py:class:`~pysnmp.smi.view.MibViewController`
+        MIB view MIB table columns are defined in
+    mibViewProxy: :py:class:`~snmpclitools.cli.mibview.MibViewProxy`
+        Turns varbinds into records
+    columns: :py:class:`list`
+        OIDs of MIB table columns being walked
+    rowGroupSize: :py:class:`int`
+        Rows to collect before writing them out
+    """
+    def __init__(self, path, mibViewController, mibViewProxy, columns,
+                 rowGroupSize=ROW_GROUP_SIZE):
+        mibBuilder = mibViewController.mibBuilder
+
+        self._mibViewController = mibViewController
+        self._columns = [tuple(x) for x in columns]
+
+        names = []
+        columnFields = []
+
+        for oid in self._columns:
+            modName, symName, suffix = mibViewController.getNodeLocation(oid)
+
+            mibNode, = mibBuilder.importSymbols(modName, symName)
+
+            names.append(symName)
+            columnFields.append((symName, getColumnType(mibNode.syntax)))
+
+        self._isInteger = [x[1] in TYPE_CODES for x in columnFields]
+
+        # Decoded row indices of the first table, unless walked as columns
+        modName, symName, suffix = mibViewController.getNodeLocation(
+            self._columns[0][:-1])
+
+        rowNode, = mibBuilder.importSymbols(modName, symName)
+
+        indexFields = []
+
+        self._isIndexField = []
+
+        for implied, modName, symName in rowNode.getIndexNames():
+            indexNode, = mibBuilder.importSymbols(modName, symName)
+
+            isField = (symName not in names and
+                       indexNode.name not in self._columns)
+
+            if isField:
+                names.append(symName)
+                indexFields.append((symName, getColumnType(indexNode.syntax)))
+
+            self._isIndexField.append(isField)
+
+        fields = [('index', STRING)] + indexFields + columnFields
+
+        self._getRecord = mibViewProxy.compileRecordBuilder()
+
+        self._rowAssembler = table.RowAssembler(len(self._columns))
+
+        self._writer = ColumnarWriter(path, fields, rowGroupSize)
+
+    @property
+    def rows(self):
+        return self._writer.rows
+
+    @property
+    def peakRows(self):
+        return self._rowAssembler.peakRows
+
+    def add(self, column, oid, val):
+        """Add instance of table column"""
+        record = self._getRecord(self._mibViewController, oid, val)
+
+        self._rowAssembler.add(
+            column, tuple(oid[len(self._columns[column]):]), record)
+
+    def finish(self, column):
+        """Mark table column as walked through"""
+        self._rowAssembler.finish(column)
+
+    def flush(self):
+        """Write complete rows into file"""
+        for index, records in self._rowAssembler.pop():
+            values = []
+
+            indices = ()
+
+            for isInteger, record in zip(self._isInteger, records):
+                if record is None:
+                    values.append(None)
+                    continue
+
+                indices = record[2]
+
+                # raw integers, rendered values of the rest
+                values.append(record[isInteger and 4 or 5])
+
+            if len(indices) != len(self._isIndexField):
+                indices = [None] * len(self._isIndexField)
+
+            indices = [x[1] for x in zip(self._isIndexField, indices) if x[0]]
+
+            values = [formatting.formatArcs(index)] + indices + values
+
+            self._writer.writeRow(values)
+
+    def close(self):
+        """Write out all the rows assembled and finish the file"""
+        for column in range(len(self._columns)):
+            self._rowAssembler.finish(column)
+
+        self.flush()
+
+        self._writer.close()
@@ -0,0 +1,429 @@
+#
+# This file is part of snmpclitools software.
+#
+# Copyright (c) 2005-2019, Ilya Etingof <etingof@gmail.com>
+# License: http://snmplabs.com/snmpclitools/license.html
+#
+# Long-running SNMP tools server and its thin client.
+#
+# The server keeps Python interpreter, pysnmp, compiled grammars and
+# loaded MIBs warm so that each tool invocation only pays for the work
+# specific to the request. Tools talk to the server over a Unix domain
+# socket by means of simple length-prefixed frames:
+#
+#   channel (1 octet) | payload length (4 octets, network order) | payload
+#
+# Client sends one request frame carrying JSON-encoded tool name, its
+# command-line arguments, working directory and the environment variables
+# tools consult. Server responds with any number of stdout and
+# stderr frames followed by exit status frame.
+#
+import json
+import os
+import socket
+import struct
+import sys
+
+from snmpclitools.cli import timing
+
+# This module is imported by thin clients - keep pysnmp imports lazy
+
+ENV_SOCKET = 'PYSNMPDAEMONSOCKET'
+
+# Environment of the client tools run in
+ENV_FORWARDED = ('PYSNMPCACHEDIR', 'PYSNMPMIBS', 'PYSNMPMIBDIRS',
+                 'PYSNMPMIBOFFLINE', 'PYSNMPOIDPREFIX', 'PYSNMPOIDCACHESIZE',
+                 'PYSNMPINDEXCACHESIZE')
+
+if sys.platform[:3] == 'win':
+    DEFAULT_SOCKET = os.path.join(
+        os.path.expanduser('~'), 'PySNMP Configuration', 'snmpclitoolsd.sock')
+
+else:
+    DEFAULT_SOCKET = os.path.join(
+        os.path.expanduser('~'), '.pysnmp', 'snmpclitoolsd.sock')
+
+TOOLS = ('snmpget', 'snmpset', 'snmpwalk', 'snmpbulkwalk',
+         'snmptable', 'snmptrap', 'snmptranslate')
+
+CH_REQUEST = b'q'
+CH_STDOUT = b'o'
+CH_STDERR = b'e'
+CH_EXIT = b'x'
+
+_HEADER = struct.Struct('!cI')
+
+
+def getSocketPath():
+    """Return daemon socket path configured for clients or `None`.
+
+    Tools are only forwarded to the daemon if the `PYSNMPDAEMONSOCKET`
+    environment variable is set.
+    """
+    return os.environ.get(ENV_SOCKET) or None
+
+
+def _sendFrame(sock, channel, payload):
+    sock.sendall(_HEADER.pack(channel, len(payload)) + payload)
+
+
+def _recvExactly(sock, size):
+    chunks = []
+
+    while size:
+        chunk = sock.recv(size)
+        if not chunk:
+            raise EOFError('connection closed by peer')
+
+        chunks.append(chunk)
+        size -= len(chunk)
+
+    return b''.join(chunks)
+
+
+def _recvFrame(sock):
+    channel, size = _HEADER.unpack(_recvExactly(sock, _HEADER.size))
+    return channel, _recvExactly(sock, size)
+
+
+# Client
+
+def _readsStdin(argv):
+    # Options end at the agent, same as in app.getBatchFile()
+    args = iter(argv)
+
+    for arg in args:
+        if arg == '--' or arg == '-' or not arg.startswith('-'):
+            break
+
+        if (arg.startswith('-B') or arg.startswith('--batch') or
+                arg == '--filter'):
+            return True
+
+        if arg not in ('-h', '--help', '-V', '--version', '-d',
+                       '--mib-offline') and (
+                arg.startswith('--') or len(arg) == 2 or
+                len(arg) == 3 and arg[1] == '3'):
+            next(args, None)
+
+    return False
+
+
+def request(socketPath, tool, argv):
+    """Run SNMP tool within the daemon.
+
+    Parameters
+    ----------
+    socketPath: :py:class:`str`
+        Daemon Unix socket path
+    tool: :py:class:`str`
+        Tool name (e.g. `snmpget`)
+    argv: :py:class:`list`
+        Full command line including program name
+
+    Returns
+    -------
+    :py:class:`int`
+        Tool exit code or `None` if daemon is not reachable
+    """
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+
+    try:
+        sock.connect(socketPath)
+
+    except socket.error:
+        sock.close()
+        return
+
+    try:
+        env = dict([(x, os.environ[x])
+                    for x in ENV_FORWARDED if x in os.environ])
+
+        _sendFrame(sock, CH_REQUEST, json.dumps(
+            {'tool': tool, 'argv': list(argv), 'cwd': os.getcwd(),
+             'env': env}).encode('utf-8'))
+
+        while True:
+            channel, payload = _recvFrame(sock)
+
+            if channel == CH_STDOUT:
+                sys.stdout.write(payload.decode('utf-8'))
+                sys.stdout.flush()
+
+            elif channel == CH_STDERR:
+                sys.stderr.write(payload.decode('utf-8'))
+                sys.stderr.flush()
+
+            elif channel == CH_EXIT:
+                return int(payload)
+
+    except (EOFError, socket.error):
+        sys.stderr.write('Error: %s\n' % sys.exc_info()[1])
+        return 1
+
+    finally:
+        sock.close()
+
+
+def runTool(tool):
+    """Run SNMP tool within the daemon if configured or locally"""
+    socketPath = getSocketPath()
+
+    # Batch file and stdin belong to the client, besides batch and
+    # filter modes already pay startup costs just once
+    if socketPath and not _readsStdin(sys.argv[1:]):
+        exitCode = request(socketPath, tool, sys.argv)
+        if exitCode is not None:
+            sys.exit(exitCode)
+
+    timer = timing.Timer()
+
+    with timer.measure('imports'):
+        module = _importTool(tool)
+
+    module.run({'timer': timer})
+
+
+# Server
+
+def _parseRequest(payload):
+    # Return tool, argv, cwd and env of the request or raise ValueError
+    try:
+        req = json.loads(payload.decode('utf-8'))
+
+    except ValueError:  # including UnicodeDecodeError
+        raise ValueError('malformed request')
+
+    if not isinstance(req, dict):
+        raise ValueError('malformed request')
+
+    tool = req.get('tool')
+    argv = req.get('argv') or [tool]
+    cwd = req.get('cwd')
+    env = req.get('env') or {}
+
+    strings = type(u'')
+
+    if (not isinstance(tool, strings) or
+            not isinstance(argv, list) or
+            [x for x in argv if not isinstance(x, strings)] or
+            cwd is not None and not isinstance(cwd, strings) or
+            not isinstance(env, dict) or
+            [x for x in env if x not in ENV_FORWARDED or
+             not isinstance(env[x], strings)]):
+        raise ValueError('malformed request')
+
+    return str(tool), [str(x) for x in argv], cwd, env
+
+
+def _importTool(tool):
+    if tool not in TOOLS:
+        raise ValueError('unknown tool %s' % tool)
+
+    moduleName = 'snmpclitools.scripts.' + tool
+
+    __import__(moduleName)
+
+    return sys.modules[moduleName]
+
+
+class _FrameWriter(object):
+    # File-like object turning writes into response frames
+    def __init__(self, sock, channel):
+        self._sock = sock
+        self._channel = channel
+
+    def write(self, data):
+        if not data:
+            return
+
+        if not isinstance(data, bytes):
+            data = data.encode('utf-8')
+
+        _sendFrame(self._sock, self._channel, data)
+
+    def writelines(self, lines):
+        for line in lines:
+            self.write(line)
+
+    def flush(self):
+        pass
+
+    def isatty(self):
+        return False
+
+
+class Server(object):
+    """Serve SNMP tools requests over Unix domain socket.
+
+    Requests are served one at a time. SNMP engine of each tool is
+    created on first use and reused by subsequent requests unless
+    the request leaves outstanding jobs behind.
+    """
+    def __init__(self, socketPath=DEFAULT_SOCKET):
+        self._socketPath = socketPath
+        self._engines = {}
+        self._sock = None
+
+    def open(self):
+        socketDir = os.path.dirname(self._socketPath)
+
+        if socketDir and not os.path.isdir(socketDir):
+            os.makedirs(socketDir)
+
+        if os.path.exists(self._socketPath):
+            # Remove stale socket unless someone is listening on it
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+
+            try:
+                probe.connect(self._socketPath)
+
+            except socket.error:
+                os.remove(self._socketPath)
+
+            else:
+                raise RuntimeError(
+                    'daemon is already running at %s' % self._socketPath)
+
+            finally:
+                probe.close()
+
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._sock.bind(self._socketPath)
+
+        os.chmod(self._socketPath, 0o600)
+
+        self._sock.listen(5)
+
+    def close(self):
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+
+            try:
+                os.remove(self._socketPath)
+
+            except OSError:
+                pass
+
+        for snmpEngine in self._engines.values():
+            self._closeEngine(snmpEngine)
+
+        self._engines.clear()
+
+    def serveForever(self):
+        while True:
+            conn, addr = self._sock.accept()
+
+            try:
+                self.serve(conn)
+
+            except (EOFError, socket.error):
+                pass
+
+            finally:
+                conn.close()
+
+    def serve(self, conn):
+        channel, payload = _recvFrame(conn)
+
+        if channel != CH_REQUEST:
+            return
+
+        try:
+            tool, argv, cwd, env = _parseRequest(payload)
+
+            module = _importTool(tool)
+
+        except ValueError:
+            _sendFrame(conn, CH_STDERR,
+                       ('Error: %s\n' % sys.exc_info()[1]).encode('utf-8'))
+            _sendFrame(conn, CH_EXIT, b'1')
+            return
+
+        exitCode = self.runTool(
+            module, argv, _FrameWriter(conn, CH_STDOUT),
+            _FrameWriter(conn, CH_STDERR), cwd, env)
+
+        _sendFrame(conn, CH_EXIT, str(exitCode).encode('ascii'))
+
+    def runTool(self, module, argv, stdout, stderr, cwd=None, env=None):
+        """Run tool as if started in `cwd` with `env` environment.
+
+        Relative paths on the command line resolve against the client's
+        working directory, environment variables the tools consult
+        (`ENV_FORWARDED`) are those of the client.
+        """
+        from pysnmp import debug
+
+        from snmpclitools.cli import app
+
+        tool = module.__name__
+
+        snmpEngine = self._engines.get(tool)
+        if snmpEngine is None:
+            snmpEngine = self._engines[tool] = app.newEngine(module)
+
+        savedArgv = sys.argv
+        savedStdout, savedStderr = sys.stdout, sys.stderr
+
+        savedCwd = os.getcwd()
+        savedEnv = dict([(x, os.environ.get(x)) for x in ENV_FORWARDED])
+
+        sys.argv = argv
+        sys.stdout, sys.stderr = stdout, stderr
+
+        try:
+            if env is not None:
+                self._setEnv(env)
+
+            try:
+                if cwd is not None:
+                    os.chdir(cwd)
+
+            except OSError:  # client's working directory is gone
+                exitCode = 1
+                stderr.write('Error: %s\n' % sys.exc_info()[1])
+
+            else:
+                exitCode = app.run(module, snmpEngine, argv[1:])
+
+        except SystemExit:
+            exitCode = sys.exc_info()[1].code or 0
+
+        finally:
+            sys.argv = savedArgv
+            sys.stdout, sys.stderr = savedStdout, savedStderr
+
+            os.chdir(savedCwd)
+
+            self._setEnv(savedEnv)
+
+            # Debugging is global, do not let it leak into other requests
+            debug.setLogger(0)
+
+        transportDispatcher = snmpEngine.transportDispatcher
+
+        if transportDispatcher and transportDispatcher.jobsArePending():
+            # Interrupted request - start over with a fresh engine
+            self._closeEngine(self._engines.pop(tool))
+
+        return exitCode
+
+    @staticmethod
+    def _setEnv(env):
+        for name in ENV_FORWARDED:
+            if env.get(name) is None:
+                os.environ.pop(name, None)
+
+            else:
+                os.environ[name] = env[name]
+
+    @staticmethod
+    def _closeEngine(snmpEngine):
+        if snmpEngine.transportDispatcher:
+            try:
+                snmpEngine.transportDispatcher.closeDispatcher()
+
+            except Exception:
+                pass
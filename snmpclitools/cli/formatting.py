@@ -0,0 +1,153 @@
+#
+# This file is part of snmpclitools software.
+#
+# Copyright (c) 2005-2019, Ilya Etingof <etingof@gmail.com>
+# License: http://snmplabs.com/snmpclitools/license.html
+#
+# Byte-level formatting of SNMP values.
+#
+# Octet strings are turned into hex by bytes.hex() (where supported)
+# rather than formatting each octet, printable octet strings are told
+# by deleting printable octets through translation table, OID arcs and
+# decimal octets are looked up in tables of precomputed strings. These
+# helpers are shared by all the formatters and produce the very same
+# text as pyasn1 and pysnmp do.
+#
+import binascii
+import re
+
+from pyasn1.type import univ
+
+# OID arcs having precomputed strings
+ARCS_TABLE_SIZE = 4096
+
+DECIMAL_ARCS = [str(x) for x in range(ARCS_TABLE_SIZE)]
+HEX_ARCS = ['%x' % x for x in range(ARCS_TABLE_SIZE)]
+
+HEX_OCTETS = ['%.2x' % x for x in range(256)]
+
+# Octets pyasn1 renders as text rather than hex
+PRINTABLE_OCTETS = bytes(bytearray(range(32, 127)))
+
+# DISPLAY-HINTs rendered here: one octet per number (e.g. `1x:` of
+# MAC address) or text (e.g. `255a` of DisplayString)
+DISPLAY_HINT = re.compile(r'^(?:1([dx])([^0-9*]?)|[0-9]+a)$')
+
+try:
+    b''.hex(' ')
+
+except (AttributeError, TypeError):  # Python < 3.8
+    def formatHexOctets(data, separator=' '):
+        """Return octets in hex separated by `separator`"""
+        if not separator:
+            return binascii.hexlify(data).decode('ascii')
+
+        return separator.join([HEX_OCTETS[x] for x in bytearray(data)])
+
+else:
+    def formatHexOctets(data, separator=' '):
+        """Return octets in hex separated by `separator`"""
+        if not separator:
+            return data.hex()
+
+        return data.hex(separator)
+
+
+def formatDecimalOctets(data, separator='.'):
+    """Return octets as decimal numbers separated by `separator`"""
+    return separator.join([DECIMAL_ARCS[x] for x in bytearray(data)])
+
+
+def formatArcs(arcs, separator='.'):
+    """Return OID arcs in decimal separated by `separator`"""
+    return separator.join(
+        [x < ARCS_TABLE_SIZE and DECIMAL_ARCS[x] or str(x) for x in arcs])
+
+
+def formatHexArcs(arcs, separator=' '):
+    """Return OID arcs in hex separated by `separator`"""
+    return separator.join(
+        [x < ARCS_TABLE_SIZE and HEX_ARCS[x] or '%x' % x for x in arcs])
+
+
+def formatTimeTicks(ticks):
+    """Return TimeTicks as days and time of day, e.g. `2 days 3:4:5.6`"""
+    days, ticks = divmod(ticks, 8640000)
+    hours, ticks = divmod(ticks, 360000)
+    minutes, ticks = divmod(ticks, 6000)
+    seconds, ticks = divmod(ticks, 100)
+
+    return '%d days %d:%d:%d.%d' % (days, hours, minutes, seconds, ticks)
+
+
+def isPrintable(data):
+    """Return `True` if octets are rendered as text by pyasn1"""
+    return not data.translate(None, PRINTABLE_OCTETS)
+
+
+def compileOctetsFormatter(syntax):
+    """Return callable rendering octets of SNMP type.
+
+    Plain octet strings and octet strings of DISPLAY-HINT matching
+    `DISPLAY_HINT` are rendered here, byte for byte the same as by
+    :py:meth:`prettyPrint` of SNMP type.
+
+    Parameters
+    ----------
+    syntax: :py:class:`~pyasn1.type.univ.OctetString`
+        SNMP type values are of
+
+    Returns
+    -------
+    : :py:class:`callable` or `None`
+        Takes octets and returns text, `None` if SNMP type renders its
+        values some other way
+    """
+    syntaxType = syntax.__class__
+
+    if (not isinstance(syntax, univ.OctetString) or
+            getattr(syntax, 'namedValues', None) or
+            syntaxType.prettyPrint != univ.OctetString.prettyPrint):
+        return
+
+    if (syntaxType.prettyOut == univ.OctetString.prettyOut and
+            syntaxType.prettyIn == univ.OctetString.prettyIn):
+        encoding = syntax.encoding
+
+        def formatOctets(data):
+            if isPrintable(data):
+                return data.decode(encoding)
+
+            return '0x' + formatHexOctets(data, '')
+
+        return formatOctets
+
+    # TEXTUAL-CONVENTION evaluates DISPLAY-HINT of OCTET STRING types only
+    if not univ.OctetString.tagSet.isSuperTagSetOf(syntax.tagSet):
+        return
+
+    for baseType in syntaxType.__mro__:
+        if baseType.__name__ == 'TextualConvention':
+            break
+
+    else:
+        return
+
+    if (syntaxType.prettyOut != baseType.prettyOut or
+            syntaxType.prettyIn != baseType.prettyIn):
+        return
+
+    match = DISPLAY_HINT.match(getattr(syntax, 'displayHint', '') or '')
+
+    if not match:
+        return
+
+    displayFormat, separator = match.groups()
+
+    if displayFormat == 'x':
+        return lambda data: formatHexOctets(data, separator)
+
+    if displayFormat == 'd':
+        return lambda data: formatDecimalOctets(data, separator)
+
+    return lambda data: data.decode('ascii', 'ignore')
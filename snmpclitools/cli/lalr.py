@@ -0,0 +1,281 @@
+#
+# This file is part of snmpclitools software.
+#
+# Copyright (c) 2005-2019, Ilya Etingof <etingof@gmail.com>
+# License: http://snmplabs.com/snmpclitools/license.html
+#
+# Table-driven LALR(1) parser for SPARK grammars.
+#
+# Parse tables are built from the rules collected by
+# `spark.GenericParser`. Unlike the Earley engine, the LR automaton
+# runs in linear time, but it can only handle unambiguous
+# grammars. Table construction fails on any shift/reduce or
+# reduce/reduce conflict so that the caller could fall back
+# to the general Earley parser.
+#
+
+ACCEPT = None
+
+
+class GrammarConflict(Exception):
+    pass
+
+
+def _makeFirst(rules):
+    # FIRST sets of all non-terminals and the set of nullable ones
+    first = dict([(lhs, set()) for lhs in rules])
+    nullable = set()
+
+    changes = True
+    while changes:
+        changes = False
+
+        for rulelist in rules.values():
+            for lhs, rhs in rulelist:
+                size = len(first[lhs])
+
+                for sym in rhs:
+                    if sym not in rules:
+                        first[lhs].add(sym)
+                        break
+
+                    first[lhs].update(first[sym])
+
+                    if sym not in nullable:
+                        break
+
+                else:
+                    if lhs not in nullable:
+                        nullable.add(lhs)
+                        changes = True
+
+                if len(first[lhs]) != size:
+                    changes = True
+
+    return first, nullable
+
+
+def makeTables(rules, startRule, eof):
+    """Build LALR(1) parse tables.
+
+    Parameters
+    ----------
+    rules: :py:class:`dict`
+        Grammar rules as collected by `spark.GenericParser` (LHS
+        mapped into a list of `(lhs, rhs)` tuples) including the
+        augmented start rule.
+    startRule: :py:class:`tuple`
+        The augmented start rule in form of `(START, (start, eof))`.
+    eof: :py:class:`str`
+        End-of-input pseudo-terminal.
+
+    Returns
+    -------
+    :py:class:`dict`
+        Picklable parse tables for :py:func:`parse`.
+
+    Raises
+    ------
+    GrammarConflict
+        If grammar is not LALR(1).
+    """
+    first, nullable = _makeFirst(rules)
+
+    def firstOfSequence(syms, lookaheads):
+        result = set()
+
+        for sym in syms:
+            if sym not in rules:
+                result.add(sym)
+                return result
+
+            result.update(first[sym])
+
+            if sym not in nullable:
+                return result
+
+        result.update(lookaheads)
+
+        return result
+
+    def closure(kernel):
+        items = dict([(item, set(la)) for item, la in kernel.items()])
+        todo = list(items)
+
+        while todo:
+            rule, pos = item = todo.pop()
+            rhs = rule[1]
+
+            if pos == len(rhs) or rhs[pos] not in rules:
+                continue
+
+            lookaheads = firstOfSequence(rhs[pos + 1:], items[item])
+
+            for prule in rules[rhs[pos]]:
+                pitem = prule, 0
+
+                if pitem not in items:
+                    items[pitem] = set(lookaheads)
+                    todo.append(pitem)
+
+                elif not lookaheads.issubset(items[pitem]):
+                    items[pitem].update(lookaheads)
+                    todo.append(pitem)
+
+        return items
+
+    # LR(1) item sets with cores merged on the fly (LALR(1))
+
+    kernels = [{(startRule, 0): set()}]
+    kernelIndex = {frozenset(kernels[0]): 0}
+    transitions = {}
+
+    todo = [0]
+
+    while todo:
+        state = todo.pop()
+
+        moves = {}
+
+        for (rule, pos), lookaheads in closure(kernels[state]).items():
+            rhs = rule[1]
+
+            if pos < len(rhs):
+                kernel = moves.setdefault(rhs[pos], {})
+                kernel.setdefault((rule, pos + 1), set()).update(lookaheads)
+
+        for sym, kernel in moves.items():
+            core = frozenset(kernel)
+
+            if core in kernelIndex:
+                nextState = kernelIndex[core]
+
+                changed = False
+
+                for item, lookaheads in kernel.items():
+                    if not lookaheads.issubset(kernels[nextState][item]):
+                        kernels[nextState][item].update(lookaheads)
+                        changed = True
+
+                if changed and nextState not in todo:
+                    todo.append(nextState)
+
+            else:
+                nextState = len(kernels)
+                kernels.append(kernel)
+                kernelIndex[core] = nextState
+                todo.append(nextState)
+
+            transitions[(state, sym)] = nextState
+
+    # Compile ACTION/GOTO tables
+
+    ruleList = []
+    ruleNumbers = {}
+
+    for rulelist in rules.values():
+        for rule in rulelist:
+            ruleNumbers[rule] = len(ruleList)
+            ruleList.append(rule)
+
+    actions = [{} for _ in kernels]
+    gotos = [{} for _ in kernels]
+
+    for (state, sym), nextState in transitions.items():
+        if sym in rules:
+            gotos[state][sym] = nextState
+
+        elif sym == eof:
+            actions[state][sym] = ACCEPT
+
+        else:
+            actions[state][sym] = nextState
+
+    for state, kernel in enumerate(kernels):
+        for (rule, pos), lookaheads in closure(kernel).items():
+            if pos != len(rule[1]):
+                continue
+
+            for sym in lookaheads:
+                if sym in actions[state]:
+                    raise GrammarConflict(
+                        'LALR(1) conflict in state %s on %s for '
+                        '%s ::= %s' % (state, sym, rule[0],
+                                       ' '.join(rule[1])))
+
+                # reductions are encoded as negative numbers
+                actions[state][sym] = -ruleNumbers[rule] - 1
+
+    return {
+        'rules': ruleList,
+        'actions': actions,
+        'gotos': gotos,
+        'eof': eof
+    }
+
+
+def parse(tables, tokens, rule2func, error):
+    """Run LR automaton over tokens.
+
+    Tokens are expected to have `type` attribute matching grammar
+    terminals. Each reduction calls the `rule2func` function of the
+    rule with the list of RHS values - exactly as the Earley tree
+    builder does. The `error` callable is invoked with the offending
+    token and is expected to raise.
+    """
+    rules = tables['rules']
+    actions = tables['actions']
+    gotos = tables['gotos']
+    eof = tables['eof']
+
+    states = [0]
+    values = []
+
+    idx = 0
+    count = len(tokens)
+
+    while True:
+        if idx < count:
+            token = tokens[idx]
+            sym = token.type
+
+        else:
+            token = sym = eof
+
+        try:
+            action = actions[states[-1]][sym]
+
+        except KeyError:
+            break
+
+        if action is ACCEPT:
+            return values[0]
+
+        elif action >= 0:
+            states.append(action)
+            values.append(token)
+            idx += 1
+
+        else:
+            rule = rules[-action - 1]
+            lhs, rhs = rule
+
+            size = len(rhs)
+
+            if size:
+                args = values[-size:]
+                del values[-size:]
+                del states[-size:]
+
+            else:
+                args = []
+
+            values.append(rule2func[rule](args))
+            states.append(gotos[states[-1]][lhs])
+
+    if token is eof:
+        # Mimic Earley parser: blame the last real token
+        error(tokens and tokens[-1] or eof)
+
+    else:
+        error(token)
@@ -7,7 +7,6 @@
 import sys
 
 from pysnmp import error
-from pysnmp.smi import view
 
 try:
     from pysnmp import __version__ as PYSNMP_VERSION
@@ -48,12 +47,15 @@ Debugging options:
    -V                    software release information
    -d                    dump raw packets
    -D category           enable debugging [%s]
+Batch options:
+   -B FILE, --batch FILE run commands read from FILE (- for stdin),
+                         one command-line per line
 """ % (PYSNMP_APP_VERSION,
        PYSMI_VERSION,
        PYSNMP_VERSION,
        PYASN1_VERSION,
        sys.version.replace('\n', ''),
-       debug and ','.join(debug.flagMap.keys()) or "")
+       ','.join((debug and list(debug.flagMap.keys()) or []) + ['timing']))
 
 
 # Scanner
@@ -128,19 +130,24 @@ class _MainGenerator(base.GeneratorTemplate):
             debug.setLogger(debug.Debug('io'))
 
     def n_Debug(self, cbCtx, node):
-        if debug:
-            if len(node) > 2:
-                f = node[2].attr
-            else:
-                f = node[1].attr
-            debug.setLogger(debug.Debug(*f.split(',')))
+        snmpEngine, ctx = cbCtx
 
+        if len(node) > 2:
+            f = node[2].attr
+        else:
+            f = node[1].attr
 
-def generator(cbCtx, ast):
-    snmpEngine, ctx = cbCtx
+        categories = f.split(',')
+
+        # Not a pysnmp debugging category
+        if 'timing' in categories:
+            categories.remove('timing')
+            ctx['reportTiming'] = True
 
-    ctx['mibViewController'] = view.MibViewController(
-        snmpEngine.getMibBuilder()
-    )
+        if debug and categories:
+            debug.setLogger(debug.Debug(*categories))
 
+
+def generator(cbCtx, ast):
+    snmpEngine, ctx = cbCtx
     return _MainGenerator().preorder((snmpEngine, ctx), ast)
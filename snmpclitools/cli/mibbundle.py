@@ -0,0 +1,200 @@
+#
+# This file is part of snmpclitools software.
+#
+# Copyright (c) 2005-2019, Ilya Etingof <etingof@gmail.com>
+# License: http://snmplabs.com/snmpclitools/license.html
+#
+# Single-file bundle of compiled MIB modules.
+#
+# Loading a MIB module from a directory takes a few file system calls
+# and compiling module source into Python code. Bundle holds code
+# objects of many MIB modules marshalled back to back, preceded by the
+# table of their names and offsets:
+#
+#   header:  magic, format version, Python bytecode magic, modules count
+#   table:   offset, size, name length and name of each module
+#   data:    marshalled code objects
+#
+# Bundle is memory mapped once, loading a MIB module out of it takes
+# unmarshalling a slice of the mapping.
+#
+# Marshalled code is specific to Python version, bundle made by other
+# Python version is ignored.
+#
+import marshal
+import mmap
+import os
+import struct
+import tempfile
+
+try:
+    from errno import ENOENT
+
+except ImportError:
+    ENOENT = -1
+
+from pysnmp import debug
+from pysnmp.smi import builder
+
+MAGIC = b'PYSNMPMB'
+FORMAT_VERSION = 1
+
+BUNDLE_SUFFIX = '.mibs'
+
+_HEADER = struct.Struct('<8sI4sI')
+_ENTRY = struct.Struct('<QIH')
+
+
+def isBundle(path):
+    """Tell if path refers to MIB bundle rather than to a directory"""
+    return path.endswith(BUNDLE_SUFFIX) or os.path.isfile(path)
+
+
+def writeBundle(path, modules):
+    """Write MIB bundle file.
+
+    Parameters
+    ----------
+    path: :py:class:`str`
+        Bundle file to (over)write
+    modules: :py:class:`list`
+        Pairs of MIB module name and its code object
+    """
+    table = []
+    blobs = []
+
+    for modName, codeObj in modules:
+        table.append(modName.encode('utf-8'))
+        blobs.append(marshal.dumps(codeObj))
+
+    offset = _HEADER.size + sum(
+        [_ENTRY.size + len(x) for x in table])
+
+    chunks = [_HEADER.pack(MAGIC, FORMAT_VERSION,
+                           builder.PY_MAGIC_NUMBER, len(table))]
+
+    for name, blob in zip(table, blobs):
+        chunks.append(_ENTRY.pack(offset, len(blob), len(name)))
+        chunks.append(name)
+        offset += len(blob)
+
+    chunks.extend(blobs)
+
+    dirName = os.path.dirname(os.path.abspath(path))
+
+    fd, tmpPath = tempfile.mkstemp(dir=dirName)
+
+    # Bundle is meant to be shared, temporary files are private
+    umask = os.umask(0)
+    os.umask(umask)
+
+    try:
+        os.chmod(tmpPath, 0o666 & ~umask)
+
+        with os.fdopen(fd, 'wb') as f:
+            f.write(b''.join(chunks))
+
+        os.rename(tmpPath, path)
+
+    except Exception:
+        os.remove(tmpPath)
+        raise
+
+
+def packMibs(path, mibSources, modNames=None):
+    """Pack compiled MIB modules found in MIB sources into MIB bundle.
+
+    Parameters
+    ----------
+    path: :py:class:`str`
+        Bundle file to (over)write
+    mibSources: :py:class:`tuple`
+        MIB sources to read MIB modules from, in search order
+    modNames: :py:class:`list`
+        Names of MIB modules to pack, all MIB modules found in
+        MIB sources if omitted
+
+    Returns
+    -------
+    :py:class:`list`
+        Names of MIB modules packed
+    """
+    if modNames is None:
+        modNames = set()
+
+        for mibSource in mibSources:
+            modNames.update(mibSource.listdir())
+
+    modules = []
+
+    for modName in sorted(modNames):
+        for mibSource in mibSources:
+            try:
+                codeObj, sfx = mibSource.read(modName)
+
+            except IOError:
+                continue
+
+            modules.append((modName, codeObj))
+            break
+
+    writeBundle(path, modules)
+
+    return [x[0] for x in modules]
+
+
+class MibBundleSource(builder.DirMibSource):
+    """MIB source serving MIB modules out of memory-mapped MIB bundle"""
+    def _init(self):
+        self._srcName = os.path.normpath(self._srcName)
+        self._data = None
+        self._index = {}
+
+        try:
+            with open(self._srcName, 'rb') as f:
+                self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        except (IOError, OSError, ValueError):
+            debug.logger & debug.flagBld and debug.logger(
+                'MIB bundle %s not readable' % self._srcName)
+            return self
+
+        data = self._data
+
+        if len(data) < _HEADER.size:
+            return self
+
+        magic, version, pyMagic, count = _HEADER.unpack_from(data, 0)
+
+        if (magic != MAGIC or version != FORMAT_VERSION or
+                pyMagic != builder.PY_MAGIC_NUMBER):
+            debug.logger & debug.flagBld and debug.logger(
+                'MIB bundle %s is of other format or Python '
+                'version' % self._srcName)
+            return self
+
+        pos = _HEADER.size
+
+        for _ in range(count):
+            offset, size, length = _ENTRY.unpack_from(data, pos)
+            pos += _ENTRY.size
+
+            name = data[pos:pos + length].decode('utf-8')
+            pos += length
+
+            self._index[name] = offset, size
+
+        return self
+
+    def _listdir(self):
+        return tuple(self._index)
+
+    def read(self, f):
+        try:
+            offset, size = self._index[f]
+
+        except KeyError:
+            raise IOError(ENOENT, 'No such MIB module in bundle', f)
+
+        return (marshal.loads(self._data[offset:offset + size]),
+                builder.BYTECODE_SUFFIXES[0])
@@ -0,0 +1,308 @@
+#
+# This file is part of snmpclitools software.
+#
+# Copyright (c) 2005-2019, Ilya Etingof <etingof@gmail.com>
+# License: http://snmplabs.com/snmpclitools/license.html
+#
+# Content-addressed local cache of fetched MIBs.
+#
+# ASN.1 MIB sources and compiled pysnmp MIB modules fetched from remote
+# repositories are stored under the SHA-1 hash of their contents, MIB
+# names refer to the contents they resolved to:
+#
+#   <cache dir>/mibs/objects/<hash>
+#   <cache dir>/mibs/<kind>/<MIB name>
+#
+# where kind is either `asn1` or `pysnmp`. Once fetched, a MIB is served
+# from the cache, so the network is only consulted for MIBs never seen
+# before. In offline mode remote repositories are not consulted at all.
+#
+import hashlib
+import json
+import os
+import re
+import tempfile
+
+try:
+    from urllib import parse as urlparse
+
+except ImportError:
+    import urlparse
+
+from snmpclitools.cli import cache
+
+# This module is imported by all tools - keep pysmi imports lazy
+
+ENV_OFFLINE = 'PYSNMPMIBOFFLINE'
+
+KIND_ASN1 = 'asn1'
+KIND_PYSNMP = 'pysnmp'
+
+REMOTE_SCHEMES = ('http', 'https', 'ftp', 'sftp')
+
+MAX_MIB_SIZE = 10000000
+
+_MIB_NAME = re.compile(r'^[A-Za-z][A-Za-z0-9_-]*$')
+
+_MODULE_DEFINITION = re.compile(
+    br'^\s*([A-Za-z][A-Za-z0-9-]*)\s*(?:{[^}]*}\s*)?DEFINITIONS\s*'
+    br'(?:[A-Z ]*TAGS\s*)?::=\s*BEGIN', re.MULTILINE)
+
+
+def isOffline():
+    """Tell if offline mode is set through the environment"""
+    return bool(os.environ.get(ENV_OFFLINE))
+
+
+def isRemote(url):
+    return urlparse.urlparse(url).scheme in REMOTE_SCHEMES
+
+
+def getMibCache():
+    """Return MIB cache or `None` if caching is disabled"""
+    cacheDir = cache.getCacheDir()
+    if cacheDir:
+        return MibCache(os.path.join(cacheDir, 'mibs'))
+
+
+class MibCache(object):
+    """Content-addressed store of fetched MIBs"""
+    def __init__(self, cacheDir):
+        self._cacheDir = cacheDir
+
+    def _getRefPath(self, kind, mibName):
+        if _MIB_NAME.match(mibName):
+            return os.path.join(self._cacheDir, kind, mibName)
+
+    def _getObjectPath(self, digest):
+        return os.path.join(self._cacheDir, 'objects', digest)
+
+    @staticmethod
+    def _write(path, data):
+        dirName = os.path.dirname(path)
+
+        if not os.path.isdir(dirName):
+            os.makedirs(dirName)
+
+        fd, tmpPath = tempfile.mkstemp(dir=dirName)
+
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+
+            os.rename(tmpPath, path)
+
+        except Exception:
+            os.remove(tmpPath)
+            raise
+
+    def get(self, kind, mibName):
+        """Return cached MIB info and contents or `None` if not cached"""
+        refPath = self._getRefPath(kind, mibName)
+        if not refPath:
+            return
+
+        try:
+            with open(refPath, 'rb') as f:
+                info = json.loads(f.read().decode('utf-8'))
+
+            with open(self._getObjectPath(info['hash']), 'rb') as f:
+                data = f.read()
+
+        except Exception:
+            return
+
+        if hashlib.sha1(data).hexdigest() != info['hash']:
+            return
+
+        return info, data
+
+    def put(self, kind, mibName, data, **info):
+        """Store MIB contents along with MIB info.
+
+        Failures are ignored - cache is always optional.
+        """
+        refPath = self._getRefPath(kind, mibName)
+        if not refPath:
+            return
+
+        if not isinstance(data, bytes):
+            data = data.encode('utf-8')
+
+        info['hash'] = digest = hashlib.sha1(data).hexdigest()
+
+        try:
+            objectPath = self._getObjectPath(digest)
+
+            if not os.path.exists(objectPath):
+                self._write(objectPath, data)
+
+            self._write(refPath, json.dumps(info).encode('utf-8'))
+
+        except Exception:
+            pass
+
+    def warm(self, directory):
+        """Store ASN.1 MIBs found in a local directory.
+
+        MIBs are stored under the names of the modules they define.
+
+        Returns
+        -------
+        :py:class:`int`
+            Number of MIB modules stored
+        """
+        count = 0
+
+        for fileName in sorted(os.listdir(directory)):
+            path = os.path.join(directory, fileName)
+
+            if not os.path.isfile(path):
+                continue
+
+            with open(path, 'rb') as f:
+                data = f.read(MAX_MIB_SIZE)
+
+            for mibName in _MODULE_DEFINITION.findall(data):
+                self.put(KIND_ASN1, mibName.decode('ascii'), data,
+                         path='file://%s' % os.path.abspath(path),
+                         file=fileName, name=mibName.decode('ascii'),
+                         mtime=os.stat(path).st_mtime)
+                count += 1
+
+        return count
+
+
+class CachingReader(object):
+    """pysmi MIB reader serving MIBs from the MIB cache.
+
+    MIBs missing from the cache are fetched through the wrapped reader
+    and stored in the cache. Without the wrapped reader (offline mode)
+    only the cache is consulted.
+    """
+    def __init__(self, mibCache, kind, reader=None):
+        self._mibCache = mibCache
+        self._kind = kind
+        self._reader = reader
+        self._missing = set()
+
+    def __str__(self):
+        return '%s{%s, %s}' % (self.__class__.__name__, self._kind,
+                               self._reader or 'offline')
+
+    def setOptions(self, **kwargs):
+        if self._reader is not None:
+            self._reader.setOptions(**kwargs)
+
+        return self
+
+    def getData(self, mibname, **options):
+        from pysmi import error as smierror
+        from pysmi.mibinfo import MibInfo
+
+        cached = self._mibCache.get(self._kind, mibname)
+
+        if cached is not None:
+            info, data = cached
+
+            return (MibInfo(path=info['path'], file=info['file'],
+                            name=info['name'], mtime=info['mtime']),
+                    data.decode('utf-8', 'ignore'))
+
+        if self._reader is None or mibname in self._missing:
+            raise smierror.PySmiReaderFileNotFoundError(
+                '%s MIB %s not cached' % (self._kind, mibname), reader=self)
+
+        try:
+            mibInfo, data = self._reader.getData(mibname, **options)
+
+        except smierror.PySmiReaderFileNotFoundError:
+            # Do not look for it over the network again
+            self._missing.add(mibname)
+            raise
+
+        self._mibCache.put(self._kind, mibname, data, path=mibInfo.path,
+                           file=mibInfo.file, name=mibInfo.name,
+                           mtime=mibInfo.mtime)
+
+        return mibInfo, data
+
+
+def getReaders(urls, mibCache, kind, offline=False, **options):
+    """Return pysmi MIB readers for URLs, remote ones going through cache"""
+    from pysmi.reader.url import getReadersFromUrls
+
+    readers = []
+    offlineReader = None
+
+    for url in urls:
+        if not isRemote(url):
+            readers.extend(getReadersFromUrls(url, **options))
+
+        elif offline:
+            if mibCache is not None and offlineReader is None:
+                offlineReader = CachingReader(mibCache, kind)
+                readers.append(offlineReader)
+
+        elif mibCache is None:
+            readers.extend(getReadersFromUrls(url, **options))
+
+        else:
+            readers.extend([CachingReader(mibCache, kind, x)
+                            for x in getReadersFromUrls(url, **options)])
+
+    return readers
+
+
+def newMibCompiler(sources, borrowers, destination, searchPaths=(),
+                   genTexts=False, offline=False):
+    """Create pysmi MIB compiler fetching remote MIBs through the cache.
+
+    Compiled MIBs are written into `destination`, MIBs already found
+    compiled in `searchPaths` are not compiled again.
+    """
+    from pysmi.borrower.pyfile import PyFileBorrower
+    from pysmi.codegen.pysnmp import PySnmpCodeGen
+    from pysmi.codegen.pysnmp import baseMibs
+    from pysmi.compiler import MibCompiler
+    from pysmi.parser.dialect import smiV1Relaxed
+    from pysmi.parser.smi import parserFactory
+    from pysmi.searcher.pypackage import PyPackageSearcher
+    from pysmi.searcher.stub import StubSearcher
+    from pysmi.writer.pyfile import PyFileWriter
+
+    mibCache = getMibCache()
+
+    mibCompiler = MibCompiler(parserFactory(**smiV1Relaxed)(),
+                              PySnmpCodeGen(),
+                              PyFileWriter(destination))
+
+    mibCompiler.addSources(
+        *getReaders(sources, mibCache, KIND_ASN1, offline))
+
+    mibCompiler.addSearchers(StubSearcher(*baseMibs))
+    mibCompiler.addSearchers(*[PyPackageSearcher(x) for x in searchPaths])
+    mibCompiler.addBorrowers(
+        *[PyFileBorrower(x, genTexts=genTexts)
+          for x in getReaders(borrowers, mibCache, KIND_PYSNMP, offline,
+                              lowcaseMatching=False)])
+
+    return mibCompiler
+
+
+def addMibCompiler(mibBuilder, sources, borrowers, destination,
+                   offline=False, genTexts=None):
+    """Set up pysmi MIB compiler fetching remote MIBs through the cache.
+
+    Mirrors :py:func:`pysnmp.smi.compiler.addMibCompiler`. MIB texts
+    are compiled in if MIB builder loads them unless `genTexts` is given.
+    """
+    if genTexts is None:
+        genTexts = mibBuilder.loadTexts
+
+    mibCompiler = newMibCompiler(
+        sources, borrowers, destination,
+        searchPaths=[x.fullPath() for x in mibBuilder.getMibSources()],
+        genTexts=genTexts, offline=offline)
+
+    mibBuilder.setMibCompiler(mibCompiler, destination)
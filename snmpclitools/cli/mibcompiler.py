@@ -0,0 +1,228 @@
+#
+# This file is part of snmpclitools software.
+#
+# Copyright (c) 2005-2019, Ilya Etingof <etingof@gmail.com>
+# License: http://snmplabs.com/snmpclitools/license.html
+#
+# Parallel MIB compiler.
+#
+# IMPORTS clauses of requested ASN.1 MIBs are followed to find all the
+# MIBs not compiled yet. These are ordered so that every MIB follows the
+# MIBs it imports, then split into as many groups as there are worker
+# processes. Each group is compiled by pysmi in its own process right
+# into the directory MIB builder loads MIBs from.
+#
+# pysmi builds symbol tables from ASN.1 sources of imported MIBs rather
+# than from compiled ones, so groups do not have to wait for each other.
+# Neighbouring MIBs in that order tend to import the same MIBs, keeping
+# them in one group saves parsing the same MIBs in many processes.
+#
+import multiprocessing
+import os
+import re
+import sys
+
+from pysnmp.smi import builder
+
+from snmpclitools.cli import mibcache
+
+# Quoted strings may contain anything, comments run till -- or EOL
+_NOISE = re.compile(r'"[^"]*"|--.*?(?:--|$)', re.MULTILINE)
+
+_IMPORTS = re.compile(r'\bIMPORTS\b(.*?);', re.DOTALL)
+
+_IMPORTED_FROM = re.compile(r'\bFROM\s+([A-Za-z][A-Za-z0-9-]*)')
+
+
+def getImports(text):
+    """Return names of MIBs imported by ASN.1 MIB text"""
+    imports = _IMPORTS.search(_NOISE.sub(' ', text))
+
+    if imports:
+        return _IMPORTED_FROM.findall(imports.group(1))
+
+    return []
+
+
+def getCompiledMibs(paths):
+    """Return names of MIBs found compiled in given directories"""
+    mibNames = set()
+
+    for path in paths:
+        try:
+            files = os.listdir(path)
+
+        except OSError:
+            continue
+
+        for f in files:
+            for sfx in builder.PY_SUFFIXES:
+                if f.endswith(sfx):
+                    mibNames.add(f[:-len(sfx)])
+                    break
+
+    return mibNames
+
+
+def resolve(mibNames, readers, skipMibs=()):
+    """Order MIBs to compile along with MIBs they import.
+
+    MIBs in `skipMibs` and MIBs they import are left out. MIBs missing
+    from ASN.1 sources are still included - they might be borrowed.
+
+    Returns
+    -------
+    :py:class:`list`
+        Names of MIBs, every MIB follows the MIBs it imports
+    """
+    from pysmi import error as smierror
+
+    visited = set(skipMibs)
+    order = []
+
+    def getDependencies(mibName):
+        for reader in readers:
+            try:
+                mibInfo, text = reader.getData(mibName)
+
+            except smierror.PySmiReaderFileNotFoundError:
+                continue
+
+            except smierror.PySmiError:
+                break
+
+            return getImports(text)
+
+        return []
+
+    def visit(mibName):
+        if mibName in visited:
+            return
+
+        visited.add(mibName)
+
+        for dependency in getDependencies(mibName):
+            visit(dependency)
+
+        order.append(mibName)
+
+    for mibName in mibNames:
+        visit(mibName)
+
+    return order
+
+
+def partition(mibNames, jobs):
+    """Split ordered MIBs into up to `jobs` groups of adjacent MIBs"""
+    size = max(1, -(-len(mibNames) // jobs))
+
+    return [mibNames[i:i + size] for i in range(0, len(mibNames), size)]
+
+
+def compileGroup(mibNames, options):
+    """Compile a group of MIBs leaving out MIBs they import.
+
+    Returns
+    -------
+    :py:class:`dict`
+        MIB compilation status and error message (if any) by MIB name
+    """
+    from pysmi import error as smierror
+
+    try:
+        statuses = mibcache.newMibCompiler(**options).compile(
+            *mibNames, noDeps=True, genTexts=options.get('genTexts'))
+
+    except smierror.PySmiError:
+        return dict([(x, ('failed', str(sys.exc_info()[1])))
+                     for x in mibNames])
+
+    return dict([(x, (str(statuses[x]), str(getattr(statuses[x], 'error', ''))))
+                 for x in statuses])
+
+
+def _compileGroup(args):
+    # Process pool entry point
+    return compileGroup(*args)
+
+
+def compileMibs(mibNames, sources, borrowers, destination, searchPaths=(),
+                genTexts=False, offline=False, jobs=None):
+    """Compile MIBs along with the MIBs they import in parallel.
+
+    Parameters
+    ----------
+    mibNames: :py:class:`list`
+        Names of MIBs to compile
+    sources: :py:class:`list`
+        URLs of ASN.1 MIBs repositories
+    borrowers: :py:class:`list`
+        URLs of compiled MIBs repositories
+    destination: :py:class:`str`
+        Directory to write compiled MIBs into
+    searchPaths: :py:class:`list`
+        Directories with MIBs compiled already
+    genTexts: :py:class:`bool`
+        Compile MIB texts (DESCRIPTION etc.) in
+    offline: :py:class:`bool`
+        Never fetch MIBs from remote repositories
+    jobs: :py:class:`int`
+        Number of worker processes, CPU count if omitted
+
+    Returns
+    -------
+    :py:class:`dict`
+        MIB compilation status and error message (if any) by MIB name
+    """
+    from pysmi.codegen.pysnmp import baseMibs
+    from pysmi.codegen.pysnmp import fakeMibs
+
+    searchPaths = list(searchPaths)
+
+    if destination not in searchPaths:
+        searchPaths.append(destination)
+
+    compiledMibs = getCompiledMibs(searchPaths)
+
+    skipMibs = compiledMibs.union(baseMibs, fakeMibs)
+
+    # Fetching MIBs here leaves them in MIB cache for workers to pick up
+    readers = mibcache.getReaders(
+        sources, mibcache.getMibCache(), mibcache.KIND_ASN1, offline)
+
+    mibsToCompile = resolve(mibNames, readers, skipMibs)
+
+    results = dict([(x, ('untouched', '')) for x in mibNames
+                    if x in skipMibs])
+
+    if not mibsToCompile:
+        return results
+
+    options = dict(sources=sources, borrowers=borrowers,
+                   destination=destination, searchPaths=searchPaths,
+                   genTexts=genTexts, offline=offline)
+
+    groups = partition(mibsToCompile, jobs or multiprocessing.cpu_count())
+
+    tasks = [(x, options) for x in groups]
+
+    if len(tasks) == 1:
+        groupResults = [compileGroup(*tasks[0])]
+
+    else:
+        pool = multiprocessing.Pool(len(tasks))
+
+        try:
+            groupResults = pool.map(_compileGroup, tasks)
+
+        finally:
+            pool.close()
+            pool.join()
+
+    for groupResult in groupResults:
+        for mibName, result in groupResult.items():
+            # Imported MIBs are left untouched by all groups but one
+            if results.get(mibName, ('untouched',))[0] == 'untouched':
+                results[mibName] = result
+
+    return results
@@ -0,0 +1,227 @@
+#
+# This file is part of snmpclitools software.
+#
+# Copyright (c) 2005-2019, Ilya Etingof <etingof@gmail.com>
+# License: http://snmplabs.com/snmpclitools/license.html
+#
+# Snapshots of MIB modules loaded into MIB builder.
+#
+# Once a set of MIBs is loaded, the code of all the MIB modules it has
+# brought in is stored in the tools cache along with the files it comes
+# from. Next time the same set of MIBs is to be loaded from the same MIB
+# search path, the snapshot is read in at once and MIB modules are run
+# right out of it, with no searching, reading and compiling MIB files
+# one by one.
+#
+# pysnmp MIB objects can not be serialized as such (MIB modules create
+# classes on the fly), so it is their code that is snapshotted.
+#
+# Snapshot is discarded once any of the files it comes from changes its
+# modification time or size, or MIB modules are added to or removed from
+# MIB search path.
+#
+import marshal
+import os
+
+try:
+    from errno import ENOENT
+
+except ImportError:
+    ENOENT = -1
+
+from pysnmp.smi import builder
+
+from snmpclitools.cli import cache
+from snmpclitools.cli import mibbundle
+
+FORMAT_VERSION = 1
+
+
+class MibSnapshotSource(builder.DirMibSource):
+    """MIB source serving MIB modules out of snapshot"""
+    def __init__(self, srcName, modules):
+        builder.DirMibSource.__init__(self, srcName)
+        self._modules = modules
+
+    def _init(self):
+        return self
+
+    def _listdir(self):
+        return tuple(self._modules)
+
+    def read(self, f):
+        try:
+            data = self._modules[f]
+
+        except KeyError:
+            raise IOError(ENOENT, 'No such MIB module in snapshot', f)
+
+        return marshal.loads(data), builder.BYTECODE_SUFFIXES[0]
+
+
+def getStamp(path):
+    """Return file modification time and size or `None` if inaccessible"""
+    try:
+        st = os.stat(path)
+
+    except OSError:
+        return
+
+    return st.st_mtime, st.st_size
+
+
+def getModFile(mibSources, modName):
+    """Return file MIB module is loaded from or empty string"""
+    for mibSource in mibSources:
+        if isinstance(mibSource, mibbundle.MibBundleSource):
+            if modName in mibSource.listdir():
+                return mibSource.fullPath()
+
+            continue
+
+        for sfx in builder.PY_SUFFIXES:
+            path = mibSource.fullPath(modName, sfx)
+
+            if os.path.isfile(path):
+                return path
+
+    return ''
+
+
+def getKey(mibBuilder, mibNames):
+    """Hash MIB names along with MIB search path and its contents"""
+    import pysnmp
+
+    parts = [FORMAT_VERSION, builder.PY_MAGIC_NUMBER, pysnmp.__version__,
+             mibBuilder.loadTexts]
+
+    parts.extend(mibNames or ['ALL'])
+
+    for mibSource in mibBuilder.getMibSources():
+        if isinstance(mibSource, MibSnapshotSource):
+            continue
+
+        parts.append(mibSource.fullPath())
+        parts.extend(sorted(mibSource.listdir()))
+
+    return cache.getKey(*parts)
+
+
+class ModuleRecorder(object):
+    """Collect code of MIB modules as MIB sources read them.
+
+    Spares compiling MIB modules over again for the snapshot.
+    """
+    def __init__(self, mibSources, skip=()):
+        self.modules = []
+        self._mibSources = mibSources
+        self._skip = set(skip)
+
+    def __enter__(self):
+        for mibSource in self._mibSources:
+            mibSource.read = self._getReader(mibSource.read)
+
+        return self
+
+    def __exit__(self, *exc):
+        for mibSource in self._mibSources:
+            del mibSource.read
+
+    def _getReader(self, read):
+
+        def reader(f):
+            codeObj, sfx = read(f)
+
+            if f not in self._skip:
+                self._skip.add(f)
+                self.modules.append((f, codeObj))
+
+            return codeObj, sfx
+
+        return reader
+
+
+def store(mibBuilder, mibNames, modules):
+    """Store snapshot of MIB modules loaded for MIB names.
+
+    Parameters
+    ----------
+    mibBuilder: :py:class:`~pysnmp.smi.builder.MibBuilder`
+        MIB builder MIB modules are loaded into
+    mibNames: :py:class:`list`
+        Names of MIBs requested, all MIBs if empty
+    modules: :py:class:`list`
+        Pairs of name and code object of MIB modules loaded for MIB names
+    """
+    mibSources = [x for x in mibBuilder.getMibSources()
+                  if not isinstance(x, MibSnapshotSource)]
+
+    files = []
+
+    for modName, codeObj in modules:
+        path = getModFile(mibSources, modName)
+
+        files.append((path, getStamp(path)))
+
+    modules = [(x[0], marshal.dumps(x[1])) for x in modules]
+
+    cache.store('mibsnapshot', getKey(mibBuilder, mibNames),
+                {'modules': modules, 'files': files})
+
+
+def restore(mibBuilder, mibNames):
+    """Load MIB modules for MIB names out of snapshot.
+
+    Modules are served by a MIB source put in front of MIB search path,
+    so that MIB builder would not load them over again.
+
+    Returns
+    -------
+    :py:class:`bool`
+        `True` if valid snapshot is found and loaded
+    """
+    key = getKey(mibBuilder, mibNames)
+
+    snapshot = cache.load('mibsnapshot', key)
+
+    if not snapshot:
+        return False
+
+    for path, stamp in snapshot['files']:
+        if getStamp(path) != stamp:
+            return False
+
+    modules = dict([x for x in snapshot['modules']
+                    if x[0] not in mibBuilder.mibSymbols])
+
+    if modules:
+        mibBuilder.setMibSources(
+            MibSnapshotSource('<snapshot %s>' % key, modules),
+            *mibBuilder.getMibSources())
+
+        mibBuilder.loadModules(*modules)
+
+    return True
+
+
+def loadModules(mibBuilder, *mibNames):
+    """Load MIBs along with the MIBs they import, all MIBs if none given.
+
+    MIB modules are restored from snapshot if possible, otherwise the
+    snapshot of the MIB modules loaded is taken.
+    """
+    if mibNames and not [x for x in mibNames
+                         if x not in mibBuilder.mibSymbols]:
+        return
+
+    if restore(mibBuilder, mibNames):
+        return
+
+    mibSources = [x for x in mibBuilder.getMibSources()
+                  if not isinstance(x, MibSnapshotSource)]
+
+    # MIB modules loaded already are read in just to be skipped
+    with ModuleRecorder(mibSources, mibBuilder.mibSymbols) as recorder:
+        mibBuilder.loadModules(*mibNames)
+
+    store(mibBuilder, mibNames, recorder.modules)
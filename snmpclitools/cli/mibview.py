@@ -6,25 +6,49 @@
 #
 # C/L interface to MIB variables. Mimics Net-SNMP CLI.
 #
+import csv
+import json
 import os
+import re
+import sys
+from collections import OrderedDict
 
 from pyasn1.type import namedval
 from pyasn1.type import univ
 from pysnmp import error
 from pysnmp.proto import rfc1902
 from pysnmp.smi import builder
-from pysnmp.smi import compiler
+from pysnmp.smi import view
+from pysnmp.smi.error import NoSuchObjectError
 
 from snmpclitools.cli import base
+from snmpclitools.cli import formatting
+from snmpclitools.cli import mibbundle
+from snmpclitools.cli import mibcache
+from snmpclitools.cli import mibsnapshot
+from snmpclitools.cli import modindex
+from snmpclitools.cli import nameindex
+from snmpclitools.cli import oidindex
+from snmpclitools.cli import timing
 
 DEFAULT_MIB_SOURCE_URL = 'http://mibs.snmplabs.com/asn1/@mib@'
 DEFAULT_MIB_BORROWER_URL = 'http://mibs.snmplabs.com/pysnmp/fulltexts/@mib@'
 
+# Same as pysnmp.smi.compiler.defaultDest, but that module imports pysmi
+if sys.platform[:3] == 'win':
+    DEFAULT_MIB_DESTINATION = os.path.join(
+        os.path.expanduser('~'), 'PySNMP Configuration', 'mibs')
+
+else:
+    DEFAULT_MIB_DESTINATION = os.path.join(
+        os.path.expanduser('~'), '.pysnmp', 'mibs')
+
 
 def getUsage():
     return """\
 MIB options:
-   -m MIB[:...]   load given list of MIBs (ALL loads all compiled MIBs)
+   -m MIB[:...]   load given list of MIBs (ALL loads all compiled MIBs,
+                  AUTO loads compiled MIBs defining output OIDs on demand)
    -M DIR[:...]   look in given list of directories (not URLs) for MIBs
    -P MIBOPTS     Toggle various defaults controlling MIB compiler:
               XS: search for ASN.1 MIBs in local and/or remote directories
@@ -38,6 +62,13 @@ MIB options:
                   substituted by the actual MIB name to be downloaded.
                   Default repository address is
                   %s
+              XW: store ASN.1 MIBs found in given local directory in
+                  MIB cache to be used instead of fetching them from
+                  remote repositories
+              XJ: compile MIBs missing from the MIB list in given number
+                  of parallel processes
+   --mib-offline  never fetch MIBs from remote repositories, use MIBs
+                  in MIB cache instead
    -O OUTOPTS     Toggle various defaults controlling output display:
               q:  removes the equal sign and type information
               Q:  removes the type information
@@ -54,9 +85,21 @@ MIB options:
               v:  print values only (not OID = value)
               U:  don't print units
               t:  output timeticks values as raw numbers
+   --format FORMAT
+                  print variable-bindings as text (default), one JSON
+                  object (json) or CSV row (csv) per line
    -I INOPTS      Toggle various defaults controlling input parsing:
+              b:  do best/regex matching to find a MIB node
               h:  don't apply DISPLAY-HINTs
+              r:  same as b
+              R:  do random access to OID labels (default)
               u:  top-level OIDs must have '.' prefix (UCD-style)
+   --oid-cache-size SIZE
+                  keep up to SIZE MIB objects resolved for output
+                  (0 disables the cache)
+   --index-cache-size SIZE
+                  keep up to SIZE table row indices decoded for output
+                  (0 disables the cache)
 """ % (DEFAULT_MIB_SOURCE_URL, DEFAULT_MIB_BORROWER_URL)
 
 
@@ -84,6 +127,22 @@ class MibViewScannerMixIn(object):
         """ -I """
         self.rv.append(base.ConfigToken('inputopts'))
 
+    def t_oidcachesize(self, s):
+        """ --oid-cache-size """
+        self.rv.append(base.ConfigToken('oidcachesize'))
+
+    def t_indexcachesize(self, s):
+        """ --index-cache-size """
+        self.rv.append(base.ConfigToken('indexcachesize'))
+
+    def t_miboffline(self, s):
+        """ --mib-offline """
+        self.rv.append(base.ConfigToken('miboffline'))
+
+    def t_outputformat(self, s):
+        """ --format """
+        self.rv.append(base.ConfigToken('outputformat'))
+
 
 # Parser
 
@@ -107,9 +166,19 @@ class MibViewParserMixIn(object):
         MibFiles ::= MibFile semicolon MibFiles
         MibFiles ::= MibFile
         MibFile ::= string
+        GeneralOption ::= OidCacheSize
+        OidCacheSize ::= oidcachesize whitespace string
+        GeneralOption ::= IndexCacheSize
+        IndexCacheSize ::= indexcachesize whitespace string
+        GeneralOption ::= MibOffline
+        MibOffline ::= miboffline
+        GeneralOption ::= OutputFormat
+        OutputFormat ::= outputformat whitespace string
 
         ParserOption ::= parseropts string whitespace Url
         ParserOption ::= parseropts whitespace string whitespace Url
+        ParserOption ::= parseropts string whitespace string
+        ParserOption ::= parseropts whitespace string whitespace string
         Url ::= string semicolon string
 
         OutputOption ::= outputopts string
@@ -171,6 +240,30 @@ class _MibViewGenerator(base.GeneratorTemplate):
 
             del ctx['Url']
 
+        elif opt == 'XW':
+            if 'MibWarmDirs' not in ctx:
+                ctx['MibWarmDirs'] = []
+
+            if 'Url' in ctx:
+                mibDir = ctx.pop('Url')
+
+            else:
+                mibDir = node[-1].attr
+
+            if mibDir.startswith('file://'):
+                mibDir = mibDir[7:]
+
+            ctx['MibWarmDirs'].append(mibDir)
+
+        elif opt == 'XJ':
+            jobs = node[-1].attr
+
+            if not jobs.isdigit() or int(jobs) < 1:
+                raise error.PySnmpError(
+                    'bad number of MIB compiler processes: %s' % jobs)
+
+            ctx['MibJobs'] = int(jobs)
+
         else:
             raise error.PySnmpError('bad -P option arguments: %s' % opt)
 
@@ -241,6 +334,39 @@ class _MibViewGenerator(base.GeneratorTemplate):
                     'Unknown output option %s at %s' % (c, self)
                 )
 
+    def n_OutputFormat(self, cbCtx, node):
+        snmpEngine, ctx = cbCtx
+
+        outputFormat = node[2].attr.lower()
+
+        if outputFormat not in MibViewProxy.OUTPUT_FORMATS:
+            raise error.PySnmpError(
+                'Unknown output format %s' % node[2].attr)
+
+        ctx['mibViewProxy'].outputFormat = outputFormat
+
+    def n_OidCacheSize(self, cbCtx, node):
+        snmpEngine, ctx = cbCtx
+
+        try:
+            ctx['mibViewProxy'].oidCacheSize = int(node[2].attr)
+
+        except ValueError:
+            raise error.PySnmpError('Bad OID cache size value')
+
+    def n_IndexCacheSize(self, cbCtx, node):
+        snmpEngine, ctx = cbCtx
+
+        try:
+            ctx['mibViewProxy'].indexCacheSize = int(node[2].attr)
+
+        except ValueError:
+            raise error.PySnmpError('Bad index cache size value')
+
+    def n_MibOffline(self, cbCtx, node):
+        snmpEngine, ctx = cbCtx
+        ctx['MibOffline'] = True
+
     def n_InputOption(self, cbCtx, node):
         snmpEngine, ctx = cbCtx
 
@@ -250,10 +376,10 @@ class _MibViewGenerator(base.GeneratorTemplate):
 
         for c in opt:
             if c == 'R':
-                pass
+                mibViewProxy.parseAsRandomAccessMib = True
 
             elif c == 'b':
-                pass
+                mibViewProxy.parseAsRegExp = True
 
             elif c == 'u':
                 mibViewProxy.defaultOidPrefix = (
@@ -261,7 +387,7 @@ class _MibViewGenerator(base.GeneratorTemplate):
                 )
 
             elif c == 'r':
-                pass
+                mibViewProxy.parseAsRegExp = True
 
             elif c == 'h':
                 pass
@@ -272,11 +398,226 @@ class _MibViewGenerator(base.GeneratorTemplate):
                 )
 
 
+def getMibViewController(snmpEngine):
+    """Return MIB view controller of SNMP engine.
+
+    MIB view is indexed on first use, so it is kept along with
+    long-lived SNMP engine.
+    """
+    mibViewController = snmpEngine.getUserContext('mibViewController')
+
+    if mibViewController is None:
+        mibViewController = view.MibViewController(
+            snmpEngine.getMibBuilder()
+        )
+        snmpEngine.setUserContext(mibViewController=mibViewController)
+
+    return mibViewController
+
+
+def getOidIndex(snmpEngine):
+    """Return OID index of SNMP engine MIB view.
+
+    The index is saved in the tools cache and kept along with
+    long-lived SNMP engine.
+    """
+    oidIndex = snmpEngine.getUserContext('oidIndex')
+
+    if oidIndex is None:
+        oidIndex = oidindex.OidIndex(getMibViewController(snmpEngine))
+        snmpEngine.setUserContext(oidIndex=oidIndex)
+
+    return oidIndex
+
+
+def getMibModuleIndex(snmpEngine):
+    """Return index of compiled MIB modules of SNMP engine MIB builder.
+
+    The index is kept in the tools cache and along with long-lived
+    SNMP engine.
+    """
+    mibModuleIndex = snmpEngine.getUserContext('mibModuleIndex')
+
+    if mibModuleIndex is None:
+        mibModuleIndex = modindex.MibModuleIndex(snmpEngine.getMibBuilder())
+        snmpEngine.setUserContext(mibModuleIndex=mibModuleIndex)
+
+    return mibModuleIndex
+
+
+def getMibTextsBuilder(snmpEngine):
+    """Return MIB builder loading MIB texts (DESCRIPTION etc.).
+
+    MIB builder of SNMP engine leaves MIB texts out. Once MIB texts are
+    needed, MIB modules are loaded over again into this MIB builder.
+    MIB builder is kept along with long-lived SNMP engine, it shares
+    MIB search path with MIB builder of SNMP engine.
+    """
+    mibTextsBuilder = snmpEngine.getUserContext('mibTextsBuilder')
+
+    if mibTextsBuilder is None:
+        mibTextsBuilder = builder.MibBuilder()
+        mibTextsBuilder.loadTexts = True
+
+        snmpEngine.setUserContext(mibTextsBuilder=mibTextsBuilder)
+
+    mibSources = snmpEngine.getMibBuilder().getMibSources()
+
+    if mibTextsBuilder.getMibSources() != mibSources:
+        mibTextsBuilder.setMibSources(*mibSources)
+
+    return mibTextsBuilder
+
+
+def getMibNameIndex(snmpEngine):
+    """Return index of MIB object names of SNMP engine MIB builder.
+
+    The index is kept in the tools cache and along with long-lived
+    SNMP engine.
+    """
+    mibNameIndex = snmpEngine.getUserContext('mibNameIndex')
+
+    if mibNameIndex is None:
+        mibNameIndex = nameindex.MibNameIndex(snmpEngine.getMibBuilder())
+        snmpEngine.setUserContext(mibNameIndex=mibNameIndex)
+
+    return mibNameIndex
+
+
+def searchMibNames(snmpEngine, pattern, modName=''):
+    """Find MIB object names matching regular expression.
+
+    MIB modules are not loaded, names are looked up in MIB name index.
+
+    Returns
+    -------
+    :py:class:`list`
+        Pairs of name and MIB modules defining it, ordered by name
+    """
+    mibNameIndex = getMibNameIndex(snmpEngine)
+    mibNameIndex.refresh()
+
+    try:
+        return mibNameIndex.search(pattern, modName)
+
+    except re.error:
+        reason = sys.exc_info()[1]
+
+    raise error.PySnmpError(
+        'Bad regular expression %s: %s' % (pattern, reason))
+
+
+def resolveMibSymbol(snmpEngine, ctx, objectName, modName=''):
+    """Load MIB module defining leading MIB symbol of object name.
+
+    With random access lookup (-IR), MIB module defining the symbol is
+    looked up in MIB name index unless the symbol is already known. With
+    best/regex matching (-Ib, -Ir), leading element of object name is a
+    regular expression to be replaced by the best matching MIB symbol.
+
+    Returns
+    -------
+    :py:class:`tuple`
+        Object name and MIB module to resolve it in (may be empty)
+    """
+    mibViewProxy = ctx['mibViewProxy']
+    mibViewController = ctx['mibViewController']
+
+    symName = objectName[0]
+
+    if mibViewProxy.parseAsRegExp:
+        mibNameIndex = getMibNameIndex(snmpEngine)
+        mibNameIndex.refresh()
+
+        reason = None
+
+        try:
+            match = mibNameIndex.bestMatch(symName, modName)
+
+        except re.error:
+            reason = sys.exc_info()[1]
+
+        if reason is not None:
+            raise error.PySnmpError(
+                'Bad regular expression %s: %s' % (symName, reason))
+
+        if match is None:
+            raise error.PySnmpError(
+                'No MIB object matching %s%s' % (
+                    modName and modName + '::' or '', symName))
+
+        symName, modNames = match
+
+        objectName = (symName,) + tuple(objectName[1:])
+
+    elif modName or not mibViewProxy.parseAsRandomAccessMib:
+        return objectName, modName
+
+    else:
+        try:
+            mibViewController.getNodeName((symName,))
+
+        except NoSuchObjectError:
+            pass
+
+        else:
+            return objectName, modName
+
+        mibNameIndex = getMibNameIndex(snmpEngine)
+        mibNameIndex.refresh()
+
+        modNames = mibNameIndex.lookup(symName)
+
+    mibBuilder = mibViewController.mibBuilder
+
+    for name in modNames:
+        if name in mibBuilder.mibSymbols:
+            return objectName, name
+
+    for name in modNames:
+        try:
+            mibBuilder.loadModules(name)
+
+        except error.PySnmpError:
+            continue
+
+        return objectName, name
+
+    return objectName, modName
+
+
+def compileMibs(snmpEngine, ctx, mibNames):
+    """Compile MIBs with the compiler options of the command line"""
+    from snmpclitools.cli import mibcompiler
+
+    mibBuilder = snmpEngine.getMibBuilder()
+
+    return mibcompiler.compileMibs(
+        mibNames,
+        sources=ctx['MibDir'],
+        borrowers=ctx['MibBorrowers'],
+        destination=DEFAULT_MIB_DESTINATION,
+        searchPaths=[x.fullPath() for x in mibBuilder.getMibSources()],
+        genTexts=True,
+        offline=ctx['MibOffline'],
+        jobs=ctx.get('MibJobs')
+    )
+
+
 def generator(cbCtx, ast):
     snmpEngine, ctx = cbCtx
 
+    if 'mibViewController' not in ctx:
+        ctx['mibViewController'] = getMibViewController(snmpEngine)
+
+    if 'oidIndex' not in ctx:
+        ctx['oidIndex'] = getOidIndex(snmpEngine)
+
     if 'mibViewProxy' not in ctx:
-        ctx['mibViewProxy'] = MibViewProxy(ctx['mibViewController'])
+        with timing.measure(ctx, 'load MIBs'):
+            ctx['mibViewProxy'] = MibViewProxy(
+                ctx['mibViewController'], ctx['oidIndex']
+            )
 
     #    compiler.addMibCompiler(snmpEngine.getMibBuilder())
 
@@ -288,23 +629,132 @@ def generator(cbCtx, ast):
     if 'MibBorrowers' not in ctx:
         ctx['MibBorrowers'] = [DEFAULT_MIB_BORROWER_URL]
 
-    compiler.addMibCompiler(snmpEngine.getMibBuilder(),
+    if 'MibOffline' not in ctx:
+        ctx['MibOffline'] = mibcache.isOffline()
+
+    if 'MibWarmDirs' in ctx:
+        mibCache = mibcache.getMibCache()
+
+        if mibCache is None:
+            raise error.PySnmpError('MIB cache is disabled')
+
+        for mibDir in ctx['MibWarmDirs']:
+            try:
+                mibCache.warm(mibDir)
+
+            except (OSError, IOError):
+                raise error.PySnmpError('Bad MIB directory %s' % mibDir)
+
+    mibCompiler = (tuple(ctx['MibDir']), tuple(ctx['MibBorrowers']),
+                   ctx['MibOffline'])
+
+    if snmpEngine.getUserContext('mibCompiler') != mibCompiler:
+        mibBuilder = snmpEngine.getMibBuilder()
+
+        mibBuilder.setMibCompiler(
+            LazyMibCompiler(mibBuilder,
                             sources=ctx['MibDir'],
-                            borrowers=ctx['MibBorrowers'])
+                            borrowers=ctx['MibBorrowers'],
+                            destination=DEFAULT_MIB_DESTINATION,
+                            genTexts=True,
+                            offline=ctx['MibOffline']),
+            DEFAULT_MIB_DESTINATION
+        )
+
+        snmpEngine.setUserContext(mibCompiler=mibCompiler)
 
     if 'MibFiles' in ctx:
         mibBuilder = snmpEngine.getMibBuilder()
 
-        for mibFile in ctx['MibFiles']:
-            if mibFile.lower() == 'all':
-                mibBuilder.loadModules()
+        mibNames = [x for x in ctx['MibFiles']
+                    if x.lower() not in ('all', 'auto')]
 
-            else:
-                mibBuilder.loadModules(mibFile)
+        if ctx.get('MibJobs', 1) > 1 and mibNames:
+            # Whatever fails here gets reported on loading
+            with timing.measure(ctx, 'compile MIBs'):
+                compileMibs(snmpEngine, ctx, mibNames)
+
+        with timing.measure(ctx, 'load MIBs'):
+            mibFiles = [x.lower() for x in ctx['MibFiles']]
+
+            if 'all' in mibFiles:
+                mibsnapshot.loadModules(mibBuilder)
+
+            elif mibNames:
+                mibsnapshot.loadModules(mibBuilder, *mibNames)
+
+            if 'auto' in mibFiles:
+                mibModuleIndex = getMibModuleIndex(snmpEngine)
+                mibModuleIndex.refresh()
+
+                ctx['mibViewProxy'].mibModuleIndex = mibModuleIndex
 
     return snmpEngine, ctx
 
 
+class LazyMibCompiler(object):
+    """Stand-in for pysmi-based MIB compiler.
+
+    Importing pysmi is costly, while most runs find all the MIBs they
+    need already compiled. The actual MIB compiler is set up the first
+    time MIB builder asks for a MIB to be compiled. Remote MIBs are
+    fetched through MIB cache.
+
+    With `genTexts` option set, MIB texts (DESCRIPTION etc.) are
+    compiled in regardless of MIB builder settings. Compiled MIBs are
+    shared by all the tools, MIB texts are only loaded on demand.
+    """
+    def __init__(self, mibBuilder, **options):
+        self._mibBuilder = mibBuilder
+        self._genTexts = options.pop('genTexts', None)
+        self._options = options
+        self._mibCompiler = None
+
+    def compile(self, *mibNames, **options):
+        if self._mibCompiler is None:
+            # MIB builder already searches the destination directory
+            mibSources = self._mibBuilder.getMibSources()
+
+            mibcache.addMibCompiler(self._mibBuilder, genTexts=self._genTexts,
+                                    **self._options)
+
+            self._mibCompiler = self._mibBuilder.getMibCompiler()
+
+            self._mibBuilder.setMibSources(*mibSources)
+
+        if self._genTexts is not None:
+            options['genTexts'] = self._genTexts
+
+        return self._mibCompiler.compile(*mibNames, **options)
+
+
+class MibEngine(object):
+    """Stand-in for SNMP engine for tools that never talk SNMP.
+
+    Only carries MIB builder and user context. The MIBs SNMP engine
+    loads on its own are loaded too so that MIB tree looks the same.
+    """
+    transportDispatcher = None
+
+    ENGINE_MIBS = ('__SNMP-FRAMEWORK-MIB', 'SNMP-FRAMEWORK-MIB',
+                   'SNMP-MPD-MIB', 'SNMP-TARGET-MIB',
+                   'SNMP-COMMUNITY-MIB', 'SNMP-USER-BASED-SM-MIB')
+
+    def __init__(self):
+        self._mibBuilder = builder.MibBuilder()
+        self._mibBuilder.loadModules(*self.ENGINE_MIBS)
+        self._userContext = {}
+
+    def getMibBuilder(self):
+        return self._mibBuilder
+
+    def getUserContext(self, arg):
+        return self._userContext.get(arg)
+
+    def setUserContext(self, **kwargs):
+        self._userContext.update(kwargs)
+
+
 class UnknownSyntax(object):
     def prettyOut(self, val):
         return str(val)
@@ -323,6 +773,13 @@ class MibViewProxy(object):
     )
     DEFAULT_MIBS = ('SNMPv2-MIB',)
     DEFAULT_MIB_DIRS = ()
+    DEFAULT_OID_CACHE_SIZE = 1024
+    DEFAULT_INDEX_CACHE_SIZE = 262144
+
+    OUTPUT_FORMATS = ('text', 'json', 'csv')
+
+    # Fields of machine-readable variable-binding record
+    RECORD_FIELDS = ('oid', 'name', 'index', 'type', 'value', 'formatted')
 
     # MIB parsing options
     # currently N/A
@@ -346,6 +803,9 @@ class MibViewProxy(object):
     buildGuessedStringVals = True
     buildUnits = True
 
+    # variable-bindings output format, one of OUTPUT_FORMATS
+    outputFormat = 'text'
+
     # MIB input options
     parseAsRandomAccessMib = True
     parseAsRegExp = False
@@ -353,7 +813,13 @@ class MibViewProxy(object):
     parseAndCheckIndices = True
     parseAsDisplayHint = True
 
-    def __init__(self, mibViewController):
+    def __init__(self, mibViewController, oidIndex=None):
+        self.oidIndex = oidIndex
+
+        # Compiled MIBs to load on demand
+        self.mibModuleIndex = None
+        self.__failedMibModules = set()
+
         if 'PYSNMPOIDPREFIX' in os.environ:
             self.DEFAULT_OID_PREFIX = os.environ['PYSNMPOIDPREFIX']
 
@@ -363,152 +829,692 @@ class MibViewProxy(object):
         if 'PYSNMPMIBDIRS' in os.environ:
             self.DEFAULT_MIB_DIRS = os.environ['PYSNMPMIBDIRS'].split(os.pathsep)
 
+        if 'PYSNMPOIDCACHESIZE' in os.environ:
+            self.DEFAULT_OID_CACHE_SIZE = int(os.environ['PYSNMPOIDCACHESIZE'])
+
+        if 'PYSNMPINDEXCACHESIZE' in os.environ:
+            self.DEFAULT_INDEX_CACHE_SIZE = int(
+                os.environ['PYSNMPINDEXCACHESIZE'])
+
+        # Max number of MIB objects to keep resolved
+        self.oidCacheSize = self.DEFAULT_OID_CACHE_SIZE
+
+        self.__oidCache = OrderedDict()
+        self.__oidCacheBuildId = None
+        self.__oidCacheHits = self.__oidCacheMisses = 0
+
+        # Max number of table row indices to keep decoded, the cache
+        # grows up to that size to cover the rows in flight
+        self.indexCacheSize = self.DEFAULT_INDEX_CACHE_SIZE
+
+        self.__indexCache = OrderedDict()
+        self.__indexCacheCapacity = 1
+        self.__indexCachePending = set()
+        self.__indexCacheHits = self.__indexCacheMisses = 0
+
         if self.DEFAULT_MIB_DIRS:
-            mibViewController.mibBuilder.setMibSources(
-                *(mibViewController.mibBuilder.getMibSources() +
-                  tuple([builder.ZipMibSource(m).init() for m in self.DEFAULT_MIB_DIRS]))
-            )
+            mibSources = mibViewController.mibBuilder.getMibSources()
 
-        if self.DEFAULT_MIBS:
-            mibViewController.mibBuilder.loadModules(*self.DEFAULT_MIBS)
+            # MIB builder may already be configured by a previous run
+            knownPaths = [x.fullPath() for x in mibSources]
+
+            for mibDir in self.DEFAULT_MIB_DIRS:
+                if mibbundle.isBundle(mibDir):
+                    mibSource = mibbundle.MibBundleSource(mibDir)
+
+                else:
+                    mibSource = builder.ZipMibSource(mibDir)
+
+                if mibSource.fullPath() not in knownPaths:
+                    mibSources += (mibSource.init(),)
+
+            mibViewController.mibBuilder.setMibSources(*mibSources)
+
+        # Loading modules is not cheap even if they are already loaded
+        mibs = [x for x in self.DEFAULT_MIBS
+                if x not in mibViewController.mibBuilder.mibSymbols]
+
+        if mibs:
+            mibsnapshot.loadModules(mibViewController.mibBuilder, *mibs)
 
         self.__oidValue = univ.ObjectIdentifier()
         self.__intValue = univ.Integer()
         self.__timeValue = rfc1902.TimeTicks()
         self.__bitsValue = rfc1902.Bits()
+        self.__octetsValue = univ.OctetString()
+
+        self.__formatVarBind = None
+
+    def getOidCacheStats(self):
+        """Return OID cache hits and misses counts"""
+        return self.__oidCacheHits, self.__oidCacheMisses
+
+    def getIndexCacheStats(self):
+        """Return row index cache hits and misses counts"""
+        return self.__indexCacheHits, self.__indexCacheMisses
+
+    def getMibObject(self, mibViewController, prefix, label, entry=None):
+        """Return formatting metadata of MIB object at OID prefix.
+
+        Metadata is kept in LRU cache so that subsequent instances of
+        the same MIB object (e.g. table column) are formatted without
+        resolving MIB object over again.
+        """
+        mibBuilder = mibViewController.mibBuilder
+
+        if self.__oidCacheBuildId != mibBuilder.lastBuildId:
+            self.__oidCache.clear()
+            self.__indexCache.clear()
+            self.__oidCacheBuildId = mibBuilder.lastBuildId
+
+        key = tuple(prefix)
+
+        try:
+            mibObject = self.__oidCache.pop(key)
+
+        except KeyError:
+            self.__oidCacheMisses += 1
+
+            mibObject = _MibObject(
+                self, mibViewController, key, label, entry)
+
+            if len(self.__oidCache) >= self.oidCacheSize:
+                if self.oidCacheSize <= 0:
+                    return mibObject
+
+                self.__oidCache.popitem(last=False)
+
+        else:
+            self.__oidCacheHits += 1
+
+        self.__oidCache[key] = mibObject
+
+        return mibObject
+
+    def loadMibModules(self, mibViewController, oid):
+        """Load MIB module defining OID unless one is already loaded"""
+        mibBuilder = mibViewController.mibBuilder
+
+        modNames = self.mibModuleIndex.lookup(oid)
+
+        for modName in modNames:
+            if modName in mibBuilder.mibSymbols:
+                return
+
+        for modName in modNames:
+            if modName in self.__failedMibModules:
+                continue
+
+            try:
+                mibBuilder.loadModules(modName)
+
+            except error.PySnmpError:
+                self.__failedMibModules.add(modName)
+                continue
+
+            return
 
     def getPrettyOidVal(self, mibViewController, oid, val):
-        prefix, label, suffix = mibViewController.getNodeName(oid)
-        modName, nodeDesc, _suffix = mibViewController.getNodeLocation(prefix)
+        if self.__formatVarBind is None:
+            if self.outputFormat == 'text':
+                self.__formatVarBind = self.compileFormatter()
 
-        out = ''
+            else:
+                self.__formatVarBind = self.compileRecordFormatter()
+
+        return self.__formatVarBind(mibViewController, oid, val)
+
+    def compileFormatter(self):
+        """Return varbind formatter specialized to output options.
+
+        Output options are consulted just once, at the time the chain of
+        formatting callables is built, rather than for every varbind. The
+        same goes for the kind of value rendering which is chosen once
+        per value type.
+
+        Output options are not supposed to change once formatter is
+        built, this happens before the first varbind is formatted.
+        """
+        oidIndex = self.oidIndex
+        getMibObject = self.getMibObject
+
+        def getNumericIndices(mibObject, mibViewController, suffix):
+            mibObject.getRowNode(mibViewController)
+
+            return '.' + formatting.formatArcs(suffix)
+
+        if self.buildEscQuotes:
+            indexFormat = '.\\\"%s\\\"'
+
+        elif self.buildSquareBrackets:
+            indexFormat = '.[%s]'
+
+        else:
+            indexFormat = '.\"%s\"'
+
+        def decodeIndices(rowNode, suffix):
+            out = ''
+
+            try:
+                for i in rowNode.getIndicesFromInstId(suffix):
+                    out += indexFormat % i.prettyOut(i)
+
+            except Exception:
+                out += '.' + formatting.formatArcs(suffix)
+
+            return out
+
+        def getIndices(mibObject, mibViewController, suffix):
+            rowNode = mibObject.getRowNode(mibViewController)
+
+            return decodeIndices(rowNode, suffix)
+
+        if self.buildNumericIndices:
+            getIndices = getNumericIndices
+
+        elif self.indexCacheSize > 0:
+            getIndices = self.compileIndexCache(decodeIndices)
 
-        # object name
         if self.buildObjectName:
-            if self.buildModInfo:
-                out = '%s::' % modName
+            def getName(mibObject, mibViewController, suffix):
+                if not suffix:
+                    return mibObject.name
+
+                if suffix == (0,):
+                    return mibObject.name + '.0'
+
+                return mibObject.name + getIndices(
+                    mibObject, mibViewController, suffix)
+
+        else:
+            def getName(mibObject, mibViewController, suffix):
+                return ''
+
+        if not self.buildValue:
+            separator = None
+
+        elif not self.buildObjectName:
+            separator = ''
+
+        elif self.buildEqualSign:
+            separator = ' = '
+
+        else:
+            separator = ' '
+
+        getRenderer = self.compileValueRenderers()
+
+        buildTypeInfo = self.buildTypeInfo
+        buildUnits = self.buildUnits
+
+        loadMibModules = self.mibModuleIndex and self.loadMibModules
+
+        def formatVarBind(mibViewController, oid, val):
+            if loadMibModules:
+                loadMibModules(mibViewController, oid)
+
+            entry = None
+
+            if oidIndex is not None:
+                entry, suffix = oidIndex.lookup(oid)
 
-            if self.buildObjectDesc:
-                out += nodeDesc
+            if entry is None:
+                prefix, label, suffix = mibViewController.getNodeName(oid)
 
             else:
-                if self.buildNumericName:
-                    name = prefix
+                prefix, label = entry.name, entry.label
 
-                else:
-                    name = label
+            mibObject = getMibObject(mibViewController, prefix, label, entry)
 
-                if not self.buildAbsoluteName:
-                    name = name[len(self.DEFAULT_OID_PREFIX):]
+            out = getName(mibObject, mibViewController, suffix)
 
-                out += '.'.join([str(x) for x in name])
+            if separator is None:
+                return out
 
-            if suffix:
-                if suffix == (0,):
-                    out += '.0'
+            out += separator
 
-                else:
-                    m, n, s = mibViewController.getNodeLocation(prefix[:-1])
+            render = getRenderer(val)
 
-                    rowNode, = mibViewController.mibBuilder.importSymbols(m, n)
+            if render is None:  # Null
+                return out + val.prettyPrint()
 
-                    if self.buildNumericIndices:
-                        out += '.' + '.'.join([str(x) for x in suffix])
+            syntax = mibObject.syntax
 
-                    else:
+            if syntax is None:  # MIB object of no syntax
+                syntax = val
+
+            if buildTypeInfo:
+                out += mibObject.typeInfo or '%s: ' % syntax.__class__.__name__
+
+            out += render(mibViewController, syntax, val)
 
-                        try:
-                            for i in rowNode.getIndicesFromInstId(suffix):
+            if buildUnits:
+                out += mibObject.units
 
-                                if self.buildEscQuotes:
-                                    out += '.\\\"%s\\\"' % i.prettyOut(i)
+            return out
 
-                                elif self.buildSquareBrackets:
-                                    out += '.[%s]' % i.prettyOut(i)
+        return formatVarBind
 
-                                else:
-                                    out += '.\"%s\"' % i.prettyOut(i)
+    def compileIndexCache(self, decodeIndices):
+        """Return table row indices decoder memoizing decoded indices.
+
+        All columns of a table row share decoded indices, those are
+        kept in LRU cache. The cache is sized to the rows in flight: it
+        grows (up to `indexCacheSize`) rather than drops least recently
+        used row no other column has come for yet. That way walking a
+        table column by column keeps all of its rows, while walking
+        columns side by side keeps just the rows of a few responses.
+        """
+        indexCache = self.__indexCache
+        indexCacheSize = self.indexCacheSize
+        pending = self.__indexCachePending
 
-                        except Exception:
-                            out += '.' + '.'.join([str(x) for x in suffix])
+        def getCachedIndices(mibObject, mibViewController, suffix):
+            rowNode = mibObject.getRowNode(mibViewController)
 
-        if self.buildObjectName and self.buildValue:
-            if self.buildEqualSign:
-                out += ' = '
+            key = rowNode.name, tuple(suffix)
+
+            try:
+                out = indexCache.pop(key)
+
+            except KeyError:
+                self.__indexCacheMisses += 1
+
+                out = decodeIndices(rowNode, suffix)
+
+                if len(indexCache) >= self.__indexCacheCapacity:
+                    if (len(indexCache) < indexCacheSize and
+                            next(iter(indexCache)) in pending):
+                        self.__indexCacheCapacity += 1
+
+                    else:
+                        pending.discard(indexCache.popitem(last=False)[0])
+
+                pending.add(key)
 
             else:
-                out += ' '
+                self.__indexCacheHits += 1
+
+                pending.discard(key)
+
+            indexCache[key] = out
+
+            return out
+
+        return getCachedIndices
+
+    def compileRecordBuilder(self):
+        """Return callable turning varbind into machine-readable record.
 
-        # Value
-        if self.buildValue:
+        Record is a tuple of `RECORD_FIELDS`: numeric OID, MIB object
+        name, decoded table row indices, value type, raw value and value
+        rendered as per output options.
+        """
+        oidIndex = self.oidIndex
+        getMibObject = self.getMibObject
+
+        def getRawValue(val):
             if isinstance(val, univ.Null):
-                return out + val.prettyPrint()
+                return
 
-            mibNode, = mibViewController.mibBuilder.importSymbols(
-                modName, nodeDesc)
+            if isinstance(val, univ.Integer):
+                return int(val)
+
+            if isinstance(val, univ.ObjectIdentifier):
+                return str(val)
+
+            if isinstance(val, univ.OctetString):
+                return formatting.formatHexOctets(val.asOctets(), '')
+
+            return str(val)
+
+        def getIndexValue(val):
+            if isinstance(val, univ.Integer):
+                return int(val)
+
+            return val.prettyPrint()
+
+        def decodeIndices(rowNode, suffix):
+            try:
+                return tuple([getIndexValue(x) for x in
+                              rowNode.getIndicesFromInstId(suffix)])
 
-            if hasattr(mibNode, 'syntax'):
-                syntax = mibNode.syntax
+            except Exception:
+                return tuple(suffix)
+
+        def getIndices(mibObject, mibViewController, suffix):
+            return decodeIndices(
+                mibObject.getRowNode(mibViewController), suffix)
+
+        if self.indexCacheSize > 0:
+            getIndices = self.compileIndexCache(decodeIndices)
+
+        getRenderer = self.compileValueRenderers()
+
+        buildUnits = self.buildUnits
+
+        loadMibModules = self.mibModuleIndex and self.loadMibModules
+
+        def getRecord(mibViewController, oid, val):
+            if loadMibModules:
+                loadMibModules(mibViewController, oid)
+
+            entry = None
+
+            if oidIndex is not None:
+                entry, suffix = oidIndex.lookup(oid)
+
+            if entry is None:
+                prefix, label, suffix = mibViewController.getNodeName(oid)
+
+            else:
+                prefix, label = entry.name, entry.label
+
+            mibObject = getMibObject(mibViewController, prefix, label, entry)
+
+            if not suffix or suffix == (0,):
+                indices = ()
 
             else:
+                indices = getIndices(mibObject, mibViewController, suffix)
+
+            render = getRenderer(val)
+
+            if render is None:  # Null
+                return (str(oid), mibObject.name, indices,
+                        val.__class__.__name__, None, val.prettyPrint())
+
+            syntax = mibObject.syntax
+
+            if syntax is None:  # MIB object of no syntax
                 syntax = val
 
-            if syntax is None:  # lame Agent may return a non-instance OID
-                syntax = unknownSyntax
+            formatted = render(mibViewController, syntax, val)
 
-            if self.buildTypeInfo:
-                out += '%s: ' % syntax.__class__.__name__
+            if buildUnits and mibObject.units.strip():
+                formatted += mibObject.units
+
+            return (str(oid), mibObject.name, indices,
+                    mibObject.typeName or syntax.__class__.__name__,
+                    getRawValue(val), formatted)
+
+        return getRecord
+
+    def compileRecordFormatter(self):
+        """Return varbind formatter producing machine-readable records.
+
+        Each varbind becomes a JSON object or a CSV row (the first row is
+        preceded by the header) holding the fields of varbind record.
+        Human-readable varbind line is never built.
+        """
+        getRecord = self.compileRecordBuilder()
+
+        if self.outputFormat == 'json':
+            encode = json.JSONEncoder().encode
+
+            template = '{%s}' % ', '.join(
+                ['"%s": %%s' % x for x in self.RECORD_FIELDS])
+
+            def formatVarBind(mibViewController, oid, val):
+                record = getRecord(mibViewController, oid, val)
+
+                return template % tuple([encode(x) for x in record])
+
+        else:
+            line = LineBuffer()
+
+            writer = csv.writer(line, lineterminator='')
+
+            writer.writerow(self.RECORD_FIELDS)
+
+            # header goes along with the first row
+            header = [line.pop() + '\n']
+
+            def formatVarBind(mibViewController, oid, val):
+                record = list(getRecord(mibViewController, oid, val))
+
+                record[2] = json.dumps(record[2])
+
+                writer.writerow(record)
+
+                if header:
+                    return header.pop() + line.pop()
+
+                return line.pop()
+
+        return formatVarBind
+
+    def compileValueRenderers(self):
+        """Return function choosing value renderer by value type.
+
+        Value renderer is specialized to output options. Choice of
+        renderer is made once per value type and memoized, `None` is
+        chosen for :py:class:`Null` values.
+        """
+        oidIndex = self.oidIndex
+        loadMibModules = self.mibModuleIndex and self.loadMibModules
+        intValue = self.__intValue
+        timeValue = self.__timeValue
+        oidValue = self.__oidValue
+        bitsValue = self.__bitsValue
+        octetsValue = self.__octetsValue
+
+        def renderRaw(mibViewController, syntax, val):
+            return str(val)
+
+        def renderHexInteger(mibViewController, syntax, val):
+            return '%x' % int(val)
+
+        def renderHexOid(mibViewController, syntax, val):
+            return formatting.formatHexArcs(tuple(val))
+
+        def renderHexOctets(mibViewController, syntax, val):
+            return formatting.formatHexOctets(val.asOctets())
+
+        def renderRawTimeTicks(mibViewController, syntax, val):
+            return str(int(val))
+
+        def renderTimeTicks(mibViewController, syntax, val):
+            # TimeTicks is not a TC
+            return formatting.formatTimeTicks(int(val))
+
+        def renderOid(mibViewController, syntax, val):
+            if loadMibModules:
+                loadMibModules(mibViewController, val)
+
+            oid, label, suffix = (
+                oidIndex or mibViewController).getNodeName(val)
+
+            if suffix:
+                return '.'.join(label) + '.' + formatting.formatArcs(suffix)
+
+            return '.'.join(label)
+
+        def renderNoEnums(mibViewController, syntax, val):
+            return syntax.clone(
+                val, namedValues=namedval.NamedValues()).prettyPrint()
+
+        def renderPretty(mibViewController, syntax, val):
+            return syntax.clone(val).prettyPrint()
+
+        # octets formatters by SNMP type, `None` where type renders itself
+        octetsFormatters = {}
+
+        def renderOctets(mibViewController, syntax, val):
+            try:
+                formatOctets = octetsFormatters[syntax.__class__]
+
+            except KeyError:
+                formatOctets = octetsFormatters[syntax.__class__] = (
+                    formatting.compileOctetsFormatter(syntax))
+
+            if formatOctets is None:
+                return syntax.clone(val).prettyPrint()
+
+            data = val.asOctets()
+
+            # as cloning does
+            if syntax.subtypeSpec:
+                syntax.subtypeSpec(data)
+
+            return formatOctets(data)
+
+        def chooseRenderer(val):
+            if isinstance(val, univ.Null):
+                return
 
             if self.buildRawVals:
-                out += str(val)
+                return renderRaw
 
-            elif self.buildHexVals:  # XXX make it always in hex?
-                if self.__intValue.isSuperTypeOf(val):
-                    out += '%x' % int(val)
+            if self.buildHexVals:  # XXX make it always in hex?
+                if intValue.isSuperTypeOf(val):
+                    return renderHexInteger
 
-                elif self.__timeValue.isSameTypeWith(val):
-                    out += '%x' % int(val)
+                if timeValue.isSameTypeWith(val):
+                    return renderHexInteger
 
-                elif self.__oidValue.isSuperTypeOf(val):
-                    out += ' '.join(['%x' % x for x in tuple(val)])
+                if oidValue.isSuperTypeOf(val):
+                    return renderHexOid
 
-                else:
-                    out += ' '.join(['%.2x' % x for x in val.asNumbers()])
+                return renderHexOctets
 
-            elif self.__timeValue.isSameTypeWith(val):
+            if timeValue.isSameTypeWith(val):
                 if self.buildRawTimeTicks:
-                    out += str(int(val))
-
-                else:  # TimeTicks is not a TC
-                    val = int(val)
-                    d, m = divmod(val, 8640000)
-                    out += '%d days ' % d
-                    d, m = divmod(m, 360000)
-                    out += '%d:' % d
-                    d, m = divmod(m, 6000)
-                    out += '%d:' % d
-                    d, m = divmod(m, 100)
-                    out += '%d.%d' % (d, m)
-
-            elif self.__oidValue.isSuperTypeOf(val):
-                oid, label, suffix = mibViewController.getNodeName(val)
-                out += '.'.join(
-                    label + tuple([str(x) for x in suffix])
-                )
+                    return renderRawTimeTicks
 
-            elif (not self.buildEnums and
-                  (self.__intValue.isSuperTypeOf(val) or
-                   self.__bitsValue.isSuperTypeOf(val))):
-                out += syntax.clone(val, namedValues=namedval.NamedValues()).prettyPrint()
+                return renderTimeTicks
 
-            else:
-                out += syntax.clone(val).prettyPrint()
+            if oidValue.isSuperTypeOf(val):
+                return renderOid
+
+            if (not self.buildEnums and
+                    (intValue.isSuperTypeOf(val) or
+                     bitsValue.isSuperTypeOf(val))):
+                return renderNoEnums
+
+            if octetsValue.isSuperTypeOf(val):
+                return renderOctets
 
-            if self.buildUnits:
-                if hasattr(mibNode, 'getUnits'):
-                    out += ' %s' % mibNode.getUnits()
+            return renderPretty
 
-        return out
+        # value type checks only depend on these
+        renderers = {}
+
+        def getRenderer(val):
+            try:
+                key = val.__class__, val.tagSet, val.subtypeSpec
+                return renderers[key]
+
+            except KeyError:
+                renderer = renderers[key] = chooseRenderer(val)
+                return renderer
+
+            except (AttributeError, TypeError):  # not a (hashable) type
+                return chooseRenderer(val)
+
+        return getRenderer
 
     def setPrettyOidValue(self, oid, val, t):
         return oid, val
+
+
+class LineBuffer(object):
+    # Keeps what CSV writer writes until popped
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(data)
+
+    def pop(self):
+        data = ''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+class _MibObject(object):
+    # Formatting metadata of MIB object shared by all its instances
+    __slots__ = ('prefix', 'entry', 'oidIndex', 'name', 'syntax',
+                 'typeName', 'typeInfo', 'units', 'rowNode')
+
+    def __init__(self, mibViewProxy, mibViewController, prefix, label, entry):
+        self.prefix = prefix
+        self.entry = entry
+        self.oidIndex = mibViewProxy.oidIndex
+        self.rowNode = None
+
+        if entry is None:
+            modName, nodeDesc, _suffix = mibViewController.getNodeLocation(prefix)
+
+            mibNode, = mibViewController.mibBuilder.importSymbols(
+                modName, nodeDesc)
+
+        else:
+            modName, nodeDesc = entry.modName, entry.symName
+
+            mibNode = self.oidIndex.getNode(entry)
+
+        # object name
+        name = ''
+
+        if mibViewProxy.buildModInfo:
+            name = '%s::' % modName
+
+        if mibViewProxy.buildObjectDesc:
+            name += nodeDesc
+
+        else:
+            if mibViewProxy.buildNumericName:
+                oidName = prefix
+
+            else:
+                oidName = label
+
+            if not mibViewProxy.buildAbsoluteName:
+                oidName = oidName[len(mibViewProxy.DEFAULT_OID_PREFIX):]
+
+            name += '.'.join([str(x) for x in oidName])
+
+        self.name = name
+
+        # syntax prototype, value itself is used if MIB object has none
+        self.syntax = self.typeName = self.typeInfo = None
+
+        if hasattr(mibNode, 'syntax'):
+            self.syntax = mibNode.syntax
+
+            if self.syntax is None:  # lame Agent may return a non-instance OID
+                self.syntax = unknownSyntax
+
+            if entry is not None and entry.syntaxName:
+                self.typeName = entry.syntaxName
+
+            else:
+                self.typeName = self.syntax.__class__.__name__
+
+            self.typeInfo = '%s: ' % self.typeName
+
+        # units suffix
+        self.units = ''
+
+        if entry is not None:
+            if entry.units is not None:
+                self.units = ' %s' % entry.units
+
+        elif hasattr(mibNode, 'getUnits'):
+            self.units = ' %s' % mibNode.getUnits()
+
+    def getRowNode(self, mibViewController):
+        # Table row is needed for decoding instance indices
+        if self.rowNode is None:
+            entry = self.entry
+
+            if entry is not None and entry.parent is not None:
+                self.rowNode = self.oidIndex.getNode(entry.parent)
+
+            else:
+                m, n, s = mibViewController.getNodeLocation(self.prefix[:-1])
+
+                self.rowNode, = mibViewController.mibBuilder.importSymbols(m, n)
+
+        return self.rowNode
@@ -0,0 +1,153 @@
+#
+# This file is part of snmpclitools software.
+#
+# Copyright (c) 2005-2019, Ilya Etingof <etingof@gmail.com>
+# License: http://snmplabs.com/snmpclitools/license.html
+#
+# Index of OID subtrees by MIB module defining them.
+#
+# Compiled MIB modules found in MIB builder search path are scanned
+# (not loaded) for the OIDs they define. Any OID can then be mapped
+# into the MIB modules defining its longest known prefix, so that
+# just these modules could be loaded to render the OID symbolically.
+#
+# The index is built once per set of compiled MIB files and kept in
+# the tools cache.
+#
+import os
+import re
+
+from pysnmp.smi import builder
+
+from snmpclitools.cli import cache
+
+FORMAT_VERSION = 1
+
+# pysmi-generated code passes OID as the first argument of MIB object
+_OID_DEFINITION = re.compile(
+    r'\w\(\(\s*(\d+(?:\s*,\s*\d+)*)\s*,?\s*\)')
+
+
+class MibModuleIndex(object):
+    """Map OIDs into MIB modules defining them.
+
+    Only compiled MIB modules available as Python source are indexed.
+    """
+    # Name and format of the index in the tools cache
+    NAME = 'modindex'
+    FORMAT_VERSION = FORMAT_VERSION
+
+    def __init__(self, mibBuilder):
+        self.mibBuilder = mibBuilder
+        self._key = None
+        self._index = {}
+
+    def getModFiles(self):
+        """Return compiled MIB module files in MIB search path order"""
+        modFiles = {}
+
+        for mibSource in self.mibBuilder.getMibSources():
+            path = mibSource.fullPath()
+
+            try:
+                files = os.listdir(path)
+
+            except OSError:
+                continue
+
+            for f in files:
+                for sfx in builder.PY_SUFFIXES:
+                    if f.endswith(sfx):
+                        modName = f[:-len(sfx)]
+
+                        # Ones found earlier in search path take precedence
+                        if modName not in modFiles:
+                            modFiles[modName] = os.path.join(path, f)
+
+                        break
+
+        return modFiles
+
+    def getKey(self, modFiles):
+        """Hash the set of compiled MIB modules and their files"""
+        parts = [self.NAME, self.FORMAT_VERSION]
+
+        for modName in sorted(modFiles):
+            path = modFiles[modName]
+
+            try:
+                mtime = os.stat(path).st_mtime
+
+            except OSError:
+                mtime = 0
+
+            parts.extend([modName, path, mtime])
+
+        return cache.getKey(*parts)
+
+    @staticmethod
+    def build(modFiles):
+        """Scan MIB module files into OID to MIB modules map"""
+        index = {}
+
+        for modName in sorted(modFiles):
+            path = modFiles[modName]
+
+            # Agent-side MIB instances are of no use for rendering
+            if modName.startswith('__') or not path.endswith('.py'):
+                continue
+
+            try:
+                with open(path) as f:
+                    text = f.read()
+
+            except (OSError, IOError, UnicodeError):
+                continue
+
+            for arcs in _OID_DEFINITION.findall(text):
+                oid = tuple([int(x) for x in arcs.split(',')])
+
+                modNames = index.get(oid, ())
+
+                if modName not in modNames:
+                    index[oid] = modNames + (modName,)
+
+        return index
+
+    def refresh(self):
+        """Bring index in line with compiled MIB files"""
+        modFiles = self.getModFiles()
+
+        key = self.getKey(modFiles)
+
+        if key == self._key:
+            return
+
+        index = cache.load(self.NAME, key)
+
+        if index is None:
+            index = self.build(modFiles)
+
+            cache.store(self.NAME, key, index)
+
+        self._index = index
+        self._key = key
+
+    def lookup(self, oid):
+        """Return MIB modules defining the longest known prefix of OID.
+
+        Returns
+        -------
+        :py:class:`tuple`
+            Names of MIB modules, empty if no prefix of OID is known
+        """
+        index = self._index
+
+        oid = tuple(oid)
+
+        for length in range(len(oid), 0, -1):
+            modNames = index.get(oid[:length])
+            if modNames:
+                return modNames
+
+        return ()
@@ -0,0 +1,294 @@
+#
+# This file is part of snmpclitools software.
+#
+# Copyright (c) 2005-2019, Ilya Etingof <etingof@gmail.com>
+# License: http://snmplabs.com/snmpclitools/license.html
+#
+# Index of MIB object names by MIB module defining them.
+#
+# Compiled MIB modules found in MIB builder search path are scanned
+# (not loaded) for the MIB symbols they export and the labels of their
+# MIB tree nodes. A bare MIB object name can then be mapped into the
+# MIB modules defining it, so that just these modules could be loaded
+# to resolve the name.
+#
+# For regular expression search, names are additionally indexed by the
+# three-character substrings (trigrams) they contain. Literal parts of
+# the regular expression narrow the search down to the names containing
+# all of their trigrams, only these names are matched against the
+# expression. Trigrams are indexed in memory, on first search.
+#
+import re
+
+from snmpclitools.cli import modindex
+
+FORMAT_VERSION = 1
+
+# pysmi-generated and pysnmp built-in MIB modules export symbols as
+# keyword arguments, the ones not being Python identifiers go in a dict
+_EXPORT = re.compile(
+    r'exportSymbols\(\s*[\'"][\w-]+[\'"]\s*,([^)]*)\)')
+
+_EXPORTED_NAME = re.compile(r'(?:^|[,{(\s])[\'"]?([\w-]+)[\'"]?\s*[=:]')
+
+_LABEL = re.compile(r'setLabel\(\s*[\'"]([\w-]+)[\'"]\s*\)')
+
+# MIB object names start in lower case, MIB types in upper case
+_OBJECT_NAME = re.compile(r'^[a-z][\w-]*$')
+
+
+def getLiterals(pattern):
+    """Return literal strings any match of regular expression contains.
+
+    Only the parts of regular expression matching fixed strings
+    outside of groups and character classes are considered. With
+    top-level alternation nothing is guaranteed to be matched.
+
+    Returns
+    -------
+    :py:class:`list`
+        Literal strings, possibly empty
+    """
+    literals = []
+    literal = ''
+    depth = 0
+    idx = 0
+
+    while idx < len(pattern):
+        c = pattern[idx]
+        idx += 1
+
+        if c == '\\':
+            escape = pattern[idx:idx + 1]
+            idx += 1
+
+            # Character classes and back references are not literal
+            if not escape or escape.isalnum() or escape == '_':
+                c = None
+
+            else:
+                c = escape
+
+        elif c == '|' and not depth:
+            return []
+
+        elif c == '[':
+            # Skip character class, the closing bracket may come first
+            end = pattern.find(']', idx + (pattern[idx:idx + 1] == ']'))
+            idx = end < 0 and len(pattern) or end + 1
+            c = None
+
+        elif c == '(':
+            depth += 1
+            c = None
+
+        elif c == ')':
+            depth = max(0, depth - 1)
+            c = None
+
+        elif c == '{':
+            # Quantified character may be missing from the match
+            end = pattern.find('}', idx)
+            idx = end < 0 and len(pattern) or end + 1
+            literal = literal[:-1]
+            c = None
+
+        elif c in '*?':
+            literal = literal[:-1]
+            c = None
+
+        elif c in '.^$+':
+            c = None
+
+        if c is None or depth:
+            literals.append(literal)
+            literal = ''
+
+        else:
+            literal += c
+
+    literals.append(literal)
+
+    return [x for x in literals if x]
+
+
+def getTrigrams(text):
+    return set([text[i:i + 3] for i in range(len(text) - 2)])
+
+
+class MibNameIndex(modindex.MibModuleIndex):
+    """Map MIB object names into MIB modules defining them.
+
+    Only compiled MIB modules available as Python source are indexed.
+    """
+    NAME = 'nameindex'
+    FORMAT_VERSION = FORMAT_VERSION
+
+    def __init__(self, mibBuilder):
+        modindex.MibModuleIndex.__init__(self, mibBuilder)
+        self._names = None
+        self._trigrams = None
+
+    @staticmethod
+    def build(modFiles):
+        """Scan MIB module files into MIB object name to MIB modules map"""
+        index = {}
+
+        for modName in sorted(modFiles):
+            path = modFiles[modName]
+
+            # Agent-side MIB instances are of no use for resolving names
+            if modName.startswith('__') or not path.endswith('.py'):
+                continue
+
+            try:
+                with open(path) as f:
+                    text = f.read()
+
+            except (OSError, IOError, UnicodeError):
+                continue
+
+            names = _LABEL.findall(text)
+
+            for exports in _EXPORT.findall(text):
+                names.extend(_EXPORTED_NAME.findall(exports))
+
+            for name in names:
+                if not _OBJECT_NAME.match(name):
+                    continue
+
+                modNames = index.get(name, ())
+
+                if modName not in modNames:
+                    index[name] = modNames + (modName,)
+
+        return index
+
+    def refresh(self):
+        """Bring index in line with compiled MIB files"""
+        key = self._key
+
+        modindex.MibModuleIndex.refresh(self)
+
+        if key != self._key:
+            self._names = self._trigrams = None
+
+    def lookup(self, name):
+        """Return MIB modules defining MIB object name.
+
+        Returns
+        -------
+        :py:class:`tuple`
+            Names of MIB modules, empty if name is not known
+        """
+        return self._index.get(name, ())
+
+    def _indexTrigrams(self):
+        self._names = names = sorted(self._index)
+        self._trigrams = trigrams = {}
+
+        for idx, name in enumerate(names):
+            for trigram in getTrigrams(name):
+                try:
+                    trigrams[trigram].append(idx)
+
+                except KeyError:
+                    trigrams[trigram] = [idx]
+
+    def getCandidates(self, regExp):
+        """Return names possibly matching compiled regular expression"""
+        if self._names is None:
+            self._indexTrigrams()
+
+        required = set()
+
+        if not regExp.flags & re.IGNORECASE:
+            for literal in getLiterals(regExp.pattern):
+                required.update(getTrigrams(literal))
+
+        if not required:
+            return self._names
+
+        # Start off the rarest trigram
+        postings = sorted([self._trigrams.get(x, ()) for x in required],
+                          key=len)
+
+        candidates = set(postings[0])
+
+        for posting in postings[1:]:
+            if not candidates:
+                break
+
+            candidates.intersection_update(posting)
+
+        return [self._names[x] for x in sorted(candidates)]
+
+    def search(self, pattern, modName=''):
+        """Find MIB object names matching regular expression.
+
+        Parameters
+        ----------
+        pattern: :py:class:`str`
+            Regular expression to search names for
+        modName: :py:class:`str`
+            Only consider names defined by this MIB module if given
+
+        Returns
+        -------
+        :py:class:`list`
+            Pairs of name and MIB modules defining it, ordered by name
+
+        Raises
+        ------
+        :py:class:`re.error`
+            On bad regular expression
+        """
+        regExp = re.compile(pattern)
+
+        match = regExp.search
+
+        found = []
+
+        for name in self.getCandidates(regExp):
+            if not match(name):
+                continue
+
+            modNames = self._index[name]
+
+            if modName:
+                if modName not in modNames:
+                    continue
+
+                modNames = (modName,)
+
+            found.append((name, modNames))
+
+        return found
+
+    def bestMatch(self, pattern, modName=''):
+        """Find MIB object name best matching regular expression.
+
+        Name equal to pattern is the best match, otherwise the shortest
+        name matching pattern is.
+
+        Returns
+        -------
+        :py:class:`tuple`
+            Pair of name and MIB modules defining it or `None` if no
+            name matches
+
+        Raises
+        ------
+        :py:class:`re.error`
+            On bad regular expression
+        """
+        found = self.search(pattern, modName)
+
+        if not found:
+            return
+
+        for name, modNames in found:
+            if name == pattern:
+                return name, modNames
+
+        return min(found, key=lambda x: (len(x[0]), x[0]))
@@ -0,0 +1,540 @@
+#
+# This file is part of snmpclitools software.
+#
+# Copyright (c) 2005-2019, Ilya Etingof <etingof@gmail.com>
+# License: http://snmplabs.com/snmpclitools/license.html
+#
+# Precompiled OID index of MIB view.
+#
+# Each OID known to MIB view is stored along with its MIB module, symbol,
+# label, syntax class, units and the entry of its parent node (which is
+# table row for table columns). Entries are sorted by OID so that the
+# longest indexed prefix of any OID is found by binary search.
+#
+# The index is built once per set of loaded MIB modules and saved in
+# the tools cache in a compact binary form that is memory-mapped on
+# load:
+#
+#   header | entries | OID offsets | OID arcs | string offsets | strings
+#
+# OID arcs are stored as big-endian 32-bit integers so that byte-wise
+# comparison of arcs follows OID order.
+#
+import array
+import mmap
+import os
+import struct
+import sys
+import tempfile
+
+from pysnmp.smi import builder
+from pysnmp.smi.error import NoSuchObjectError
+
+from snmpclitools.cli import cache
+
+MAGIC = b'SNMPOIDX'
+FORMAT_VERSION = 1
+
+# Max number of index files (one per MIB set) kept around
+MAX_INDEX_FILES = 8
+
+_HEADER = struct.Struct('<8sIIIII')
+_ENTRY = struct.Struct('<HHIIIIIi')
+_OFFSET = struct.Struct('<I')
+_ARC = struct.Struct('>I')
+
+_NO_STRING = 0xffffffff
+
+FLAG_UNITS = 0x01
+FLAG_COLUMN = 0x02
+
+if sys.version_info[0] < 3:
+    _intTypes = (int, long)
+
+else:
+    _intTypes = (int,)
+
+
+class OidIndexEntry(object):
+    """Indexed MIB tree node.
+
+    Attributes
+    ----------
+    name: :py:class:`tuple`
+        Node OID
+    label: :py:class:`tuple`
+        Node label, same as MIB view would report
+    modName: :py:class:`str`
+        MIB module defining the node
+    symName: :py:class:`str`
+        MIB symbol of the node
+    syntaxName: :py:class:`str`
+        Class name of node syntax or empty string if node has no syntax
+    units: :py:class:`str`
+        Node units or `None` if node has no units
+    isColumn: :py:class:`bool`
+        Whether node is table column
+    parent: :py:class:`OidIndexEntry`
+        Entry of parent node (table row for columns) or `None`
+    """
+    __slots__ = ('name', 'label', 'modName', 'symName', 'syntaxName',
+                 'units', 'isColumn', 'parent', 'node')
+
+    def __init__(self, name, label, modName, symName, syntaxName, units,
+                 isColumn, parent):
+        self.name = name
+        self.label = label
+        self.modName = modName
+        self.symName = symName
+        self.syntaxName = syntaxName
+        self.units = units
+        self.isColumn = isColumn
+        self.parent = parent
+        self.node = None
+
+
+class OidIndex(object):
+    """Resolve numeric OIDs into MIB tree nodes by longest-prefix match.
+
+    Stands in for MIB view controller in name resolution of numeric
+    OIDs. Anything else is passed through to MIB view controller.
+
+    The index is (re)loaded whenever MIB builder loads more modules.
+    Saved index is reused while the set of loaded modules, their files
+    and pysnmp version stay the same.
+
+    Parameters
+    ----------
+    mibViewController: :py:class:`~pysnmp.smi.view.MibViewController`
+        MIB view to index
+    indexDir: :py:class:`str`
+        Directory to save index files into, tools cache directory
+        by default
+    """
+    def __init__(self, mibViewController, indexDir=None):
+        self.mibViewController = mibViewController
+        self.mibBuilder = mibViewController.mibBuilder
+        self._indexDir = indexDir
+        self._buildId = None
+        self._data = None
+        self._count = 0
+        self._entries = {}
+
+    # Index building
+
+    def getKey(self):
+        """Hash the set of loaded MIB modules and their files"""
+        import pysnmp
+
+        modFiles = {}
+
+        for mibSource in self.mibBuilder.getMibSources():
+            path = mibSource.fullPath()
+
+            try:
+                files = os.listdir(path)
+
+            except OSError:
+                continue
+
+            for f in files:
+                for sfx in builder.PY_SUFFIXES:
+                    if f.endswith(sfx):
+                        modFiles.setdefault(f[:-len(sfx)], os.path.join(path, f))
+                        break
+
+        parts = [MAGIC, FORMAT_VERSION, pysnmp.__version__]
+
+        for modName in sorted(self.mibBuilder.mibSymbols):
+            path = modFiles.get(modName, '')
+
+            try:
+                mtime = path and os.stat(path).st_mtime
+
+            except OSError:
+                mtime = 0
+
+            parts.extend((modName, path, mtime))
+
+        return cache.getKey(*parts)
+
+    def build(self):
+        """Serialize all nodes of MIB view into binary index"""
+        mibViewController = self.mibViewController
+        mibBuilder = self.mibBuilder
+
+        MibTableColumn, = mibBuilder.importSymbols(
+            'SNMPv2-SMI', 'MibTableColumn')
+
+        strings = []
+        stringIds = {}
+
+        def addString(s):
+            if s is None:
+                return _NO_STRING
+
+            if s not in stringIds:
+                stringIds[s] = len(strings)
+                strings.append(s.encode('utf-8'))
+
+            return stringIds[s]
+
+        nodes = []
+
+        try:
+            oid, label, suffix = mibViewController.getFirstNodeName()
+
+            while True:
+                nodes.append((oid, label))
+                oid, label, suffix = mibViewController.getNextNodeName(oid)
+
+        except NoSuchObjectError:
+            pass
+
+        positions = dict([(x[0], i) for i, x in enumerate(nodes)])
+
+        entries = []
+        arcOffsets = [0]
+        arcs = []
+
+        for oid, label in nodes:
+            modName, symName, suffix = mibViewController.getNodeLocation(oid)
+
+            mibNode, = mibBuilder.importSymbols(modName, symName)
+
+            flags = 0
+
+            syntaxName = ''
+
+            if getattr(mibNode, 'syntax', None) is not None:
+                syntaxName = mibNode.syntax.__class__.__name__
+
+            units = None
+
+            if hasattr(mibNode, 'getUnits'):
+                flags |= FLAG_UNITS
+                units = str(mibNode.getUnits())
+
+            if isinstance(mibNode, MibTableColumn):
+                flags |= FLAG_COLUMN
+
+            entries.append(_ENTRY.pack(
+                flags, 0,
+                addString('.'.join([str(x) for x in label])),
+                addString(modName), addString(symName),
+                addString(syntaxName), addString(units),
+                positions.get(oid[:-1], -1)))
+
+            arcs.extend(oid)
+
+            arcOffsets.append(len(arcs) * _ARC.size)
+
+        offsets = [0]
+
+        for s in strings:
+            offsets.append(offsets[-1] + len(s))
+
+        arcs = struct.pack('>%dI' % len(arcs), *arcs)
+        strings = b''.join(strings)
+
+        return b''.join(
+            [_HEADER.pack(MAGIC, FORMAT_VERSION, len(entries), len(arcs),
+                          len(offsets) - 1, len(strings))] +
+            entries + [_OFFSET.pack(x) for x in arcOffsets] + [arcs] +
+            [_OFFSET.pack(x) for x in offsets] + [strings])
+
+    # Index storage
+
+    def getPath(self, key):
+        if self._indexDir:
+            return os.path.join(self._indexDir, 'oidindex-%s.bin' % key)
+
+        return cache.getPath('oidindex', key, '.bin')
+
+    def load(self, path):
+        """Memory-map saved index or return `None` if not usable"""
+        try:
+            with open(path, 'rb') as f:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        except (IOError, OSError, ValueError):
+            return
+
+        if not self._setData(data):
+            data.close()
+            return
+
+        return data
+
+    def save(self, path, data):
+        """Atomically save index, drop indices of least recent MIB sets.
+
+        Failures are ignored - index file is always optional.
+        """
+        try:
+            indexDir = os.path.dirname(path)
+
+            if not os.path.isdir(indexDir):
+                os.makedirs(indexDir)
+
+            fd, tmpPath = tempfile.mkstemp(dir=indexDir)
+
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(data)
+
+                os.rename(tmpPath, path)
+
+            except Exception:
+                os.remove(tmpPath)
+                raise
+
+            indices = [os.path.join(indexDir, x)
+                       for x in os.listdir(indexDir)
+                       if x.startswith('oidindex-') and x.endswith('.bin')]
+
+            indices.sort(key=os.path.getmtime)
+
+            for stalePath in indices[:-MAX_INDEX_FILES]:
+                os.remove(stalePath)
+
+        except Exception:
+            pass
+
+    def _setData(self, data):
+        if len(data) < _HEADER.size:
+            return False
+
+        magic, version, count, arcsSize, stringsCount, stringsSize = \
+            _HEADER.unpack_from(data)
+
+        entriesAt = _HEADER.size
+        arcOffsetsAt = entriesAt + count * _ENTRY.size
+        arcsAt = arcOffsetsAt + (count + 1) * _OFFSET.size
+        offsetsAt = arcsAt + arcsSize
+        stringsAt = offsetsAt + (stringsCount + 1) * _OFFSET.size
+
+        if (magic != MAGIC or version != FORMAT_VERSION or
+                len(data) != stringsAt + stringsSize):
+            return False
+
+        # Copying OID offsets out is cheap, while it speeds up the search
+        arcOffsets = array.array('I', data[arcOffsetsAt:arcsAt])
+
+        if arcOffsets.itemsize != _OFFSET.size:
+            arcOffsets = struct.unpack_from(
+                '<%dI' % (count + 1), data, arcOffsetsAt)
+
+        elif sys.byteorder != 'little':
+            arcOffsets.byteswap()
+
+        if self._data is not None and hasattr(self._data, 'close'):
+            self._data.close()
+
+        self._data = data
+        self._arcOffsets = arcOffsets
+        self._lastPos = None
+        self._count = count
+        self._entriesAt = entriesAt
+        self._arcsAt = arcsAt
+        self._offsetsAt = offsetsAt
+        self._stringsAt = stringsAt
+        self._entries = {}
+
+        return True
+
+    def refresh(self):
+        """Bring index in line with currently loaded MIB modules"""
+        if self._buildId == self.mibBuilder.lastBuildId:
+            return
+
+        key = self.getKey()
+        path = self.getPath(key)
+
+        if not path or not self.load(path):
+            data = self.build()
+
+            self._setData(data)
+
+            if path:
+                self.save(path, data)
+
+        self._buildId = self.mibBuilder.lastBuildId
+
+    # Index lookup
+
+    def _getString(self, idx):
+        if idx == _NO_STRING:
+            return
+
+        start, end = struct.unpack_from(
+            '<II', self._data, self._offsetsAt + idx * _OFFSET.size)
+
+        return self._data[self._stringsAt + start:self._stringsAt + end].decode('utf-8')
+
+    def _getArcs(self, pos):
+        return self._data[self._arcsAt + self._arcOffsets[pos]:
+                          self._arcsAt + self._arcOffsets[pos + 1]]
+
+    def _readEntry(self, pos):
+        # Unpack entry leaving its parent unresolved
+        (flags, reserved, labelId, modNameId, symNameId, syntaxNameId,
+         unitsId, parentPos) = _ENTRY.unpack_from(
+            self._data, self._entriesAt + pos * _ENTRY.size)
+
+        arcs = self._getArcs(pos)
+
+        name = struct.unpack('>%dI' % (len(arcs) // _ARC.size), arcs)
+
+        label = tuple([int(x) if x.isdigit() else x
+                       for x in self._getString(labelId).split('.')])
+
+        units = None
+
+        if flags & FLAG_UNITS:
+            units = self._getString(unitsId)
+
+        entry = OidIndexEntry(
+            name, label, self._getString(modNameId),
+            self._getString(symNameId), self._getString(syntaxNameId),
+            units, bool(flags & FLAG_COLUMN), None)
+
+        return entry, parentPos
+
+    def getEntry(self, pos):
+        """Return index entry at given position"""
+        try:
+            return self._entries[pos]
+
+        except KeyError:
+            pass
+
+        entry, parentPos = self._readEntry(pos)
+
+        if parentPos >= 0:
+            entry.parent = self.getEntry(parentPos)
+
+        self._entries[pos] = entry
+
+        return entry
+
+    def _bisect(self, key):
+        # Number of entries not greater than key
+        lo, hi = 0, self._count
+
+        while lo < hi:
+            mid = (lo + hi) // 2
+
+            if key < self._getArcs(mid):
+                hi = mid
+
+            else:
+                lo = mid + 1
+
+        return lo
+
+    def lookup(self, oid):
+        """Find longest indexed prefix of numeric OID.
+
+        Returns
+        -------
+        :py:class:`tuple`
+            Index entry (`None` if nothing matches) and the rest of OID,
+            of the same type as OID (e.g.
+            :py:class:`~pysnmp.proto.rfc1902.ObjectName`) just like MIB
+            view controller returns it
+        """
+        self.refresh()
+
+        nodeName = oid
+
+        try:
+            oid = tuple(oid)
+            key = struct.pack('>%dI' % len(oid), *oid)
+
+        except (struct.error, TypeError):
+            return None, nodeName
+
+        # Consecutive OIDs (e.g. table column) often share the entry
+        pos = self._lastPos
+
+        if pos is not None:
+            arcs = self._getArcs(pos)
+
+            if (key[:len(arcs)] == arcs and
+                    (pos + 1 == self._count or key < self._getArcs(pos + 1))):
+                return self.getEntry(pos), nodeName[len(arcs) // _ARC.size:]
+
+        while key:
+            # Rightmost entry not greater than key
+            lo = self._bisect(key)
+
+            if not lo:
+                break
+
+            arcs = self._getArcs(lo - 1)
+
+            if key[:len(arcs)] == arcs:
+                self._lastPos = lo - 1
+                return (self.getEntry(lo - 1),
+                        nodeName[len(arcs) // _ARC.size:])
+
+            # Any indexed prefix of OID is a prefix of this common part
+            common = 0
+
+            while key[common:common + _ARC.size] == arcs[common:common + _ARC.size]:
+                common += _ARC.size
+
+            key = key[:common]
+
+        return None, nodeName
+
+    def walk(self, oid=()):
+        """Iterate over index entries following numeric OID in OID order.
+
+        Entries are neither kept around nor have their parents resolved,
+        so that walking the whole index runs in flat memory.
+        """
+        self.refresh()
+
+        oid = tuple(oid)
+
+        pos = self._bisect(struct.pack('>%dI' % len(oid), *oid))
+
+        while pos < self._count:
+            entry, parentPos = self._readEntry(pos)
+
+            yield entry
+
+            pos += 1
+
+    def getNode(self, entry):
+        """Return MIB tree node of index entry"""
+        if entry.node is None:
+            entry.node, = self.mibBuilder.importSymbols(
+                entry.modName, entry.symName)
+
+        return entry.node
+
+    # MIB view controller API
+
+    def getNodeName(self, nodeName, modName=''):
+        if not modName and nodeName:
+            if not [x for x in nodeName if not isinstance(x, _intTypes)]:
+                entry, suffix = self.lookup(nodeName)
+
+                if entry is not None:
+                    return (nodeName[:len(entry.name)], entry.label,
+                            suffix)
+
+        return self.mibViewController.getNodeName(nodeName, modName)
+
+    def getNodeLocation(self, nodeName, modName=''):
+        if not modName and nodeName:
+            if not [x for x in nodeName if not isinstance(x, _intTypes)]:
+                entry, suffix = self.lookup(nodeName)
+
+                if entry is not None:
+                    return entry.modName, entry.symName, suffix
+
+        return self.mibViewController.getNodeLocation(nodeName, modName)
@@ -0,0 +1,204 @@
+#
+# This file is part of snmpclitools software.
+#
+# Copyright (c) 2005-2019, Ilya Etingof <etingof@gmail.com>
+# License: http://snmplabs.com/snmpclitools/license.html
+#
+# Buffered tool output.
+#
+# Tools write a line per variable-binding from within SNMP engine
+# callbacks. Output written to a pipe or a slow terminal may block the
+# transport dispatcher for long enough for requests to time out. Output
+# lines are collected in memory and written out in batches by a
+# background thread, at the latest once the batch grows large or old
+# enough. Should the stream fall far behind, writers are held back until
+# buffered output is taken for writing so that memory use stays bounded.
+#
+import sys
+import threading
+from contextlib import contextmanager
+from timeit import default_timer as now
+
+# Write out buffered output once it grows that large (bytes)...
+FLUSH_SIZE = 65536
+
+# ...or that old (seconds)
+FLUSH_INTERVAL = 0.1
+
+# Block writers while that much output is buffered (bytes)
+MAX_BUFFERED_SIZE = FLUSH_SIZE * 4
+
+
+class OutputWriter(object):
+    """File-like object writing into stream in background thread.
+
+    Writing does not block on the stream unless buffered output grows
+    too large for the stream to keep up. Failures to write into the
+    stream are raised by the next call to writer.
+
+    Parameters
+    ----------
+    stream:
+        File-like object to write output into
+    flushSize: :py:class:`int`
+        Write out buffered output once it grows that large (bytes)
+    flushInterval: :py:class:`float`
+        Write out buffered output once it is that old (seconds)
+    maxBufferedSize: :py:class:`int`
+        Block writers while that much output is buffered (bytes)
+    """
+    def __init__(self, stream, flushSize=FLUSH_SIZE,
+                 flushInterval=FLUSH_INTERVAL,
+                 maxBufferedSize=MAX_BUFFERED_SIZE):
+        self._stream = stream
+        self._flushSize = flushSize
+        self._flushInterval = flushInterval
+        self._maxBufferedSize = max(maxBufferedSize, flushSize)
+        self._chunks = []
+        self._size = 0
+        self._bufferedAt = None
+        self._flushing = False
+        self._writing = False
+        self._closed = False
+        self._error = None
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def write(self, data):
+        with self._cond:
+            # wait for background thread to take buffered output
+            while self._size >= self._maxBufferedSize and not self._error:
+                self._cond.wait()
+
+            self._raiseError()
+
+            if not self._chunks:
+                self._bufferedAt = now()
+                self._cond.notify()
+
+            self._chunks.append(data)
+            self._size += len(data)
+
+            if self._size >= self._flushSize:
+                self._flushing = True
+                self._cond.notify()
+
+    def flush(self, wait=False):
+        """Have buffered output written out.
+
+        Parameters
+        ----------
+        wait: :py:class:`bool`
+            Block until all buffered output is written into the stream
+        """
+        with self._cond:
+            if self._chunks:
+                self._flushing = True
+                self._cond.notify()
+
+            while wait and (self._chunks or self._writing):
+                self._cond.wait()
+
+            self._raiseError()
+
+    def close(self):
+        """Write out buffered output and stop background thread"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+
+        self._thread.join()
+
+        with self._cond:
+            self._raiseError()
+
+    def _raiseError(self):
+        exc, self._error = self._error, None
+
+        if exc is not None:
+            raise exc
+
+    def _run(self):
+        with self._cond:
+            while True:
+                if not self._chunks:
+                    if self._closed:
+                        break
+
+                    self._cond.wait()
+                    continue
+
+                timeout = self._bufferedAt + self._flushInterval - now()
+
+                if not (self._flushing or self._closed) and timeout > 0:
+                    self._cond.wait(timeout)
+                    continue
+
+                data = ''.join(self._chunks)
+
+                self._chunks = []
+                self._size = 0
+                self._flushing = False
+                self._writing = True
+
+                self._cond.release()
+
+                try:
+                    self._stream.write(data)
+                    self._stream.flush()
+
+                except Exception:
+                    error = sys.exc_info()[1]
+
+                else:
+                    error = None
+
+                finally:
+                    self._cond.acquire()
+
+                if error is not None:
+                    self._error = error
+
+                self._writing = False
+
+                self._cond.notify_all()
+
+
+class _SyncWriter(object):
+    # Write into stream right away once buffered output is written out
+    def __init__(self, stream, outputWriter):
+        self._stream = stream
+        self._outputWriter = outputWriter
+
+    def write(self, data):
+        self._outputWriter.flush(wait=True)
+        self._stream.write(data)
+
+    def flush(self):
+        self._outputWriter.flush(wait=True)
+        self._stream.flush()
+
+
+@contextmanager
+def buffered():
+    """Buffer standard output, write it out in background thread.
+
+    Standard error stream is written into right away, with buffered
+    standard output written out first to keep the order of lines.
+    """
+    savedStdout, savedStderr = sys.stdout, sys.stderr
+
+    outputWriter = OutputWriter(savedStdout)
+
+    sys.stdout = outputWriter
+    sys.stderr = _SyncWriter(savedStderr, outputWriter)
+
+    try:
+        yield outputWriter
+
+    finally:
+        sys.stdout, sys.stderr = savedStdout, savedStderr
+
+        outputWriter.close()
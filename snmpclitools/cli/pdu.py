@@ -4,6 +4,7 @@
 # Copyright (c) 2005-2019, Ilya Etingof <etingof@gmail.com>
 # License: http://snmplabs.com/snmpclitools/license.html
 #
+import re
 import sys
 
 from pyasn1.error import PyAsn1Error
@@ -12,6 +13,10 @@ from pysnmp import error
 from pysnmp.proto import rfc1902
 
 from snmpclitools.cli import base
+from snmpclitools.cli import mibview
+
+# MIB object name as regular expression followed by numeric instance ID
+_REGEXP_NAME = re.compile(r'^(.*?)((?:\.\d+)*)$')
 
 
 # Read class
@@ -58,7 +63,6 @@ class ReadPduParserMixIn(object):
         ObjectName ::= string
         ObjectIndices ::= ObjectIndex string ObjectIndices
         ObjectIndices ::= ObjectIndex ObjectIndices
-        ObjectIndices ::= ObjectIndex
         ObjectIndices ::=
         ObjectIndex ::= quote string quote
         """
@@ -75,7 +79,18 @@ class _ReadPduGenerator(base.GeneratorTemplate):
         snmpEngine, ctx = cbCtx
         objectName = []
 
-        for subOid in node[0].attr.split('.'):
+        text = node[0].attr
+
+        mibViewProxy = ctx.get('mibViewProxy')
+
+        if mibViewProxy is not None and mibViewProxy.parseAsRegExp:
+            # Regular expression may contain dots, instance sub-OIDs follow it
+            regExp, text = _REGEXP_NAME.match(text).groups()
+
+            if regExp:
+                objectName.append(regExp)
+
+        for subOid in text.split('.'):
             if not subOid:
                 continue
 
@@ -99,6 +114,9 @@ class _ReadPduGenerator(base.GeneratorTemplate):
         snmpEngine, ctx = cbCtx
         mibViewCtl = ctx['mibViewController']
 
+        # Numeric OIDs are resolved through precompiled index
+        oidResolver = ctx.get('oidIndex') or mibViewCtl
+
         if 'modName' in ctx:
             mibViewCtl.mibBuilder.loadModules(ctx['modName'])
 
@@ -110,24 +128,29 @@ class _ReadPduGenerator(base.GeneratorTemplate):
 
         modName = ctx.get('modName', '')
 
-        if objectName:
-            oid, label, suffix = mibViewCtl.getNodeName(objectName, modName)
-
-        else:
-            oid, label, suffix = mibViewCtl.getFirstNodeName(modName)
-
         if sys.version_info[0] < 3:
             intTypes = (int, long)
 
         else:
             intTypes = (int,)
 
+        if objectName and not isinstance(objectName[0], intTypes):
+            objectName, modName = mibview.resolveMibSymbol(
+                snmpEngine, ctx, objectName, modName
+            )
+
+        if objectName:
+            oid, label, suffix = oidResolver.getNodeName(objectName, modName)
+
+        else:
+            oid, label, suffix = mibViewCtl.getFirstNodeName(modName)
+
         if [x for x in suffix if not isinstance(x, intTypes)]:
             raise error.PySnmpError(
                 'Cant resolve object at: %s' % (suffix,)
             )
 
-        modName, nodeDesc, _suffix = mibViewCtl.getNodeLocation(oid)
+        modName, nodeDesc, _suffix = oidResolver.getNodeLocation(oid)
 
         mibNode, = mibViewCtl.mibBuilder.importSymbols(modName, nodeDesc)
 
@@ -139,7 +162,7 @@ class _ReadPduGenerator(base.GeneratorTemplate):
         if isinstance(mibNode, self._MibTableColumn):
             # Table column
             if 'objectIndices' in ctx:
-                modName, nodeDesc, _suffix = mibViewCtl.getNodeLocation(
+                modName, nodeDesc, _suffix = oidResolver.getNodeLocation(
                     mibNode.name[:-1]
                 )
 
@@ -179,7 +202,7 @@ class _ReadPduGenerator(base.GeneratorTemplate):
     def n_VarBinds_exit(self, cbCtx, node):
         snmpEngine, ctx = cbCtx
         if 'varBinds' not in ctx or not ctx['varBinds']:
-            ctx['varBinds'] = [((1, 3, 6), None)]
+            ctx['varBinds'] = ctx.get('defaultVarBinds', [((1, 3, 6), None)])
 
 
 def readPduGenerator(cbCtx, ast):
@@ -5,31 +5,34 @@
 # License: http://snmplabs.com/snmpclitools/license.html
 #
 from pysnmp import error
-from pysnmp.entity import config
 from pysnmp.proto import rfc1902
 
 from snmpclitools.cli import base
+from snmpclitools.error import UsmUserBusyError
+
+# Names of pysnmp.entity.config constants, that module pulls in all
+# the crypto, so it is only imported once SNMP engine is configured
 
 AUTH_PROTOCOLS = {
-    'MD5': config.usmHMACMD5AuthProtocol,
-    'SHA': config.usmHMACSHAAuthProtocol,
-    'SHA224': config.usmHMAC128SHA224AuthProtocol,
-    'SHA256': config.usmHMAC192SHA256AuthProtocol,
-    'SHA384': config.usmHMAC256SHA384AuthProtocol,
-    'SHA512': config.usmHMAC384SHA512AuthProtocol,
-    'NONE': config.usmNoAuthProtocol
+    'MD5': 'usmHMACMD5AuthProtocol',
+    'SHA': 'usmHMACSHAAuthProtocol',
+    'SHA224': 'usmHMAC128SHA224AuthProtocol',
+    'SHA256': 'usmHMAC192SHA256AuthProtocol',
+    'SHA384': 'usmHMAC256SHA384AuthProtocol',
+    'SHA512': 'usmHMAC384SHA512AuthProtocol',
+    'NONE': 'usmNoAuthProtocol'
 }
 
 PRIV_PROTOCOLS = {
-  'DES': config.usmDESPrivProtocol,
-  '3DES': config.usm3DESEDEPrivProtocol,
-  'AES': config.usmAesCfb128Protocol,
-  'AES128': config.usmAesCfb128Protocol,
-  'AES192': config.usmAesCfb192Protocol,
-  'AES192BLMT': config.usmAesBlumenthalCfb192Protocol,
-  'AES256': config.usmAesCfb256Protocol,
-  'AES256BLMT': config.usmAesBlumenthalCfb256Protocol,
-  'NONE': config.usmNoPrivProtocol
+  'DES': 'usmDESPrivProtocol',
+  '3DES': 'usm3DESEDEPrivProtocol',
+  'AES': 'usmAesCfb128Protocol',
+  'AES128': 'usmAesCfb128Protocol',
+  'AES192': 'usmAesCfb192Protocol',
+  'AES192BLMT': 'usmAesBlumenthalCfb192Protocol',
+  'AES256': 'usmAesCfb256Protocol',
+  'AES256BLMT': 'usmAesBlumenthalCfb256Protocol',
+  'NONE': 'usmNoPrivProtocol'
 }
 
 
@@ -213,12 +216,13 @@ class _SMGenerator(base.GeneratorTemplate):
         else:
             p = node[1].attr.upper()
 
-        try:
-            ctx['authProtocol'] = AUTH_PROTOCOLS[p]
-
-        except KeyError:
+        if p not in AUTH_PROTOCOLS:
             raise error.PySnmpError('Unknown authentication protocol "%s"' % p)
 
+        from pysnmp.entity import config
+
+        ctx['authProtocol'] = getattr(config, AUTH_PROTOCOLS[p])
+
     def n_AuthKey(self, cbCtx, node):
         snmpEngine, ctx = cbCtx
 
@@ -272,12 +276,13 @@ class _SMGenerator(base.GeneratorTemplate):
         else:
             p = node[1].attr.upper()
 
-        try:
-            ctx['privProtocol'] = PRIV_PROTOCOLS[p]
-
-        except KeyError:
+        if p not in PRIV_PROTOCOLS:
             raise error.PySnmpError('Unknown privacy protocol "%s"' % p)
 
+        from pysnmp.entity import config
+
+        ctx['privProtocol'] = getattr(config, PRIV_PROTOCOLS[p])
+
     def n_PrivKey(self, cbCtx, node):
         snmpEngine, ctx = cbCtx
 
@@ -384,10 +389,15 @@ class _SMGenerator(base.GeneratorTemplate):
 
 
 def generator(cbCtx, ast):
+    from pysnmp.entity import config
+
     snmpEngine, ctx = cbCtx
 
     _SMGenerator().preorder(cbCtx, ast)
 
+    # Keeps apart configuration entries of commands sharing SNMP engine
+    nameSuffix = ctx.get('nameSuffix', '')
+
     # Commit collected data
     if ctx['versionId'] == 3:
 
@@ -472,18 +482,51 @@ def generator(cbCtx, ast):
             ctx['privProtocol'] = config.usmNoPrivProtocol
             ctx['privKey'] = None
 
-        config.addV3User(
-            snmpEngine,
-            ctx['securityName'],
-            ctx['authProtocol'],
-            ctx['authKey'],
-            ctx['privProtocol'],
-            ctx['privKey'],
-            securityEngineId=securityEngineId,
-            securityName=ctx['securityName'],
-            authKeyType=authKeyType,
-            privKeyType=privKeyType
-        )
+        usmUser = (ctx['authProtocol'], ctx['authKey'],
+                   ctx['privProtocol'], ctx['privKey'],
+                   securityEngineId, authKeyType, privKeyType)
+
+        # SNMP engine holds one set of keys per USM user name, commands
+        # in flight (batch mode) can not share the name with other keys
+        usmUsersInFlight = ctx.get('usmUsersInFlight', {})
+
+        if usmUsersInFlight.get(ctx['securityName'], usmUser) != usmUser:
+            raise UsmUserBusyError(
+                'USM user %s is in use with other keys' % ctx['securityName'])
+
+        usmUsersInFlight[ctx['securityName']] = usmUser
+
+        usmUsers = snmpEngine.getUserContext('usmUsers')
+
+        if usmUsers is None:
+            usmUsers = {}
+            snmpEngine.setUserContext(usmUsers=usmUsers)
+
+        # Keys localization is expensive, do not redo it when
+        # SNMP engine is reused with the same USM user
+        if usmUsers.get(ctx['securityName']) != usmUser:
+            if ctx['securityName'] in usmUsers:
+                # Drop user entries cloned for discovered SNMP engines
+                config.delV3User(
+                    snmpEngine,
+                    ctx['securityName'],
+                    securityEngineId=usmUsers.pop(ctx['securityName'])[4]
+                )
+
+            config.addV3User(
+                snmpEngine,
+                ctx['securityName'],
+                ctx['authProtocol'],
+                ctx['authKey'],
+                ctx['privProtocol'],
+                ctx['privKey'],
+                securityEngineId=securityEngineId,
+                securityName=ctx['securityName'],
+                authKeyType=authKeyType,
+                privKeyType=privKeyType
+            )
+
+            usmUsers[ctx['securityName']] = usmUser
 
         # edit SNMP engine boots/uptime
 
@@ -507,16 +550,33 @@ def generator(cbCtx, ast):
         if 'communityName' not in ctx:
             raise error.PySnmpError('Community name not specified')
 
-        ctx['securityName'] = 'my-agent'
-        ctx['securityLevel'] = 'noAuthNoPriv'
+        # Responses are matched to requests by the security name looked
+        # up by community, so each community gets a security name of its own
+        communities = snmpEngine.getUserContext('communities')
+
+        if communities is None:
+            communities = {}
+            snmpEngine.setUserContext(communities=communities)
+
+        if ctx['communityName'] not in communities:
+            if communities:
+                securityName = 'my-agent-%d' % len(communities)
+
+            else:
+                securityName = 'my-agent'
 
-        config.addV1System(
-            snmpEngine,
-            ctx['securityName'],
-            ctx['communityName']
-        )
+            config.addV1System(
+                snmpEngine,
+                securityName,
+                ctx['communityName']
+            )
+
+            communities[ctx['communityName']] = securityName
+
+        ctx['securityName'] = communities[ctx['communityName']]
+        ctx['securityLevel'] = 'noAuthNoPriv'
 
-    ctx['paramsName'] = ctx['securityName']
+    ctx['paramsName'] = ctx['securityName'] + nameSuffix
 
     config.addTargetParams(
         snmpEngine, ctx['paramsName'], ctx['securityName'],
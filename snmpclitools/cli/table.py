@@ -0,0 +1,192 @@
+#
+# This file is part of snmpclitools software.
+#
+# Copyright (c) 2005-2019, Ilya Etingof <etingof@gmail.com>
+# License: http://snmplabs.com/snmpclitools/license.html
+#
+# MIB table rows assembled out of table columns walked side by side.
+#
+# Each column yields its instances in increasing order of row index.
+# Once every column still being walked has gone past a row index, the
+# row at that index can not gain any more values, so it is handed over
+# right away. Just the rows in flight are ever kept in memory, however
+# large the table is.
+#
+import heapq
+
+from pysnmp import error
+
+# MIB table columns SNMP agent serves
+WALKABLE_ACCESS = ('readonly', 'readwrite', 'readcreate')
+
+# Incomplete rows to keep before holding leading columns back
+MAX_ROWS = 1000
+
+
+def getTableColumns(mibViewController, oid):
+    """Return OIDs of walkable columns of MIB table.
+
+    Parameters
+    ----------
+    mibViewController: :py:class:`~pysnmp.smi.view.MibViewController`
+        MIB view MIB table is defined in
+    oid: :py:class:`tuple`
+        OID of MIB table, table row or table column
+
+    Returns
+    -------
+    :py:class:`list`
+        OIDs of table columns in MIB order, just the given one for table
+        column
+    """
+    mibBuilder = mibViewController.mibBuilder
+
+    MibTable, MibTableRow, MibTableColumn = mibBuilder.importSymbols(
+        'SNMPv2-SMI', 'MibTable', 'MibTableRow', 'MibTableColumn')
+
+    oid = tuple(oid)
+
+    modName, symName, suffix = mibViewController.getNodeLocation(oid)
+
+    mibNode, = mibBuilder.importSymbols(modName, symName)
+
+    if suffix or not isinstance(
+            mibNode, (MibTable, MibTableRow, MibTableColumn)):
+        raise error.PySnmpError(
+            'Not a MIB table or table column: %s' % '.'.join(
+                [str(x) for x in oid]))
+
+    if isinstance(mibNode, MibTableColumn):
+        return [oid]
+
+    tableName = '%s::%s' % (modName, symName)
+
+    if isinstance(mibNode, MibTable):
+        oid += (1,)
+
+    columns = []
+
+    nextOid = oid
+
+    while True:
+        try:
+            nextOid, label, suffix = mibViewController.getNextNodeName(nextOid)
+
+        except error.PySnmpError:
+            break
+
+        if nextOid[:len(oid)] != oid:
+            break
+
+        if len(nextOid) != len(oid) + 1:
+            continue
+
+        modName, symName, suffix = mibViewController.getNodeLocation(nextOid)
+
+        mibNode, = mibBuilder.importSymbols(modName, symName)
+
+        if (isinstance(mibNode, MibTableColumn) and
+                mibNode.getMaxAccess() in WALKABLE_ACCESS):
+            columns.append(nextOid)
+
+    if not columns:
+        raise error.PySnmpError(
+            'No walkable columns in MIB table %s' % tableName)
+
+    return columns
+
+
+class RowAssembler(object):
+    """Assemble MIB table rows out of instances of table columns.
+
+    Parameters
+    ----------
+    columns: :py:class:`int`
+        Number of table columns walked
+    """
+    def __init__(self, columns):
+        self._rows = {}
+        self._indices = []
+        self._walked = [()] * columns
+        self.peakRows = 0
+
+    def add(self, column, index, value):
+        """Add column instance at row index.
+
+        Instances of each column are expected to come in increasing order
+        of row index.
+        """
+        try:
+            row = self._rows[index]
+
+        except KeyError:
+            row = self._rows[index] = [None] * len(self._walked)
+
+            heapq.heappush(self._indices, index)
+
+            if len(self._rows) > self.peakRows:
+                self.peakRows = len(self._rows)
+
+        row[column] = value
+
+        self._walked[column] = index
+
+    def finish(self, column):
+        """Mark column as walked through"""
+        self._walked[column] = None
+
+    def isFinished(self, column=None):
+        """Return `True` once column or all columns are walked through"""
+        if column is None:
+            return not [x for x in self._walked if x is not None]
+
+        return self._walked[column] is None
+
+    def getColumnsToWalk(self, maxRows=MAX_ROWS):
+        """Return columns to walk further.
+
+        Columns lacking instances at some rows get ahead of the rest,
+        leaving rows incomplete until the lagging columns catch up. Once
+        incomplete rows pile up, just the lagging columns are walked.
+
+        Parameters
+        ----------
+        maxRows: :py:class:`int`
+            Incomplete rows to keep before holding leading columns back
+
+        Returns
+        -------
+        :py:class:`list`
+            Column numbers, empty once all columns are walked through
+        """
+        walked = [(x, column) for column, x in enumerate(self._walked)
+                  if x is not None]
+
+        if walked and len(self._rows) > maxRows:
+            limit = min(walked)[0]
+
+            walked = [x for x in walked if x[0] == limit]
+
+        return [x[1] for x in walked]
+
+    def pop(self):
+        """Return complete rows.
+
+        Returns
+        -------
+        :py:class:`list`
+            Pairs of row index and row values (`None` for columns having
+            no instance at that index), in increasing order of row index
+        """
+        walked = [x for x in self._walked if x is not None]
+
+        limit = walked and min(walked)
+
+        rows = []
+
+        while self._indices and (not walked or self._indices[0] <= limit):
+            index = heapq.heappop(self._indices)
+
+            rows.append((index, self._rows.pop(index)))
+
+        return rows
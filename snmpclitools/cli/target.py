@@ -5,13 +5,12 @@
 # License: http://snmplabs.com/snmpclitools/license.html
 #
 import socket
+import sys
 
 from pysnmp import error
-from pysnmp.carrier.asynsock.dgram import udp
-from pysnmp.carrier.asynsock.dgram import udp6
-from pysnmp.entity import config
 
 from snmpclitools.cli import base
+from snmpclitools.cli import timing
 from snmpclitools.error import SnmpApplicationError
 
 
@@ -90,12 +89,13 @@ else:
 
 class _TargetGeneratorPassOne(base.GeneratorTemplate):
     DEFAULT_PORT = '161'
+    # Transport modules are only imported once transport is chosen
     SNMP_DOMAIN_MAP = {
-        'udp': (udp.snmpUDPDomain,
-                udp.UdpSocketTransport,
+        'udp': ('snmpUDPDomain',
+                'UdpSocketTransport',
                 lambda h, p: (socket.gethostbyname(h), int(p))),
-        'udp6': (udp6.snmpUDP6Domain,
-                 udp6.Udp6SocketTransport,
+        'udp6': ('snmpUDP6Domain',
+                 'Udp6SocketTransport',
                  lambda h, p: (_getaddrinfo(h, p, socket.AF_INET6, socket.SOCK_DGRAM)[0][4]))
     }
     SNMP_DOMAIN_NAME_MAP = {
@@ -103,13 +103,24 @@ class _TargetGeneratorPassOne(base.GeneratorTemplate):
         10: 'udp6'
     }
 
+    def setTransport(self, ctx, name):
+        domainName, transportName, addrRewriteFun = self.SNMP_DOMAIN_MAP[name]
+
+        moduleName = 'pysnmp.carrier.asynsock.dgram.' + name
+
+        __import__(moduleName)
+
+        module = sys.modules[moduleName]
+
+        ctx['transportDomain'] = getattr(module, domainName)
+        ctx['transportModule'] = getattr(module, transportName)
+        ctx['addrRewriteFun'] = addrRewriteFun
+
     def n_Transport(self, cbCtx, node):
         snmpEngine, ctx = cbCtx
 
         if node[0].attr in self.SNMP_DOMAIN_MAP:
-            (ctx['transportDomain'],
-             ctx['transportModule'],
-             ctx['addrRewriteFun']) = self.SNMP_DOMAIN_MAP[node[0].attr]
+            self.setTransport(ctx, node[0].attr)
 
         else:
             raise error.PySnmpError(
@@ -125,9 +136,7 @@ class _TargetGeneratorPassOne(base.GeneratorTemplate):
 
         if not len(node):
             if 'transportDomain' not in ctx:
-                (ctx['transportDomain'],
-                 ctx['transportModule'],
-                 ctx['addrRewriteFun']) = self.SNMP_DOMAIN_MAP['udp6']
+                self.setTransport(ctx, 'udp6')
             return
 
         if ctx.get('transportAddress') is None:
@@ -152,11 +161,8 @@ class _TargetGeneratorPassOne(base.GeneratorTemplate):
             except Exception:
                 f = -1
 
-            (ctx['transportDomain'],
-             ctx['transportModule'],
-             ctx['addrRewriteFun']) = self.SNMP_DOMAIN_MAP[
-                self.SNMP_DOMAIN_NAME_MAP.get(f, 'udp')
-            ]
+            self.setTransport(ctx, self.SNMP_DOMAIN_NAME_MAP.get(f, 'udp'))
+
         if 'transportFormat' in ctx:
             ctx['transportAddress'] = (
                 ctx['transportAddress'], ctx['transportFormat']
@@ -199,6 +205,8 @@ class _TargetGeneratorPassTwo(base.GeneratorTemplate):
             raise error.PySnmpError('Bad timeout value')
 
     def n_Agent_exit(self, cbCtx, node):
+        from pysnmp.entity import config
+
         snmpEngine, ctx = cbCtx
         ctx['addrName'] = ctx['paramsName']
 
@@ -214,11 +222,14 @@ class _TargetGeneratorPassTwo(base.GeneratorTemplate):
             tagList=ctx.get('transportTag', '')
         )
 
-        config.addSocketTransport(
-            snmpEngine,
-            ctx['transportDomain'],
-            ctx['transportModule']().openClientMode()
-        )
+        # Transport may already be open on reused SNMP engine
+        if config.getTransport(snmpEngine, ctx['transportDomain']) is None:
+            with timing.measure(ctx, 'open transport'):
+                config.addSocketTransport(
+                    snmpEngine,
+                    ctx['transportDomain'],
+                    ctx['transportModule']().openClientMode()
+                )
 
 
 _TargetGeneratorTrapPassTwo = _TargetGeneratorPassTwo
@@ -226,13 +237,13 @@ _TargetGeneratorTrapPassTwo = _TargetGeneratorPassTwo
 
 def generator(cbCtx, ast):
     snmpEngine, ctx = cbCtx
-    _TargetGeneratorPassTwo().preorder(
-        _TargetGeneratorPassOne().preorder((snmpEngine, ctx), ast), ast
-    )
+    base.CompositeGenerator(
+        _TargetGeneratorPassOne(), _TargetGeneratorPassTwo()
+    ).preorder((snmpEngine, ctx), ast)
 
 
 def generatorTrap(cbCtx, ast):
     snmpEngine, ctx = cbCtx
-    _TargetGeneratorTrapPassTwo().preorder(
-        _TargetGeneratorTrapPassOne().preorder((snmpEngine, ctx), ast), ast
-    )
+    base.CompositeGenerator(
+        _TargetGeneratorTrapPassOne(), _TargetGeneratorTrapPassTwo()
+    ).preorder((snmpEngine, ctx), ast)
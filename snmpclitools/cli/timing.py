@@ -0,0 +1,67 @@
+#
+# This file is part of snmpclitools software.
+#
+# Copyright (c) 2005-2019, Ilya Etingof <etingof@gmail.com>
+# License: http://snmplabs.com/snmpclitools/license.html
+#
+# Tool run phases timing
+#
+from contextlib import contextmanager
+from timeit import default_timer as now
+
+
+class Timer(object):
+    """Collect durations of tool run phases.
+
+    Phases may nest, each phase is recorded along with its nesting
+    depth in the order phases are entered.
+    """
+    def __init__(self):
+        self.phases = []
+        self._depth = 0
+
+    @contextmanager
+    def measure(self, name):
+        phase = [name, self._depth, None]
+
+        self.phases.append(phase)
+
+        self._depth += 1
+
+        startedAt = now()
+
+        try:
+            yield
+
+        finally:
+            phase[2] = now() - startedAt
+            self._depth -= 1
+
+    def add(self, name, duration):
+        self.phases.append([name, self._depth, duration])
+
+    def asList(self):
+        return [{'phase': name, 'depth': depth, 'seconds': duration}
+                for name, depth, duration in self.phases]
+
+    def report(self):
+        text = 'Timing:\n'
+
+        for name, depth, duration in self.phases:
+            text += '   %-32s %.6f sec\n' % (
+                '  ' * depth + name, duration or 0)
+
+        return text
+
+
+@contextmanager
+def measure(ctx, name):
+    """Time tool run phase if tool context carries a timer"""
+    timer = ctx.get('timer')
+
+    if timer is None:
+        yield
+
+    else:
+        with timer.measure(name):
+            yield
@@ -9,3 +9,7 @@ from pysnmp import error
 
 class SnmpApplicationError(error.PySnmpError):
     pass
+
+
+class UsmUserBusyError(SnmpApplicationError):
+    """USM user is in use with other keys by a command in flight"""
@@ -0,0 +1,112 @@
+#
+# This file is part of snmpclitools software.
+#
+# Copyright (c) 2005-2019, Ilya Etingof <etingof@gmail.com>
+# License: http://snmplabs.com/snmpclitools/license.html
+#
+# Command-line MIB compiler
+#
+import multiprocessing
+import os
+import sys
+
+from snmpclitools.cli import app
+from snmpclitools.cli import base
+from snmpclitools.cli import main
+from snmpclitools.cli import mibview
+
+
+def getUsage():
+    return """\
+Usage: %s [OPTIONS] <MIB> [MIB...]
+%s%s\
+Compiles given MIBs along with MIBs they import into
+   %s
+in as many parallel processes as there are CPUs (unless -P XJ is given)
+""" % (os.path.basename(sys.argv[0]),
+       main.getUsage(),
+       mibview.getUsage(),
+       mibview.DEFAULT_MIB_DESTINATION)
+
+
+# Construct c/l interpreter for this app
+
+class Scanner(mibview.MibViewScannerMixIn,
+              main.MainScannerMixIn,
+              base.ScannerTemplate):
+    pass
+
+
+class Parser(mibview.MibViewParserMixIn,
+             main.MainParserMixIn,
+             base.ParserTemplate):
+    def p_compileSpec(self, args):
+        """
+        Cmdline ::= Options whitespace Params
+        Cmdline ::= Options Params
+
+        Params ::= MibNames
+        MibNames ::= MibName whitespace MibNames
+        MibNames ::= MibName
+        MibName ::= string
+
+        """
+
+
+class _Generator(base.GeneratorTemplate):
+    def n_MibName(self, cbCtx, node):
+        snmpEngine, ctx = cbCtx
+
+        if 'MibNames' not in ctx:
+            ctx['MibNames'] = []
+
+        ctx['MibNames'].append(node[0].attr)
+
+
+def generator(cbCtx, ast):
+    snmpEngine, ctx = cbCtx
+    return _Generator().preorder((snmpEngine, ctx), ast)
+
+
+def newEngine():
+    # No SNMP traffic, MIBs only
+    return mibview.MibEngine()
+
+
+def start(snmpEngine, ctx, ast):
+    app.generate(
+        (snmpEngine, ctx), ast,
+        mibview.generator,
+        generator
+    )
+
+    if 'MibJobs' not in ctx:
+        ctx['MibJobs'] = multiprocessing.cpu_count()
+
+    ctx['MibStatuses'] = mibview.compileMibs(
+        snmpEngine, ctx, ctx['MibNames'])
+
+
+def finish(snmpEngine, ctx):
+    statuses = ctx.get('MibStatuses', {})
+
+    failures = 0
+
+    for mibName in sorted(statuses):
+        status, reason = statuses[mibName]
+
+        if reason:
+            sys.stdout.write('%s: %s (%s)\n' % (mibName, status, reason))
+
+        else:
+            sys.stdout.write('%s: %s\n' % (mibName, status))
+
+        if status in ('failed', 'missing', 'unprocessed'):
+            failures += 1
+
+    if failures:
+        sys.exit(1)
+
+
+def run(ctx=None):
+    app.main(sys.modules[__name__], ctx)
@@ -0,0 +1,108 @@
+#
+# This file is part of snmpclitools software.
+#
+# Copyright (c) 2005-2019, Ilya Etingof <etingof@gmail.com>
+# License: http://snmplabs.com/snmpclitools/license.html
+#
+# Command-line MIB bundle packer
+#
+import os
+import sys
+
+from snmpclitools.cli import app
+from snmpclitools.cli import base
+from snmpclitools.cli import main
+from snmpclitools.cli import mibbundle
+from snmpclitools.cli import mibview
+
+
+def getUsage():
+    return """\
+Usage: %s [OPTIONS] <BUNDLE> [MIB...]
+%s%s\
+Packs given compiled MIBs along with MIBs they import (or all compiled
+MIBs found in MIB search path if no MIB is given) into a single BUNDLE
+file to be listed in PYSNMPMIBDIRS environment variable
+""" % (os.path.basename(sys.argv[0]),
+       main.getUsage(),
+       mibview.getUsage())
+
+
+# Construct c/l interpreter for this app
+
+class Scanner(mibview.MibViewScannerMixIn,
+              main.MainScannerMixIn,
+              base.ScannerTemplate):
+    pass
+
+
+class Parser(mibview.MibViewParserMixIn,
+             main.MainParserMixIn,
+             base.ParserTemplate):
+    def p_packSpec(self, args):
+        """
+        Cmdline ::= Options whitespace Params
+        Cmdline ::= Options Params
+
+        Params ::= BundleFile whitespace MibNames
+        Params ::= BundleFile
+        BundleFile ::= string
+        MibNames ::= MibName whitespace MibNames
+        MibNames ::= MibName
+        MibName ::= string
+
+        """
+
+
+class _Generator(base.GeneratorTemplate):
+    def n_BundleFile(self, cbCtx, node):
+        snmpEngine, ctx = cbCtx
+        ctx['BundleFile'] = node[0].attr
+
+    def n_MibName(self, cbCtx, node):
+        snmpEngine, ctx = cbCtx
+
+        if 'MibNames' not in ctx:
+            ctx['MibNames'] = []
+
+        ctx['MibNames'].append(node[0].attr)
+
+
+def generator(cbCtx, ast):
+    snmpEngine, ctx = cbCtx
+    return _Generator().preorder((snmpEngine, ctx), ast)
+
+
+def newEngine():
+    # No SNMP traffic, MIBs only
+    return mibview.MibEngine()
+
+
+def start(snmpEngine, ctx, ast):
+    app.generate(
+        (snmpEngine, ctx), ast,
+        mibview.generator,
+        generator
+    )
+
+    mibBuilder = snmpEngine.getMibBuilder()
+
+    modNames = ctx.get('MibNames')
+
+    if modNames:
+        # Loading MIBs brings in (and compiles) MIBs they import
+        mibBuilder.loadModules(*modNames)
+
+        modNames = list(mibBuilder.mibSymbols)
+
+    ctx['MibsPacked'] = mibbundle.packMibs(
+        ctx['BundleFile'], mibBuilder.getMibSources(), modNames)
+
+
+def finish(snmpEngine, ctx):
+    sys.stdout.write('%d MIB modules packed into %s\n' % (
+        len(ctx['MibsPacked']), ctx['BundleFile']))
+
+
+def run(ctx=None):
+    app.main(sys.modules[__name__], ctx)
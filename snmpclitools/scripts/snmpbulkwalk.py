@@ -0,0 +1,263 @@
+#
+# This file is part of snmpclitools software.
+#
+# Copyright (c) 2005-2019, Ilya Etingof <etingof@gmail.com>
+# License: http://snmplabs.com/snmpclitools/license.html
+#
+# GETBULK command generator
+#
+import os
+import sys
+import time
+
+from pysnmp import error
+from pysnmp.proto import rfc1902
+from pysnmp.proto import rfc1905
+
+from snmpclitools.cli import app
+from snmpclitools.cli import base
+from snmpclitools.cli import columnar
+from snmpclitools.cli import main
+from snmpclitools.cli import mibview
+from snmpclitools.cli import msgmod
+from snmpclitools.cli import pdu
+from snmpclitools.cli import secmod
+from snmpclitools.cli import table
+from snmpclitools.cli import target
+
+
+def getUsage():
+    return """\
+Usage: %s [OPTIONS] <AGENT> <PARAMETERS>
+%s%s%s%s
+GETBULK options:
+-C BULKOPTS:   set various application specific behaviours:
+          n<NUM>   set non-repeaters to <NUM>
+          r<NUM>   set max-repetitions to <NUM>
+          c:       do not check returned OIDs are increasing
+          t:       display wall-clock time to complete the request
+          p:       print the number of variables found
+--parquet FILE: write rows of MIB tables into Apache Parquet FILE,
+                one file column per MIB table column
+%s%s\
+""" % (os.path.basename(sys.argv[0]), main.getUsage(), msgmod.getUsage(),
+       secmod.getUsage(), mibview.getUsage(), target.getUsage(),
+       pdu.getReadUsage())
+
+
+# Construct c/l interpreter for this app
+
+class Scanner(msgmod.MPScannerMixIn,
+              secmod.SMScannerMixIn,
+              mibview.MibViewScannerMixIn,
+              target.TargetScannerMixIn,
+              pdu.ReadPduScannerMixIn,
+              main.MainScannerMixIn,
+              base.ScannerTemplate):
+    def t_appopts(self, s):
+        """ -C """
+        self.rv.append(base.ConfigToken('appopts'))
+
+    def t_parquetfile(self, s):
+        """ --parquet """
+        self.rv.append(base.ConfigToken('parquetfile'))
+
+
+class Parser(msgmod.MPParserMixIn,
+             secmod.SMParserMixIn,
+             mibview.MibViewParserMixIn,
+             target.TargetParserMixIn,
+             pdu.ReadPduParserMixIn,
+             main.MainParserMixIn,
+             base.ParserTemplate):
+
+    def p_appOptions(self, args):
+        """
+        Option ::= ApplicationOption
+
+        ApplicationOption ::= appopts whitespace string
+        ApplicationOption ::= appopts string
+
+        Option ::= ParquetFile
+        ParquetFile ::= parquetfile whitespace string
+        """
+
+
+class __Generator(base.GeneratorTemplate):
+
+    def n_ApplicationOption(self, cbCtx, node):
+        snmpEngine, ctx = cbCtx
+
+        if len(node) > 2:
+            opt = node[2].attr
+
+        else:
+            opt = node[1].attr
+
+        p = n = r = None
+
+        for c in opt:
+            if c == 'n':
+                p = n = []
+
+            elif c == 'r':
+                p = r = []
+
+            elif c == 'c':
+                ctx['ignoreNonIncreasingOids'] = 1
+                p = None
+
+            elif c == 't':
+                ctx['displayWallClock'] = time.time()
+                p = None
+
+            elif c == 'p':
+                ctx['reportFoundVars'] = 1
+                p = None
+
+            elif p is not None and '0' <= c <= '9':
+                p.append(c)
+
+            else:
+                raise error.PySnmpError('bad -C option - "%s"' % c)
+
+        if n is not None:
+            ctx['nonRepeaters'] = int(''.join(n))
+
+        if r is not None:
+            ctx['maxRepetitions'] = int(''.join(r))
+
+    def n_ParquetFile(self, cbCtx, node):
+        snmpEngine, ctx = cbCtx
+
+        ctx['parquetFile'] = node[2].attr
+
+
+def generator(cbCtx, ast):
+    snmpEngine, ctx = cbCtx
+    return __Generator().preorder((snmpEngine, ctx), ast)
+
+
+def cbFun(snmpEngine, sendRequestHandle, errorIndication,
+          errorStatus, errorIndex, varBindTable, cbCtx):
+
+    if errorIndication:
+        if (errorIndication != 'oidNotIncreasing' or
+                not cbCtx.get('ignoreNonIncreasingOids')):
+            sys.stderr.write('Error: %s\n' % errorIndication)
+            return
+
+    if errorStatus:
+        sys.stderr.write(
+            '%s at %s\n' %
+            (errorStatus.prettyPrint(),
+             errorIndex and varBindTable[0][int(errorIndex) - 1] or '?')
+        )
+        return
+
+    tableWriter = cbCtx.get('tableWriter')
+
+    for varBindRow in varBindTable:
+        colIdx = -1
+        inTableFlag = 0
+
+        for oid, val in varBindRow:
+            colIdx += 1
+
+            if cbCtx['myHeadVars'][colIdx].isPrefixOf(oid):
+                if tableWriter is None:
+                    sys.stdout.write(
+                        '%s\n' % cbCtx['mibViewProxy'].getPrettyOidVal(
+                            cbCtx['mibViewController'], oid, val
+                        )
+                    )
+
+                elif val.tagSet == rfc1905.EndOfMibView.tagSet:
+                    tableWriter.finish(colIdx)
+                    continue
+
+                else:
+                    tableWriter.add(colIdx, oid, val)
+
+                inTableFlag += 1
+
+            elif tableWriter is not None:
+                tableWriter.finish(colIdx)
+
+        if cbCtx.get('reportFoundVars'):
+            cbCtx['reportFoundVars'] += inTableFlag
+
+        if not inTableFlag:
+            return  # stop on end-of-table
+
+    if tableWriter is not None:
+        tableWriter.flush()
+
+    return True  # continue walking
+
+
+def start(snmpEngine, ctx, ast):
+    # Apply configuration to SNMP entity
+    app.generate(
+        (snmpEngine, ctx), ast,
+        msgmod.generator,
+        secmod.generator,
+        mibview.generator,
+        target.generator,
+        pdu.readPduGenerator,
+        generator
+    )
+
+    from pysnmp.entity.rfc3413 import cmdgen
+
+    if 'parquetFile' in ctx:
+        # Walk all columns of MIB tables side by side, writing out rows
+        columns = []
+
+        for oid, val in ctx['varBinds']:
+            for column in table.getTableColumns(ctx['mibViewController'], oid):
+                if column not in columns:
+                    columns.append(column)
+
+        ctx['varBinds'] = [(x, None) for x in columns]
+
+        ctx['tableWriter'] = columnar.TableWriter(
+            ctx['parquetFile'], ctx['mibViewController'],
+            ctx['mibViewProxy'], columns)
+
+    ctx['myHeadVars'] = [rfc1902.ObjectName(x[0]) for x in ctx['varBinds']]
+
+    cmdgen.BulkCommandGenerator().sendVarBinds(
+        snmpEngine,
+        ctx['addrName'],
+        ctx.get('contextEngineId'), ctx.get('contextName', ''),
+        ctx.get('nonRepeaters', 0), ctx.get('maxRepetitions', 25),
+        ctx['varBinds'],
+        app.callback(cbFun), ctx
+    )
+
+
+def finish(snmpEngine, ctx):
+    if 'tableWriter' in ctx:
+        ctx['tableWriter'].close()
+
+    # Reports would get mixed up with machine-readable output
+    if (ctx['mibViewProxy'].outputFormat == 'text' and
+            'tableWriter' not in ctx):
+        report = sys.stdout
+
+    else:
+        report = sys.stderr
+
+    if ctx.get('reportFoundVars'):
+        report.write(
+            'Variables found: %s\n' % (ctx['reportFoundVars'] - 1))
+
+    if ctx.get('displayWallClock'):
+        report.write(
+            'Total traversal time = %.4f seconds'
+            '\n' % (time.time() - ctx['displayWallClock']))
+
+
+def run(ctx=None):
+    app.main(sys.modules[__name__], ctx)
@@ -0,0 +1,65 @@
+#
+# This file is part of snmpclitools software.
+#
+# Copyright (c) 2005-2019, Ilya Etingof <etingof@gmail.com>
+# License: http://snmplabs.com/snmpclitools/license.html
+#
+# SNMP tools daemon
+#
+import getopt
+import os
+import sys
+
+from snmpclitools.cli import daemon
+
+
+def getUsage():
+    return """\
+Usage: %s [OPTIONS]
+   -h             display this help message
+   -s SOCKET      listen on Unix domain socket SOCKET (default: %s)
+
+Point SNMP tools to the daemon by setting %s environment variable
+to the socket path.
+""" % (os.path.basename(sys.argv[0]), daemon.DEFAULT_SOCKET, daemon.ENV_SOCKET)
+
+
+def run():
+    socketPath = os.environ.get(daemon.ENV_SOCKET) or daemon.DEFAULT_SOCKET
+
+    try:
+        opts, params = getopt.getopt(sys.argv[1:], 'hs:')
+
+    except getopt.GetoptError:
+        sys.stderr.write('Error: %s\n%s' % (sys.exc_info()[1], getUsage()))
+        sys.exit(1)
+
+    if params:
+        sys.stderr.write('Error: extra parameters %s\n%s' % (params, getUsage()))
+        sys.exit(1)
+
+    for opt, val in opts:
+        if opt == '-h':
+            sys.stdout.write(getUsage())
+            sys.exit(0)
+
+        elif opt == '-s':
+            socketPath = val
+
+    server = daemon.Server(socketPath)
+
+    try:
+        server.open()
+
+    except Exception:
+        sys.stderr.write('Error: %s\n' % sys.exc_info()[1])
+        sys.exit(1)
+
+    try:
+        server.serveForever()
+
+    except KeyboardInterrupt:
+        sys.stderr.write('Shutting down...\n')
+
+    finally:
+        server.close()
@@ -0,0 +1,106 @@
+#
+# This file is part of snmpclitools software.
+#
+# Copyright (c) 2005-2019, Ilya Etingof <etingof@gmail.com>
+# License: http://snmplabs.com/snmpclitools/license.html
+#
+# GET command generator
+#
+import os
+import sys
+
+from snmpclitools.cli import app
+from snmpclitools.cli import base
+from snmpclitools.cli import main
+from snmpclitools.cli import mibview
+from snmpclitools.cli import msgmod
+from snmpclitools.cli import pdu
+from snmpclitools.cli import secmod
+from snmpclitools.cli import target
+
+
+def getUsage():
+    return """\
+Usage: %s [OPTIONS] <AGENT> <PARAMETERS>
+%s%s%s%s%s%s
+""" % (os.path.basename(sys.argv[0]),
+       main.getUsage(),
+       msgmod.getUsage(),
+       secmod.getUsage(),
+       mibview.getUsage(),
+       target.getUsage(),
+       pdu.getReadUsage())
+
+
+# Construct c/l interpreter for this app
+
+class Scanner(msgmod.MPScannerMixIn,
+              secmod.SMScannerMixIn,
+              mibview.MibViewScannerMixIn,
+              target.TargetScannerMixIn,
+              pdu.ReadPduScannerMixIn,
+              main.MainScannerMixIn,
+              base.ScannerTemplate):
+    pass
+
+
+class Parser(msgmod.MPParserMixIn,
+             secmod.SMParserMixIn,
+             mibview.MibViewParserMixIn,
+             target.TargetParserMixIn,
+             pdu.ReadPduParserMixIn,
+             main.MainParserMixIn,
+             base.ParserTemplate):
+    pass
+
+
+def cbFun(snmpEngine, sendRequestHandle, errorIndication,
+          errorStatus, errorIndex, varBinds, cbCtx):
+
+    if errorIndication:
+        sys.stderr.write('%s\n' % errorIndication)
+
+    elif errorStatus:
+        sys.stderr.write(
+            '%s at %s\n' %
+            (errorStatus.prettyPrint(),
+             errorIndex and varBinds[int(errorIndex) - 1] or '?')
+        )
+
+    else:
+        for oid, val in varBinds:
+            sys.stdout.write(
+                '%s\n' % cbCtx['mibViewProxy'].getPrettyOidVal(
+                    cbCtx['mibViewController'], oid, val
+                )
+            )
+
+
+def start(snmpEngine, ctx, ast):
+    # Apply configuration to SNMP entity
+    app.generate(
+        (snmpEngine, ctx), ast,
+        msgmod.generator,
+        secmod.generator,
+        mibview.generator,
+        target.generator,
+        pdu.readPduGenerator
+    )
+
+    from pysnmp.entity.rfc3413 import cmdgen
+
+    cmdgen.GetCommandGenerator().sendVarBinds(
+        snmpEngine,
+        ctx['addrName'],
+        ctx.get('contextEngineId'), ctx.get('contextName', ''),
+        ctx['varBinds'],
+        app.callback(cbFun), ctx
+    )
+
+
+def finish(snmpEngine, ctx):
+    pass
+
+
+def run(ctx=None):
+    app.main(sys.modules[__name__], ctx)
@@ -0,0 +1,396 @@
+#
+# This file is part of snmpclitools software.
+#
+# Copyright (c) 2005-2019, Ilya Etingof <etingof@gmail.com>
+# License: http://snmplabs.com/snmpclitools/license.html
+#
+# GETBULK table walker
+#
+import csv
+import json
+import os
+import sys
+
+from pyasn1.type import univ
+from pysnmp import error
+from pysnmp.proto import rfc1902
+from pysnmp.proto import rfc1905
+
+from snmpclitools.cli import app
+from snmpclitools.cli import base
+from snmpclitools.cli import formatting
+from snmpclitools.cli import main
+from snmpclitools.cli import mibview
+from snmpclitools.cli import msgmod
+from snmpclitools.cli import pdu
+from snmpclitools.cli import secmod
+from snmpclitools.cli import table
+from snmpclitools.cli import target
+
+
+# Stands for column having no instance in table row
+MISSING = (None, None, (), None, None, '?')
+EMPTY = (None, None, (), None, None, '')
+
+
+def getUsage():
+    return """\
+Usage: %s [OPTIONS] <AGENT> <PARAMETERS>
+%s%s%s%s
+TABLE options:
+-C TABLEOPTS:  set various application specific behaviours:
+          b:       display brief column headers, common prefix stripped
+          h:       display only column headers
+          H:       do not display column headers
+          i:       display row index as the first column
+          f<STR>:  separate columns with <STR> rather than a tab
+          r<NUM>:  set max-repetitions to <NUM>
+%s%s\
+""" % (os.path.basename(sys.argv[0]), main.getUsage(), msgmod.getUsage(),
+       secmod.getUsage(), mibview.getUsage(), target.getUsage(),
+       pdu.getReadUsage())
+
+
+# Construct c/l interpreter for this app
+
+class Scanner(msgmod.MPScannerMixIn,
+              secmod.SMScannerMixIn,
+              mibview.MibViewScannerMixIn,
+              target.TargetScannerMixIn,
+              pdu.ReadPduScannerMixIn,
+              main.MainScannerMixIn,
+              base.ScannerTemplate):
+    def t_appopts(self, s):
+        """ -C """
+        self.rv.append(base.ConfigToken('appopts'))
+
+
+class Parser(msgmod.MPParserMixIn,
+             secmod.SMParserMixIn,
+             mibview.MibViewParserMixIn,
+             target.TargetParserMixIn,
+             pdu.ReadPduParserMixIn,
+             main.MainParserMixIn,
+             base.ParserTemplate):
+
+    def p_appOptions(self, args):
+        """
+        Option ::= ApplicationOption
+
+        ApplicationOption ::= appopts whitespace string
+        ApplicationOption ::= appopts string
+        """
+
+
+class __Generator(base.GeneratorTemplate):
+
+    def n_ApplicationOption(self, cbCtx, node):
+        snmpEngine, ctx = cbCtx
+
+        if len(node) > 2:
+            opt = node[2].attr
+
+        else:
+            opt = node[1].attr
+
+        p = r = None
+
+        for i, c in enumerate(opt):
+            if c == 'b':
+                ctx['briefHeaders'] = 1
+                p = None
+
+            elif c == 'h':
+                ctx['headersOnly'] = 1
+                p = None
+
+            elif c == 'H':
+                ctx['noHeaders'] = 1
+                p = None
+
+            elif c == 'i':
+                ctx['displayIndex'] = 1
+                p = None
+
+            elif c == 'f':
+                # separator takes the rest of the option
+                ctx['fieldSeparator'] = opt[i + 1:]
+                break
+
+            elif c == 'r':
+                p = r = []
+
+            elif p is not None and '0' <= c <= '9':
+                p.append(c)
+
+            else:
+                raise error.PySnmpError('bad -C option - "%s"' % c)
+
+        if r is not None:
+            ctx['maxRepetitions'] = int(''.join(r))
+
+
+def generator(cbCtx, ast):
+    snmpEngine, ctx = cbCtx
+    return __Generator().preorder((snmpEngine, ctx), ast)
+
+
+def getHeaders(ctx):
+    """Return column headers as per output options"""
+    names = list(ctx['columnNames'])
+
+    if ctx.get('briefHeaders') and len(names) > 1:
+        prefix = os.path.commonprefix(names)
+
+        # strip whole words, e.g. ifIn out of ifInOctets and ifInErrors
+        while prefix and [x for x in names
+                          if not x[len(prefix):len(prefix) + 1].isupper()]:
+            prefix = prefix[:-1]
+
+        names = [x[len(prefix):] or x for x in names]
+
+    if ctx.get('displayIndex'):
+        names.insert(0, 'index')
+
+    return names
+
+
+def compileRowFormatter(ctx):
+    """Return callable turning table row into output line.
+
+    Rows are reported as separated column values, JSON objects or CSV
+    rows as per output format.
+    """
+    outputFormat = ctx['mibViewProxy'].outputFormat
+
+    isInteger = ctx['isIntegerColumn']
+
+    if outputFormat == 'json':
+        encode = json.JSONEncoder().encode
+
+        template = '{%s}' % ', '.join(
+            ['%s: %%s' % encode(x) for x in ['index'] + ctx['columnNames']])
+
+        def formatRow(index, records):
+            values = [formatting.formatArcs(index)]
+
+            for integer, record in zip(isInteger, records):
+                if record is None:
+                    values.append(None)
+
+                else:  # raw integers, rendered values of the rest
+                    values.append(record[integer and 4 or 5])
+
+            return template % tuple([encode(x) for x in values])
+
+    elif outputFormat == 'csv':
+        line = mibview.LineBuffer()
+
+        writer = csv.writer(line, lineterminator='')
+
+        def formatRow(index, records):
+            values = [formatting.formatArcs(index)]
+
+            values.extend([(x or EMPTY)[5] for x in records])
+
+            writer.writerow(values)
+
+            return line.pop()
+
+    else:
+        separator = ctx.get('fieldSeparator', '\t')
+
+        displayIndex = ctx.get('displayIndex')
+
+        def formatRow(index, records):
+            values = [(x or MISSING)[5] for x in records]
+
+            if displayIndex:
+                values.insert(0, formatting.formatArcs(index))
+
+            return separator.join(values)
+
+    return formatRow
+
+
+def writeHeaders(ctx):
+    outputFormat = ctx['mibViewProxy'].outputFormat
+
+    if outputFormat == 'json':
+        return
+
+    if outputFormat == 'csv':
+        line = mibview.LineBuffer()
+
+        writer = csv.writer(line, lineterminator='')
+
+        writer.writerow(['index'] + getHeaders(dict(ctx, displayIndex=0)))
+
+        sys.stdout.write('%s\n' % line.pop())
+
+        return
+
+    sys.stdout.write('SNMP table: %s\n\n' % ctx['tableName'])
+
+    sys.stdout.write(
+        '%s\n' % ctx.get('fieldSeparator', '\t').join(getHeaders(ctx)))
+
+
+def sendRequest(snmpEngine, ctx):
+    """Request next instances of the columns to walk further.
+
+    Columns getting too far ahead of the rest are held back, so that
+    incomplete rows do not pile up.
+    """
+    from pysnmp.entity.rfc3413 import cmdgen
+
+    columns = ctx['rowAssembler'].getColumnsToWalk()
+
+    if not columns:
+        return
+
+    ctx['requestColumns'] = columns
+
+    cmdgen.BulkCommandGenerator().sendVarBinds(
+        snmpEngine,
+        ctx['addrName'],
+        ctx.get('contextEngineId'), ctx.get('contextName', ''),
+        0, ctx.get('maxRepetitions', 25),
+        [(ctx['lastOids'][x], None) for x in columns],
+        app.callback(cbFun), ctx
+    )
+
+
+def writeRows(ctx):
+    """Write out rows all the columns are walked past"""
+    formatRow = ctx['formatRow']
+
+    for index, records in ctx['rowAssembler'].pop():
+        sys.stdout.write('%s\n' % formatRow(index, records))
+
+
+def writeAllRows(ctx):
+    """Write out all the rows assembled so far, complete or not.
+
+    Once walk fails, the cells not received yet are reported missing.
+    """
+    rowAssembler = ctx['rowAssembler']
+
+    for column in range(len(ctx['tableColumns'])):
+        rowAssembler.finish(column)
+
+    writeRows(ctx)
+
+
+def cbFun(snmpEngine, sendRequestHandle, errorIndication,
+          errorStatus, errorIndex, varBindTable, cbCtx):
+
+    if errorIndication:
+        writeAllRows(cbCtx)
+        sys.stderr.write('Error: %s\n' % errorIndication)
+        return
+
+    if errorStatus:
+        writeAllRows(cbCtx)
+        sys.stderr.write(
+            '%s at %s\n' %
+            (errorStatus.prettyPrint(),
+             errorIndex and varBindTable[0][int(errorIndex) - 1] or '?')
+        )
+        return
+
+    rowAssembler = cbCtx['rowAssembler']
+    columnOids = cbCtx['tableColumns']
+    lastOids = cbCtx['lastOids']
+    getRecord = cbCtx['getRecord']
+    mibViewController = cbCtx['mibViewController']
+
+    for varBindRow in varBindTable:
+        for column, (oid, val) in zip(cbCtx['requestColumns'], varBindRow):
+            if rowAssembler.isFinished(column):
+                continue
+
+            columnOid = columnOids[column]
+
+            if (not columnOid.isPrefixOf(oid) or
+                    val.tagSet == rfc1905.EndOfMibView.tagSet):
+                rowAssembler.finish(column)
+                continue
+
+            if oid <= lastOids[column]:
+                sys.stderr.write(
+                    'Error: OID not increasing: %s\n' % oid.prettyPrint())
+                rowAssembler.finish(column)
+                continue
+
+            rowAssembler.add(
+                column, tuple(oid[len(columnOid):]),
+                getRecord(mibViewController, oid, val))
+
+            lastOids[column] = oid
+
+    writeRows(cbCtx)
+
+    sendRequest(snmpEngine, cbCtx)
+
+
+def start(snmpEngine, ctx, ast):
+    # Apply configuration to SNMP entity
+    app.generate(
+        (snmpEngine, ctx), ast,
+        msgmod.generator,
+        secmod.generator,
+        mibview.generator,
+        target.generator,
+        pdu.readPduGenerator,
+        generator
+    )
+
+    mibViewController = ctx['mibViewController']
+    mibBuilder = mibViewController.mibBuilder
+
+    columns = []
+
+    for oid, val in ctx['varBinds']:
+        for column in table.getTableColumns(mibViewController, oid):
+            if column not in columns:
+                columns.append(column)
+
+    ctx['tableName'] = '%s::%s' % mibViewController.getNodeLocation(
+        columns[0][:-2])[:2]
+
+    ctx['tableColumns'] = [rfc1902.ObjectName(x) for x in columns]
+    ctx['lastOids'] = list(ctx['tableColumns'])
+
+    ctx['columnNames'] = []
+    ctx['isIntegerColumn'] = []
+
+    for column in columns:
+        modName, symName, suffix = mibViewController.getNodeLocation(column)
+
+        mibNode, = mibBuilder.importSymbols(modName, symName)
+
+        ctx['columnNames'].append(symName)
+        ctx['isIntegerColumn'].append(
+            isinstance(mibNode.syntax, univ.Integer))
+
+    if not ctx.get('noHeaders'):
+        writeHeaders(ctx)
+
+    if ctx.get('headersOnly'):
+        return
+
+    ctx['rowAssembler'] = table.RowAssembler(len(columns))
+    ctx['getRecord'] = ctx['mibViewProxy'].compileRecordBuilder()
+    ctx['formatRow'] = compileRowFormatter(ctx)
+
+    sendRequest(snmpEngine, ctx)
+
+
+def finish(snmpEngine, ctx):
+    if 'rowAssembler' in ctx:
+        writeAllRows(ctx)
+
+
+def run(ctx=None):
+    app.main(sys.modules[__name__], ctx)
@@ -0,0 +1,445 @@
+#
+# This file is part of snmpclitools software.
+#
+# Copyright (c) 2005-2019, Ilya Etingof <etingof@gmail.com>
+# License: http://snmplabs.com/snmpclitools/license.html
+#
+# Command-line MIB browser
+#
+import os
+import re
+import sys
+
+from pyasn1.type import univ
+from pysnmp import error
+from pysnmp.smi.error import NoSuchObjectError
+
+from snmpclitools.cli import app
+from snmpclitools.cli import base
+from snmpclitools.cli import main
+from snmpclitools.cli import mibview
+from snmpclitools.cli import pdu
+
+
+def getUsage():
+    return """\
+Usage: %s [OPTIONS] <PARAMETERS>
+%s%s
+TRANSLATE options:
+   -T TRANSOPTS   Set various options controlling report produced:
+              d:  print full details of the given OID
+              a:  dump the loaded MIB in a trivial form
+              f:  find MIB objects by names matching regular expressions
+                  (compiled MIBs are looked up without loading them)
+              l:  enable labeled OID report
+              o:  enable OID report
+              s:  enable dotted symbolic report
+   --filter       translate numeric OIDs found in text lines read from
+                  stdin, write translated lines to stdout
+%s\
+""" % (os.path.basename(sys.argv[0]),
+       main.getUsage(),
+       mibview.getUsage(),
+       pdu.getReadUsage())
+
+
+# Construct c/l interpreter for this app
+
+class Scanner(mibview.MibViewScannerMixIn,
+              pdu.ReadPduScannerMixIn,
+              main.MainScannerMixIn,
+              base.ScannerTemplate):
+    def t_transopts(self, s):
+        """ -T """
+        self.rv.append(base.ConfigToken('transopts'))
+
+    def t_filter(self, s):
+        """ --filter """
+        self.rv.append(base.ConfigToken('filter'))
+
+
+class Parser(mibview.MibViewParserMixIn,
+             pdu.ReadPduParserMixIn,
+             main.MainParserMixIn,
+             base.ParserTemplate):
+    def p_transOptions(self, args):
+        """
+        Cmdline ::= Options whitespace Params
+        Cmdline ::= Options Params
+
+        Option ::= TranslateOption
+
+        TranslateOption ::= transopts whitespace string
+        TranslateOption ::= transopts string
+
+        Option ::= FilterOption
+
+        FilterOption ::= filter
+
+        """
+
+
+class _Generator(base.GeneratorTemplate):
+    def n_TranslateOption(self, cbCtx, node):
+        snmpEngine, ctx = cbCtx
+        mibViewProxy = ctx['mibViewProxy']
+
+        if len(node) > 2:
+            opt = node[2].attr
+
+        else:
+            opt = node[1].attr
+
+        for c in opt:
+            mibViewProxy.translateMassMode = 1
+
+            if c == 'd':
+                mibViewProxy.translateFullDetails = 1
+                mibViewProxy.translateMassMode = 0
+
+            elif c == 'a':
+                mibViewProxy.translateTrivial = 1
+
+            elif c == 'f':
+                mibViewProxy.translateFind = 1
+                mibViewProxy.translateMassMode = 0
+
+            elif c == 'l':
+                mibViewProxy.translateLabeledOid = 1
+
+            elif c == 'o':
+                mibViewProxy.translateNumericOid = 1
+
+            elif c == 's':
+                mibViewProxy.translateSymbolicOid = 1
+
+            else:
+                raise error.PySnmpError('unsupported sub-option \"%s\"' % c)
+
+    def n_FilterOption(self, cbCtx, node):
+        snmpEngine, ctx = cbCtx
+        ctx['filterInput'] = True
+
+        # Filter reads MIB objects from stdin, do not report the default one
+        ctx['defaultVarBinds'] = []
+
+    # MIB object names to find are regular expressions, not resolved
+
+    def n_ModName(self, cbCtx, node):
+        snmpEngine, ctx = cbCtx
+        if ctx['mibViewProxy'].translateFind:
+            ctx['findModName'] = node[0].attr
+
+    def n_ObjectName(self, cbCtx, node):
+        snmpEngine, ctx = cbCtx
+        if ctx['mibViewProxy'].translateFind:
+            ctx['findPattern'] = node[0].attr
+
+    def n_VarName_exit(self, cbCtx, node):
+        snmpEngine, ctx = cbCtx
+        if ctx['mibViewProxy'].translateFind:
+            modName = ctx.pop('findModName', '')
+            pattern = ctx.pop('findPattern', '')
+
+            reason = None
+
+            try:
+                re.compile(pattern)
+
+            except re.error:
+                reason = sys.exc_info()[1]
+
+            if reason is not None:
+                raise error.PySnmpError(
+                    'Bad regular expression %s: %s' % (pattern, reason))
+
+            if 'findPatterns' not in ctx:
+                ctx['findPatterns'] = []
+
+            ctx['findPatterns'].append((modName, pattern))
+
+
+def generator(cbCtx, ast):
+    snmpEngine, ctx = cbCtx
+    return _Generator().preorder((snmpEngine, ctx), ast)
+
+
+class MibViewProxy(mibview.MibViewProxy):
+    # MIB translate options
+    translateFullDetails = False
+    translateTrivial = False
+    translateLabeledOid = False
+    translateNumericOid = False
+    translateSymbolicOid = False
+    translateFind = False
+
+    # Implies SNMPWALK mode
+    translateMassMode = False
+
+    # MIB builder loading MIB texts for full details report
+    mibTextsBuilder = None
+
+    # Override base class defaults
+    buildEqualSign = False
+
+    _null = univ.Null()
+
+    def getPrettyOidVal(self, mibViewController, oid, val):
+        prefix, label, suffix = mibViewController.getNodeName(oid)
+        modName, nodeDesc, _suffix = mibViewController.getNodeLocation(prefix)
+
+        mibNode, = mibViewController.mibBuilder.importSymbols(
+            modName, nodeDesc
+        )
+
+        if self.translateFullDetails and self.mibTextsBuilder is not None:
+            mibNode = self.getMibNodeTexts(modName, nodeDesc, mibNode)
+
+        out = self.formatNode(prefix, label, suffix, modName, nodeDesc, mibNode)
+
+        if not out:
+            out = mibview.MibViewProxy.getPrettyOidVal(
+                self, mibViewController, oid, self._null
+            )
+
+        return out
+
+    def getMibNodeTexts(self, modName, nodeDesc, mibNode):
+        """Return MIB node along with its texts (DESCRIPTION etc.).
+
+        Just the MIB module defining MIB node (and the ones it imports)
+        is loaded with texts. Falls back to MIB node with no texts.
+        """
+        try:
+            mibNode, = self.mibTextsBuilder.importSymbols(modName, nodeDesc)
+
+        except error.PySnmpError:
+            pass
+
+        return mibNode
+
+    def formatNode(self, prefix, label, suffix, modName, nodeDesc,
+                   mibNode=None):
+        """Render MIB tree node in the requested report form.
+
+        MIB node object is only needed for full details report.
+
+        Returns
+        -------
+        :py:class:`str`
+            Rendered node or empty string if no report form is requested
+        """
+        out = ''
+
+        if self.translateFullDetails:
+            if suffix:
+                out = '%s::%s' % (modName, nodeDesc)
+                out += ' [ %s ]' % '.'.join([str(x) for x in suffix])
+                out += '\n'
+
+            else:
+                out += '%s::%s\n%s ::= { %s }' % (
+                    modName,
+                    nodeDesc,
+                    mibNode.asn1Print(),
+                    ' '.join(map(lambda x, y: '%s(%s)' % (y, x), prefix, label))
+                )
+
+        elif self.translateTrivial:
+            out = '%s ::= { %s %s' % (
+                len(label) > 1 and label[-2] or ".", label[-1], prefix[-1]
+            )
+
+            if suffix:
+                out += ' [ %s ]' % '.'.join([str(x) for x in suffix])
+
+            out += ' }'
+
+        elif self.translateLabeledOid:
+            out = '.' + '.'.join(
+                map(lambda x, y: '%s(%s)' % (y, x), prefix, label)
+            )
+
+            if suffix:
+                out += ' [ %s ]' % '.'.join([str(x) for x in suffix])
+
+        elif self.translateNumericOid:
+            out = '.' + '.'.join([str(x) for x in prefix])
+            if suffix:
+                out += ' [ %s ]' % '.'.join([str(x) for x in suffix])
+
+        elif self.translateSymbolicOid:
+            out = '.' + '.'.join(label)
+            if suffix:
+                out += ' [ %s ]' % '.'.join([str(x) for x in suffix])
+
+        return out
+
+    def formatEntries(self, entries):
+        """Render OID index entries in the requested report form.
+
+        Nodes are taken from OID index snapshot of MIB tree, one after
+        another, rather than looked up in MIB tree each.
+        """
+        formatNode = self.formatNode
+
+        for entry in entries:
+            yield formatNode(entry.name, entry.label, (),
+                             entry.modName, entry.symName)
+
+
+def newEngine():
+    # No SNMP traffic, MIBs only
+    return mibview.MibEngine()
+
+
+def start(snmpEngine, ctx, ast):
+    ctx['mibViewController'] = mibview.getMibViewController(snmpEngine)
+    ctx['oidIndex'] = mibview.getOidIndex(snmpEngine)
+    ctx['mibViewProxy'] = MibViewProxy(
+        ctx['mibViewController'], ctx['oidIndex']
+    )
+
+    app.generate(
+        (snmpEngine, ctx), ast,
+        mibview.generator,
+        generator
+    )
+
+    mibViewProxy = ctx['mibViewProxy']
+
+    # MIB texts (DESCRIPTION, etc.) are only loaded to report full details
+    if mibViewProxy.translateFullDetails:
+        mibViewProxy.mibTextsBuilder = mibview.getMibTextsBuilder(snmpEngine)
+
+    if not mibViewProxy.translateFind:
+        app.generate((snmpEngine, ctx), ast, pdu.readPduGenerator)
+
+
+def finish(snmpEngine, ctx):
+    ctx['mibViewProxy'].buildValue = 0  # disable value printout
+
+    mibViewProxy = ctx['mibViewProxy']
+
+    if mibViewProxy.translateFind:
+        for modName, pattern in ctx.get('findPatterns', [('', '')]):
+            for name, modNames in mibview.searchMibNames(
+                    snmpEngine, pattern, modName):
+                for modName in modNames:
+                    sys.stdout.write('%s::%s\n' % (modName, name))
+
+        return
+
+    # Walking OID index is way faster than walking MIB tree
+    fastMassMode = (mibViewProxy.translateMassMode and
+                    ctx.get('oidIndex') is not None and
+                    (mibViewProxy.translateTrivial or
+                     mibViewProxy.translateLabeledOid or
+                     mibViewProxy.translateNumericOid or
+                     mibViewProxy.translateSymbolicOid))
+
+    for oid, val in ctx.get('varBinds', ()):
+
+        if fastMassMode:
+            if val is None:
+                val = univ.Null()
+
+            sys.stdout.write(
+                '%s\n' % mibViewProxy.getPrettyOidVal(
+                    ctx['mibViewController'], oid, val
+                )
+            )
+
+            for out in mibViewProxy.formatEntries(
+                    ctx['oidIndex'].walk(oid)):
+                sys.stdout.write(out + '\n')
+
+            continue
+
+        while True:
+            if val is None:
+                val = univ.Null()
+
+            sys.stdout.write(
+                '%s\n' % ctx['mibViewProxy'].getPrettyOidVal(
+                    ctx['mibViewController'], oid, val
+                )
+            )
+
+            if not ctx['mibViewProxy'].translateMassMode:
+                break
+
+            try:
+                oid, label, suffix = ctx['mibViewController'].getNextNodeName(oid)
+
+            except NoSuchObjectError:
+                break
+
+    if ctx.get('filterInput'):
+        filterLines(ctx['mibViewProxy'], ctx['mibViewController'],
+                    sys.stdin, sys.stdout)
+
+
+# Numeric OIDs of 5+ arcs within text, leading dot is optional. Fewer
+# arcs are too likely to be IPv4 addresses or version numbers
+_NUMERIC_OID = re.compile(r'(?<![\w.])\.?[0-2](?:\.\d+){4,}(?!\.?\w)')
+
+# Max number of distinct OIDs to keep translated
+FILTER_CACHE_SIZE = 65536
+
+
+def filterLines(mibViewProxy, mibViewController, inputFile, outputFile,
+                cacheSize=FILTER_CACHE_SIZE):
+    """Copy text lines translating numeric OIDs found in them.
+
+    Logs and walk dumps repeat the same OIDs over and over, so OIDs are
+    translated once and then taken from the cache.
+
+    Numbers looking like OIDs are left intact unless they fall under
+    some MIB object past the top-level arcs (`iso`, `ccitt` etc.), as
+    dotted numbers of other kinds do.
+    """
+    translations = {}
+
+    null = univ.Null('')
+
+    def translate(match):
+        text = match.group(0)
+
+        try:
+            return translations[text]
+
+        except KeyError:
+            pass
+
+        try:
+            oid = univ.ObjectIdentifier(text.lstrip('.'))
+
+            prefix, label, suffix = mibViewController.getNodeName(oid)
+
+            if len(prefix) > 1:
+                out = mibViewProxy.getPrettyOidVal(
+                    mibViewController, oid, null)
+
+            else:
+                out = text
+
+        except Exception:
+            out = text
+
+        if len(translations) >= cacheSize:
+            translations.clear()
+
+        translations[text] = out
+
+        return out
+
+    substitute = _NUMERIC_OID.sub
+    write = outputFile.write
+
+    for line in inputFile:
+        write(substitute(translate, line))
+
+
+def run(ctx=None):
+    app.main(sys.modules[__name__], ctx)
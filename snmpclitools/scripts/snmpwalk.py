@@ -0,0 +1,189 @@
+#
+# This file is part of snmpclitools software.
+#
+# Copyright (c) 2005-2019, Ilya Etingof <etingof@gmail.com>
+# License: http://snmplabs.com/snmpclitools/license.html
+#
+# GETNEXT command generator
+#
+import os
+import sys
+import time
+
+from pysnmp import error
+from pysnmp.proto import rfc1902
+
+from snmpclitools.cli import app
+from snmpclitools.cli import base
+from snmpclitools.cli import main
+from snmpclitools.cli import mibview
+from snmpclitools.cli import msgmod
+from snmpclitools.cli import pdu
+from snmpclitools.cli import secmod
+from snmpclitools.cli import target
+
+
+def getUsage():
+    return """\
+Usage: %s [OPTIONS] <AGENT> <PARAMETERS>
+%s%s%s%s%s%s
+GETNEXT options:
+   -C<NEXTOPT>    set various application specific behaviours:
+              c:  do not check returned OIDs are increasing
+              t:  display wall-clock time to complete the request
+              p:  print the number of variables found
+""" % (os.path.basename(sys.argv[0]),
+       main.getUsage(),
+       msgmod.getUsage(),
+       secmod.getUsage(),
+       mibview.getUsage(),
+       target.getUsage(),
+       pdu.getReadUsage())
+
+
+# Construct c/l interpreter for this app
+
+class Scanner(msgmod.MPScannerMixIn,
+              secmod.SMScannerMixIn,
+              mibview.MibViewScannerMixIn,
+              target.TargetScannerMixIn,
+              pdu.ReadPduScannerMixIn,
+              main.MainScannerMixIn,
+              base.ScannerTemplate):
+    def t_appopts(self, s):
+        """ -C """
+        self.rv.append(base.ConfigToken('appopts'))
+
+
+class Parser(msgmod.MPParserMixIn,
+             secmod.SMParserMixIn,
+             mibview.MibViewParserMixIn,
+             target.TargetParserMixIn,
+             pdu.ReadPduParserMixIn,
+             main.MainParserMixIn,
+             base.ParserTemplate):
+    def p_appOptions(self, args):
+        """
+        Option ::= ApplicationOption
+
+        ApplicationOption ::= appopts whitespace string
+        ApplicationOption ::= appopts string
+        """
+
+
+class _Generator(base.GeneratorTemplate):
+    def n_ApplicationOption(self, cbCtx, node):
+        snmpEngine, ctx = cbCtx
+
+        if len(node) > 2:
+            opt = node[2].attr
+
+        else:
+            opt = node[1].attr
+
+        for c in opt:
+            if c == 'c':
+                ctx['ignoreNonIncreasingOids'] = 1
+
+            elif c == 't':
+                ctx['displayWallClock'] = time.time()
+
+            elif c == 'p':
+                ctx['reportFoundVars'] = 1
+
+            else:
+                raise error.PySnmpError('bad -C option - "%s"' % c)
+
+
+def generator(cbCtx, ast):
+    snmpEngine, ctx = cbCtx
+    return _Generator().preorder((snmpEngine, ctx), ast)
+
+
+def cbFun(snmpEngine, sendRequestHandle, errorIndication,
+          errorStatus, errorIndex, varBindTable, cbCtx):
+
+    if errorIndication:
+        if (errorIndication != 'oidNotIncreasing' or
+                not cbCtx.get('ignoreNonIncreasingOids')):
+            sys.stderr.write('Error: %s\n' % errorIndication)
+            return
+
+    if errorStatus:
+        sys.stderr.write(
+            '%s at %s\n' %
+            (errorStatus.prettyPrint(),
+             errorIndex and varBindTable[0][int(errorIndex) - 1] or '?')
+        )
+        return
+
+    for varBindRow in varBindTable:
+        colIdx = -1
+        inTableFlag = 0
+
+        for oid, val in varBindRow:
+            colIdx += 1
+
+            if cbCtx['myHeadVars'][colIdx].isPrefixOf(oid):
+                sys.stdout.write(
+                    '%s\n' % cbCtx['mibViewProxy'].getPrettyOidVal(
+                        cbCtx['mibViewController'], oid, val
+                    )
+                )
+
+                inTableFlag += 1
+
+        if cbCtx.get('reportFoundVars'):
+            cbCtx['reportFoundVars'] += inTableFlag
+
+        if not inTableFlag:
+            return  # stop on end-of-table
+
+    return True  # continue walking
+
+
+def start(snmpEngine, ctx, ast):
+    # Apply configuration to SNMP entity
+    app.generate(
+        (snmpEngine, ctx), ast,
+        msgmod.generator,
+        secmod.generator,
+        mibview.generator,
+        target.generator,
+        pdu.readPduGenerator,
+        generator
+    )
+
+    from pysnmp.entity.rfc3413 import cmdgen
+
+    ctx['myHeadVars'] = [rfc1902.ObjectName(x[0]) for x in ctx['varBinds']]
+
+    cmdgen.NextCommandGenerator().sendVarBinds(
+        snmpEngine,
+        ctx['addrName'],
+        ctx.get('contextEngineId'), ctx.get('contextName', ''),
+        ctx['varBinds'],
+        app.callback(cbFun), ctx
+    )
+
+
+def finish(snmpEngine, ctx):
+    # Reports would get mixed up with machine-readable output
+    if ctx['mibViewProxy'].outputFormat == 'text':
+        report = sys.stdout
+
+    else:
+        report = sys.stderr
+
+    if ctx.get('reportFoundVars'):
+        report.write(
+            'Variables found: %s\n' % (ctx['reportFoundVars'] - 1))
+
+    if ctx.get('displayWallClock'):
+        report.write(
+            'Total traversal time = %.4f seconds'
+            '\n' % (time.time() - ctx['displayWallClock']))
+
+
+def run(ctx=None):
+    app.main(sys.modules[__name__], ctx)